@@ -0,0 +1,48 @@
+"""add session speaker_id
+
+Revision ID: 7d4b2e9a1c53
+Revises: 3c8a1f5e7b20
+Create Date: 2026-10-19 15:36:41.902117
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4b2e9a1c53'
+down_revision = '3c8a1f5e7b20'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade():
+    op.add_column('session', sa.Column('speaker_id', sa.Integer(), nullable=True))
+    if context.is_offline_mode():
+        # --sql script : one set-based backfill (no rowcount to loop on)
+        op.execute("""
+            UPDATE session SET speaker_id = participant.speaker_id
+            FROM participant
+            WHERE session.participant_id = participant.id
+            """)
+    else:
+        # backfill the denormalized participant.speaker_id by batches of sessions ids (short row locks on big tables)
+        conn = op.get_bind()
+        while conn.execute(sa.text("""
+                UPDATE session SET speaker_id = participant.speaker_id
+                FROM participant
+                WHERE session.participant_id = participant.id
+                  AND session.id IN (SELECT id FROM session WHERE speaker_id IS NULL ORDER BY id LIMIT :batch_size)
+                """), {"batch_size": BACKFILL_BATCH_SIZE}).rowcount:
+            pass
+    op.alter_column('session', 'speaker_id', nullable=False)
+    op.create_foreign_key('session_speaker_id_fkey', 'session', 'speaker', ['speaker_id'], ['id'])
+    op.create_index('ix_session_speaker_id_date_time', 'session', ['speaker_id', 'date', 'time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_session_speaker_id_date_time', table_name='session')
+    op.drop_constraint('session_speaker_id_fkey', 'session', type_='foreignkey')
+    op.drop_column('session', 'speaker_id')
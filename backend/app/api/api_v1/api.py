@@ -9,7 +9,7 @@ from app.api.api_v1.endpoints.user.participant import (
 from app.api.api_v1.endpoints.session import (
     sessions, session_types, session_status
 )
-from app.api.api_v1.endpoints import availabilities
+from app.api.api_v1.endpoints import availabilities, search, stats
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
@@ -23,3 +23,5 @@ api_router.include_router(sessions.router, prefix="/sessions", tags=["sessions"]
 api_router.include_router(session_types.router, prefix="/sessions", tags=["session types & status"])
 api_router.include_router(session_status.router, prefix="/sessions", tags=["session types & status"])
 api_router.include_router(availabilities.router, prefix="/availabilities", tags=["speaker availabilities"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
@@ -1,30 +1,61 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models, schemas
+from app import crud, models, scheduling, schemas
 from app.api import deps
-from app.utils import from_weekday_int_to_str
+from app.utils import from_weekday_int_to_str, ical_utils, json_utils
 
-router = APIRouter()
+router = APIRouter(route_class=deps.TransactionalRoute)
 
 
 @router.get("/mine", response_model=list[schemas.Availability])
 async def read_availabilities_mine(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(deps.get_async_db),
     current_user: models.User = Depends(deps.get_current_active_speaker_user),
 ) -> Any:
     """
     Read all current speaker availabilities.
+    Use the returned ETag header as If-None-Match request header : 304 (empty) response if nothing changed.
     **Allowed for speaker user only.**
     """
-    return await crud.availability.get_by_speaker(db, current_user.id)
+    await deps.check_not_modified(db, request, response, current_user,
+                                  [crud.change_counter.speaker_scope(current_user.id)])
+    availabilities = await crud.availability.get_by_speaker(db, current_user.id, rows=True)
+    return json_utils.FastJSONResponse(crud.availability.to_json_list(availabilities),
+                                       headers={"ETag": response.headers["ETag"]})
+
+
+@router.get("/mine.ics", response_class=StreamingResponse)
+async def read_availabilities_mine_ical(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models.User = Depends(deps.get_current_active_speaker_user),
+) -> Any:
+    """
+    Read all current speaker availabilities as an iCalendar (RFC 5545) file (one weekly recurring event
+    by availability). Use the returned ETag header as If-None-Match request header : 304 (empty) response
+    if nothing changed.
+    **Allowed for speaker user only.**
+    """
+    await deps.check_not_modified(db, request, response, current_user,
+                                  [crud.change_counter.speaker_scope(current_user.id)])
+    rows = await crud.availability.stream_by_speaker(db, current_user.id)
+    calendar = ical_utils.stream_calendar(f"{current_user.first_name} {current_user.last_name} availabilities", rows,
+                                          lambda row: ical_utils.availability_event(row, current_user.slot_time))
+    return StreamingResponse(calendar, media_type="text/calendar", headers={"ETag": response.headers["ETag"]})
 
 
 @router.get("", response_model=list[schemas.Availability])
 async def read_availabilities_by_speaker(
     *,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(deps.get_async_db),
     speaker_id: int = None,
     current_user: models.User = Depends(deps.get_current_active_speaker_or_participant_user),
@@ -32,6 +63,7 @@ async def read_availabilities_by_speaker(
     """
     Read all availabilities for the current speaker or current participant's speaker (if speaker_id is not set).
     Read all availabilities for the speaker whose id is set as speaker_id param.
+    Use the returned ETag header as If-None-Match request header : 304 (empty) response if nothing changed.
     **Allowed for speaker or participant user only.**
     """
     if speaker_id is None:
@@ -45,13 +77,16 @@ async def read_availabilities_by_speaker(
                 status_code=404,
                 detail="A speaker with this id does not exist in the system...",
             )
-    return await crud.availability.get_by_speaker(db, speaker_id)
+    await deps.check_not_modified(db, request, response, current_user, [crud.change_counter.speaker_scope(speaker_id)])
+    availabilities = await crud.availability.get_by_speaker(db, speaker_id, rows=True)
+    return json_utils.FastJSONResponse(crud.availability.to_json_list(availabilities),
+                                       headers={"ETag": response.headers["ETag"]})
 
 
 @router.post("", response_model=schemas.Availability)
 async def create_availability(
     *,
-    db: AsyncSession = Depends(deps.get_async_db),
+    db: AsyncSession = Depends(deps.get_transactional_db),
     avail_in: schemas.AvailabilityCreate,
     current_user: models.User = Depends(deps.get_current_active_speaker_user)
 ) -> Any:
@@ -71,14 +106,17 @@ async def create_availability(
                             f"= {from_weekday_int_to_str(avail_in.week_day)} a weekday that does not exists "
                             f"between {avail_in.start_date} and {avail_in.end_date}.")
                 )
-    if await crud.availability.is_same_weekday_time_period_speaker(db, speaker_id=current_user.id, obj_in=avail_in):
+    # all speaker's availabilities loaded once for the following checks
+    snapshot = await crud.speaker.get_scheduling_snapshot(db, current_user)
+    candidate = crud.availability.to_rule(avail_in)
+    if scheduling.is_same_weekday_time_period(snapshot, candidate):
         raise HTTPException(
                     status_code=400,
                     detail=(f"Sorry, cannot create because at least one availability already exists on a "
                             f"{from_weekday_int_to_str(avail_in.week_day)} at "
                             f"{avail_in.time} between {avail_in.start_date} and {avail_in.end_date}.")
                 )
-    if await crud.availability.has_too_close_previous(db, speaker_id=current_user.id, obj_in=avail_in):
+    if scheduling.has_too_close_previous(snapshot, candidate):
         raise HTTPException(
                     status_code=400,
                     detail=(f"Sorry, cannot create because at least one availability already exists on a "
@@ -87,7 +125,7 @@ async def create_availability(
                             f"at an earlier time but that overlaps {avail_in.time} "
                             f"because of duration = {current_user.slot_time} minutes.")
                 )
-    if await crud.availability.has_too_close_next(db, speaker_id=current_user.id, obj_in=avail_in):
+    if scheduling.has_too_close_next(snapshot, candidate):
         raise HTTPException(
                     status_code=400,
                     detail=(f"Sorry, cannot create because at least one availability already exists on a "
@@ -0,0 +1,32 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.api import deps
+
+router = APIRouter()
+
+
+@router.get("", response_model=schemas.SearchResults)
+async def search(
+    db: AsyncSession = Depends(deps.get_async_db),
+    q: str = Query(..., min_length=3, max_length=100),
+    scope: str = Query("all", regex="^(all|users|sessions)$"),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(deps.get_current_active_admin_user),
+) -> Any:
+    """
+    Search users (first name, last name or email containing q) and/or sessions (comments matching q words,
+    "quoted phrase", -excluded word...) according to the scope param, best matches first.
+    **Allowed for admin user only.**
+    """
+    results = {}
+    if scope in ("all", "users"):
+        results["users"] = await crud.user.search(db, q, skip=skip, limit=limit)
+    if scope in ("all", "sessions"):
+        results["sessions"] = await crud.session.from_db_models_to_schemas(
+            db, await crud.session.search_comments(db, q, skip=skip, limit=limit))
+    return results
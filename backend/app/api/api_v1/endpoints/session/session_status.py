@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException  # noqa
+from fastapi import APIRouter, Depends, HTTPException, Request, Response  # noqa
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -12,14 +12,18 @@ router = APIRouter()
 
 @router.get("/status", response_model=list[schemas.SessionStatus])
 async def read_session_status(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(deps.get_current_active_admin_user),
 ) -> Any:
     """
+    Use the returned ETag header as If-None-Match request header : 304 (empty) response if nothing changed.
     **Allowed for super admin/user only.**
     """
+    await deps.check_not_modified(db, request, response, current_user, [crud.session_status.version_scope])
     return await crud.session_status.get_multi(db, skip=skip, limit=limit)
 
 
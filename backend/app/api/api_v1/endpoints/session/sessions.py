@@ -1,62 +1,138 @@
+import datetime as dt
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core import jobs
+from app.core.config import settings
+from app.utils import ical_utils, export_utils, json_utils
 
-router = APIRouter()
+router = APIRouter(route_class=deps.TransactionalRoute)
+
+
+def sessions_version_scopes(current_user: models.User) -> list[str]:
+    """
+    Speaker or participant sessions change with the speaker scope, their type/status names with the tables ones
+    and the ics sessions duration with the participant types nb_session_week.
+    """
+    speaker_id = current_user.id if current_user.profile == "speaker" else current_user.speaker_id
+    return [crud.change_counter.speaker_scope(speaker_id), crud.session_type.version_scope,
+            crud.session_status.version_scope, crud.participant_type.version_scope]
 
 
 @router.get("/", response_model=list[schemas.Session])
 async def read_all_sessions(
     db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int | None = None,
+    stream: bool = False,
     current_user: models.User = Depends(deps.get_current_active_speaker_or_admin_user),
 ) -> Any:
     """
     Read all sessions in db.
+    With stream=true, the JSON array is streamed (rows fetched by chunks from a db server-side cursor) : memory does
+    not depend on the limit, e.g. to read them all at once from an admin tool.
+    The limit is 100 by default, but a streamed array is not limited by default (all rows after skip).
     **Allowed for speaker or admin user only.**
     """
-    db_sessions = await crud.session.get_multi(db, skip=skip, limit=limit)
-    sessions = []
-    for db_p in db_sessions:
-        sessions.append(await crud.session.from_db_model_to_schema(db, db_p))
-    return sessions
+    if stream:
+        serialize = await crud.session.json_serializer(db)
+        rows = await crud.session.stream_multi(db, skip=skip, limit=limit)
+        return StreamingResponse(json_utils.stream_json_list(rows, serialize), media_type="application/json")
+    db_sessions = await crud.session.get_multi(db, skip=skip, limit=100 if limit is None else limit, rows=True)
+    return json_utils.FastJSONResponse(await crud.session.to_json_list(db, db_sessions))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_all_sessions(
+    db: AsyncSession = Depends(deps.get_async_db),
+    export_format: str = Query("csv", alias="format", regex="^(csv|parquet)$"),
+    current_user: models.User = Depends(deps.get_current_active_admin_user),
+) -> Any:
+    """
+    Export all sessions (with their participant, speaker, type and status) as a CSV or Parquet file.
+    The file is streamed, whatever the number of sessions.
+    **Allowed for admin user only.**
+    """
+    if export_format == "parquet" and not export_utils.is_parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export is not available on this server...")
+    rows = await crud.session.stream_export_rows(db)
+    if export_format == "csv":
+        content, media_type = export_utils.stream_csv(rows), "text/csv"
+    else:
+        content = export_utils.stream_parquet(rows, crud.session.export_select().selected_columns)
+        media_type = "application/vnd.apache.parquet"
+    return StreamingResponse(content, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="sessions.{export_format}"'})
 
 
 @router.get("/mine", response_model=list[schemas.Session])
 async def read_sessions_mine(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
+    from_date: dt.date | None = Query(None, alias="from"),
+    to_date: dt.date | None = Query(None, alias="to"),
     current_user: models.User = Depends(deps.get_current_active_speaker_or_participant_user),
 ) -> Any:
     """
-    Read your sessions.
+    Read your sessions, all or only those from and/or to a date (from and to query params, e.g. for a week or month
+    view), in chronological order.
+    Use the returned ETag header as If-None-Match request header : 304 (empty) response if nothing changed.
     **Allowed for speaker or participant user only.**
     """
+    if from_date is not None and to_date is not None and from_date > to_date:
+        raise HTTPException(status_code=400, detail="Cannot read sessions with a to date before the from date...")
+    await deps.check_not_modified(db, request, response, current_user, sessions_version_scopes(current_user))
     if current_user.profile == "participant":
-        db_sessions = await crud.session.get_by_participant_email(db, current_user.email)
+        db_sessions = await crud.session.get_by_participant_date_range(db, current_user.id, from_date, to_date,
+                                                                       rows=True)
     if current_user.profile == "speaker":
-        db_sessions = await crud.session.get_by_speaker_email(db, current_user.email)
-    sessions = []
-    for db_p in db_sessions:
-        sessions.append(await crud.session.from_db_model_to_schema(db, db_p))
-    return sessions
+        db_sessions = await crud.session.get_by_speaker_date_range(db, current_user.id, from_date, to_date, rows=True)
+    return json_utils.FastJSONResponse(await crud.session.to_json_list(db, db_sessions),
+                                       headers={"ETag": response.headers["ETag"]})
+
+
+@router.get("/mine.ics", response_class=StreamingResponse)
+async def read_sessions_mine_ical(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models.User = Depends(deps.get_current_active_speaker_or_participant_user),
+) -> Any:
+    """
+    Read your sessions as an iCalendar (RFC 5545) file, e.g. to subscribe to it from a calendar client.
+    Use the returned ETag header as If-None-Match request header : 304 (empty) response if nothing changed.
+    **Allowed for speaker or participant user only.**
+    """
+    await deps.check_not_modified(db, request, response, current_user, sessions_version_scopes(current_user))
+    if current_user.profile == "speaker":
+        speaker = current_user
+        owner = {"speaker_id": current_user.id}
+    elif current_user.profile == "participant":
+        speaker = await crud.speaker.get_by_participant_id(db, current_user.id)
+        owner = {"participant_id": current_user.id}
+    rows = await crud.session.stream_calendar_rows(db, **owner)
+    calendar = ical_utils.stream_calendar(f"{current_user.first_name} {current_user.last_name} sessions", rows,
+                                          lambda row: ical_utils.session_event(row, speaker.slot_time))
+    return StreamingResponse(calendar, media_type="text/calendar", headers={"ETag": response.headers["ETag"]})
 
 
 @router.post("", response_model=schemas.Session)
 async def create_session(
     *,
-    db: AsyncSession = Depends(deps.get_async_db),
+    db: AsyncSession = Depends(deps.get_transactional_db),
     session_in: schemas.SessionCreate,
     current_user: models.User = Depends(deps.get_current_active_speaker_or_participant_user)
 ) -> Any:  # * enforce next params te be keyword-only
     """
-    Create new session and send an email to the concerned participant.
+    Create new session and send an email to the concerned participant (in background, once the session is saved).
     **Allowed for speaker or participant user only.**
     """
     session_in.participant_id = await crud.session.participant_checks_and_get_id(db, session_in,
@@ -75,14 +151,50 @@ async def create_session(
 
     await crud.session.type_and_status_names_checks(db, session_in)
     session = await crud.session.create(db, obj_in=session_in)
-    # if settings.EMAILS_ENABLED and user_in.email:
-    #     send_new_account_email(
-    #         email_to=user_in.email, username=user_in.email, api_key=user_in.password
-    #     )
-
+    if settings.EMAILS_ENABLED:
+        participant = current_user if current_user.profile == "participant" \
+            else await crud.participant.get(db, id=session.participant_id)
+        jobs.enqueue_after_commit(db, "send_new_session_email", {
+            "email_to": participant.email, "date": session.date.isoformat(), "time": session.time.isoformat(),
+            "speaker_name": f"{speaker.first_name} {speaker.last_name}"}, dedup_key=f"new_session:{session.id}")
     return await crud.session.from_db_model_to_schema(db, session)
 
 
+@router.post("/bulk", response_model=list[schemas.Session])
+async def create_sessions_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_transactional_db),
+    sessions_in: list[schemas.SessionCreate],
+    current_user: models.User = Depends(deps.get_current_active_speaker_or_participant_user)
+) -> Any:  # * enforce next params te be keyword-only
+    """
+    Create many new sessions at once (e.g. a whole term for a participant).
+    Sessions are all checked before inserting, including conflicts between themselves,
+    and then all created or none.
+    **Allowed for speaker or participant user only.**
+    """
+    if not sessions_in:
+        return []
+    participants = await crud.session.participants_checks_and_get_ids(db, sessions_in, current_user=current_user)
+    if current_user.profile == "speaker":
+        speaker = current_user
+    elif current_user.profile == "participant":
+        speaker = await crud.speaker.get_by_participant_id(db, current_user.id)
+
+    not_free_sessions_in = await crud.speaker.get_not_free_sessions_in(db, speaker, sessions_in, participants)
+    if not_free_sessions_in:
+        raise HTTPException(
+                    status_code=400,
+                    detail=("Cannot create these sessions. Please, check if Speaker has corresponding availability "
+                            "and if there is no session that already exists : "
+                            + ", ".join(f"{s_in.date} {s_in.time}" for s_in in not_free_sessions_in))
+                )
+
+    types_and_status_ids = await crud.session.types_and_status_names_checks(db, sessions_in)
+    sessions = await crud.session.create_multi(db, objs_in=sessions_in, types_and_status_ids=types_and_status_ids)
+    return await crud.session.from_db_models_to_schemas(db, sessions)
+
+
 # @router.put("/{session_id}", response_model=schemas.Session)
 # async def update_session_by_id(
 #     *,
@@ -0,0 +1,31 @@
+import datetime as dt
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.api import deps
+
+router = APIRouter()
+
+
+@router.get("/speakers", response_model=list[schemas.SpeakerWeekStats])
+async def read_speakers_stats(
+    db: AsyncSession = Depends(deps.get_async_db),
+    speaker_id: int = None,
+    start_date: dt.date = None,
+    end_date: dt.date = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(deps.get_current_active_admin_user),
+) -> Any:
+    """
+    Read speakers statistics by week (available and booked slots, done and no-show sessions),
+    for all speakers or only the one whose id is set as speaker_id param, and between start_date and end_date
+    if they are set.
+    **Allowed for admin user only.**
+    """
+    return await crud.speaker_week_stats.get_multi_by_period_speaker(db, speaker_id=speaker_id,
+                                                                     start_date=start_date, end_date=end_date,
+                                                                     skip=skip, limit=limit)
@@ -34,8 +34,7 @@ async def create_admin(
     Create new admin user and send him/her an email.
     **Allowed for admin user only.**
     """
-    db_admin = await crud.user.get_by_email(db, email=admin_in.email)
-    if db_admin:
+    if await crud.user.email_exists(db, admin_in.email):
         raise HTTPException(
             status_code=400,
             detail="A user with this email already exists in the system...",
@@ -55,13 +54,15 @@ async def update_admin_by_id(
     Update an admin user using id.
     **Allowed for admin user only.**
     """
-    if await crud.user.get_by_email(db, email=admin_in.email):
-        raise HTTPException(
-            status_code=400, detail="A user with this email already exists in the system...")
     db_admin = await crud.admin.get(db, id=admin_id)
     if not db_admin:
         raise HTTPException(
             status_code=404,
             detail="An admin user with this id does not exist in the system...",
         )
+    # only a changed email has to be checked (the unchanged one is the admin's own)
+    if (admin_in.email and admin_in.email != db_admin.email
+            and await crud.user.email_exists(db, admin_in.email)):
+        raise HTTPException(
+            status_code=400, detail="A user with this email already exists in the system...")
     return await crud.admin.update(db, db_obj=db_admin, obj_in=admin_in)
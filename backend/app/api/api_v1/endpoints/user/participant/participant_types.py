@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
@@ -11,14 +11,18 @@ router = APIRouter()
 
 @router.get("/types", response_model=list[schemas.ParticipantType])
 async def read_participant_types(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(deps.get_current_active_admin_user),
 ) -> Any:
     """
+    Use the returned ETag header as If-None-Match request header : 304 (empty) response if nothing changed.
     **Allowed for admin user only.**
     """
+    await deps.check_not_modified(db, request, response, current_user, [crud.participant_type.version_scope])
     return await crud.participant_type.get_multi(db, skip=skip, limit=limit)
 
 
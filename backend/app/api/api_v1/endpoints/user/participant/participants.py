@@ -1,45 +1,54 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core import jobs
+from app.core.config import settings
+from app.utils import json_utils
 
-router = APIRouter()
+router = APIRouter(route_class=deps.TransactionalRoute)
 
 
 @router.get("/", response_model=list[schemas.Participant])
 async def read_participants(
     db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int | None = None,
+    stream: bool = False,
     current_user: models.User = Depends(deps.get_current_active_speaker_or_admin_user),
 ) -> Any:
     """
     Read all participant users in db.
+    With stream=true, the JSON array is streamed (rows fetched by chunks from a db server-side cursor) : memory does
+    not depend on the limit, e.g. to read them all at once from an admin tool.
+    The limit is 100 by default, but a streamed array is not limited by default (all rows after skip).
     **Allowed for speaker or admin user only.**
     """
-    db_participants = await crud.participant.get_multi(db, skip=skip, limit=limit)
-    participants = []
-    for db_p in db_participants:
-        participants.append(await crud.participant.from_db_model_to_schema(db, db_p))
-    return participants
+    if stream:
+        serialize = await crud.participant.json_serializer(db)
+        rows = await crud.participant.stream_multi(db, skip=skip, limit=limit)
+        return StreamingResponse(json_utils.stream_json_list(rows, serialize), media_type="application/json")
+    db_participants = await crud.participant.get_multi(db, skip=skip, limit=100 if limit is None else limit,
+                                                       rows=True)
+    return json_utils.FastJSONResponse(await crud.participant.to_json_list(db, db_participants))
 
 
 @router.post("/participant", response_model=schemas.Participant)
 async def create_participant(
     *,
-    db: AsyncSession = Depends(deps.get_async_db),
+    db: AsyncSession = Depends(deps.get_transactional_db),
     participant_in: schemas.ParticipantCreate,
     current_user: models.User = Depends(deps.get_current_active_speaker_or_admin_user),
 ) -> Any:
     """
-    Create new participant user and send him/her an email. # TODO
+    Create new participant user and send him/her an email (in background, once the participant is saved).
     **Allowed for speaker or admin user only.**
     """
-    db_participant = await crud.user.get_by_email(db, email=participant_in.email)
-    if db_participant:
+    if await crud.user.email_exists(db, participant_in.email):
         raise HTTPException(status_code=400, detail="A user with this email already exists in the system...")
 
     participant_in.speaker_id = await crud.participant.speaker_checks_and_get_id(db, participant_in,
@@ -47,13 +56,16 @@ async def create_participant(
     await crud.participant.type_and_status_names_checks(db, participant_in)
 
     participant = await crud.participant.create(db, obj_in=participant_in)
+    if settings.EMAILS_ENABLED:
+        jobs.enqueue_after_commit(db, "send_new_account_email", {"email_to": participant.email},
+                                  dedup_key=f"new_account:{participant.email}")
     return await crud.participant.from_db_model_to_schema(db, participant)
 
 
 @router.put("/{participant_id}", response_model=schemas.Participant)
 async def update_participant_by_id(
     *,
-    db: AsyncSession = Depends(deps.get_async_db),
+    db: AsyncSession = Depends(deps.get_transactional_db),
     participant_id: int,
     participant_in: schemas.ParticipantUpdate,
     current_user: models.User = Depends(deps.get_current_active_speaker_or_admin_user),
@@ -62,16 +74,17 @@ async def update_participant_by_id(
     Update a participant user using id.
     **Allowed for speaker or admin user only.**
     """
-    if await crud.user.get_by_email(db, email=participant_in.email):
-        raise HTTPException(
-            status_code=400, detail="A user with this email already exists in the system...")
-
     db_participant = await crud.participant.get(db, id=participant_id)
     if not db_participant:
         raise HTTPException(
             status_code=404,
             detail="A participant user with this id does not exist in the system...",
         )
+    # only a changed email has to be checked (the unchanged one is the participant's own)
+    if (participant_in.email and participant_in.email != db_participant.email
+            and await crud.user.email_exists(db, participant_in.email)):
+        raise HTTPException(
+            status_code=400, detail="A user with this email already exists in the system...")
 
     if participant_in.speaker_id:
         participant_in.speaker_id = await crud.participant.speaker_checks_and_get_id(db, participant_in,
@@ -34,8 +34,7 @@ async def create_speaker(
     Create new speaker user and send him/her an email.
     **Allowed for admin user only.**
     """
-    db_speaker = await crud.user.get_by_email(db, email=speaker_in.email)
-    if db_speaker:
+    if await crud.user.email_exists(db, speaker_in.email):
         raise HTTPException(
             status_code=400,
             detail="A user with this email already exists in the system...",
@@ -55,13 +54,15 @@ async def update_speaker(
     Update a speaker user using id.
     **Allowed for admin user only.**
     """
-    if await crud.user.get_by_email(db, email=speaker_in.email):
-        raise HTTPException(
-            status_code=400, detail="A user with this email already exists in the system...")
     db_speaker = await crud.speaker.get(db, id=speaker_id)
     if not db_speaker:
         raise HTTPException(
             status_code=404,
             detail="A speaker user with this id does not exist in the system...",
         )
+    # only a changed email has to be checked (the unchanged one is the speaker's own)
+    if (speaker_in.email and speaker_in.email != db_speaker.email
+            and await crud.user.email_exists(db, speaker_in.email)):
+        raise HTTPException(
+            status_code=400, detail="A user with this email already exists in the system...")
     return await crud.speaker.update(db, db_obj=db_speaker, obj_in=speaker_in)
@@ -2,12 +2,14 @@ from typing import Any
 
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic.networks import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
 from app.core.config import settings
+from app.utils import json_utils
 
 router = APIRouter()
 
@@ -16,15 +18,23 @@ router = APIRouter()
 async def read_all_users(
     db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int | None = None,
+    stream: bool = False,
     current_user: models.User = Depends(deps.get_current_active_admin_user),
 ) -> Any:
     """
     Read all users in db.
     Returns only users (base table) common fields.
+    With stream=true, the JSON array is streamed (rows fetched by chunks from a db server-side cursor) : memory does
+    not depend on the limit, e.g. to read them all at once from an admin tool.
+    The limit is 100 by default, but a streamed array is not limited by default (all rows after skip).
     **Allowed for admin user only.**
     """
-    return await crud.user.get_multi(db, skip=skip, limit=limit)
+    if stream:
+        rows = await crud.user.stream_multi(db, skip=skip, limit=limit)
+        return StreamingResponse(json_utils.stream_json_list(rows, await crud.user.json_serializer(db)),
+                                 media_type="application/json")
+    return await crud.user.get_multi(db, skip=skip, limit=100 if limit is None else limit)
 
 
 @router.get("/me", response_model=schemas.User)
@@ -60,7 +70,8 @@ async def update_user_me(
     if last_name is not None:
         user_in.last_name = last_name
     if email is not None:
-        if await crud.user.get_by_email(db, email=email):
+        # only a changed email has to be checked (the unchanged one is the user's own)
+        if email != current_user.email and await crud.user.email_exists(db, email):
             raise HTTPException(status_code=400, detail="A user with this email already exists in the system...")
         user_in.email = email
     return await crud.user.update(db, db_obj=current_user, obj_in=user_in)
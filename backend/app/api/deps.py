@@ -1,4 +1,7 @@
-from fastapi import Depends, HTTPException, status
+from typing import Any, Callable, Coroutine
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -7,7 +10,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app import crud, models, schemas
 from app.core import security
 from app.core.config import settings
+from app.crud.base import end_unit_of_work, start_unit_of_work
 from app.db.db_session import AsyncSessionLocal
+from app.utils.http_utils import NotModified, etag_matches, version_etag
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -19,6 +24,40 @@ async def get_async_db():
         yield async_session
 
 
+async def get_transactional_db(request: Request, db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    """
+    The request db session (the same as get_async_db() one, e.g. for the current user) in one transaction
+    for the whole request : the CRUD writes are only flushed (see crud.base.unit_of_work()) and committed once
+    when the endpoint returns, or all rolled back if it raises (e.g. a failed check after some writes).
+    Only for the endpoints of a TransactionalRoute router, which ends the transaction before the response is sent.
+    """
+    if not getattr(request.state, "transactional_route", False):
+        raise RuntimeError("get_transactional_db() needs an APIRouter(route_class=deps.TransactionalRoute)")
+    if start_unit_of_work(db):
+        request.state.unit_of_work_db = db
+    return db
+
+
+class TransactionalRoute(APIRoute):
+    """Ends the unit of work of the endpoints using get_transactional_db() (the other ones are left unchanged)."""
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def transactional_route_handler(request: Request) -> Response:
+            request.state.transactional_route = True
+            try:
+                response = await route_handler(request)
+            except BaseException:
+                if getattr(request.state, "unit_of_work_db", None) is not None:
+                    await end_unit_of_work(request.state.unit_of_work_db, commit=False)
+                raise
+            if getattr(request.state, "unit_of_work_db", None) is not None:
+                await end_unit_of_work(request.state.unit_of_work_db, commit=True)
+            return response
+
+        return transactional_route_handler
+
+
 async def check_jwt_and_get_current_user(
     db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
 ) -> models.User:
@@ -50,19 +89,21 @@ async def get_current_active_user(
 
 
 async def get_current_active_speaker_or_admin_user(
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_active_user),
 ) -> models.User:
     if not await crud.user.is_speaker(current_user) and not await crud.user.is_admin(current_user):
         raise HTTPException(status_code=400, detail="To do this, the user has to be a Speaker or Admin user")
-    return current_user
+    return await crud.user.load_profile(db, current_user)
 
 
 async def get_current_active_speaker_or_participant_user(
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_active_user),
 ) -> models.User:
     if not await crud.user.is_speaker(current_user) and not await crud.user.is_participant(current_user):
         raise HTTPException(status_code=400, detail="To do this, the user has to be a Speaker or Participant user")
-    return current_user
+    return await crud.user.load_profile(db, current_user)
 
 
 async def get_current_active_admin_user(
@@ -76,10 +117,25 @@ async def get_current_active_admin_user(
 
 
 async def get_current_active_speaker_user(
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(check_jwt_and_get_current_user),
 ) -> models.User:
     if not await crud.user.is_speaker(current_user):
         raise HTTPException(
             status_code=400, detail="To do this, the user has to be a Speaker user"
         )
-    return current_user
+    return await crud.user.load_profile(db, current_user)
+
+
+async def check_not_modified(db: AsyncSession, request: Request, response: Response,
+                             current_user: models.User, scopes: list[str]) -> None:
+    """
+    To call first in read-mostly endpoints : the ETag is built from the scopes versions (one small query, see
+    crud_change_counter.py), the current user and the url. If the client already has it (If-None-Match),
+    NotModified is raised so the endpoint answers 304 without running its queries nor serializing anything.
+    """
+    etag = version_etag(await crud.change_counter.get_versions(db, scopes), current_user.id, request.url.path,
+                        request.url.query)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
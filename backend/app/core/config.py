@@ -22,6 +22,13 @@ class Settings(BaseSettings):
     # "http://localhost:8080", "http://local.dockertoolbox.tiangolo.com"]'
     BACKEND_CORS_ORIGINS: list[AnyHttpUrl] = []
     USERS_OPEN_REGISTRATION: bool = True
+    STREAM_YIELD_PER: int = 1000  # rows fetched at once from db server-side cursors (streamed responses)
+    DEBUG: bool = False  # e.g. to send db queries stats as response headers (see db/query_stats.py)
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD: int = 5  # same statement executed this number of times in 1 request = N+1
+    JOBS_CONCURRENCY: int = 4  # background jobs (e.g. emails) run at once, see core/jobs.py
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_RETRY_DELAY: float = 5  # seconds before the 1st retry of a failed job, doubled at each next retry
+    JOBS_SQLITE_PATH: str = None  # to keep the queued jobs (until done) in this SQLite file, e.g. "jobs.sqlite"
 
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v: str | list[str]) -> list[str] | str:
@@ -62,8 +69,12 @@ class Settings(BaseSettings):
     PARTICIPANT_STATUS: list[str] = [PARTICIPANT_STATUS_DEFAULT_VALUE, "break", "inactive"]
 
     SESSION_TYPES: list[str] = ["teach", "test"]
-    SESSION_STATUS: list[str] = ["scheduled", "done", "unscheduled by participant",
-                                 "unscheduled by speaker", "no-show"]
+    SESSION_STATUS_SCHEDULED = "scheduled"
+    SESSION_STATUS_DONE = "done"
+    SESSION_STATUS_NO_SHOW = "no-show"
+    SESSION_STATUS_UNSCHEDULED: list[str] = ["unscheduled by participant", "unscheduled by speaker"]
+    SESSION_STATUS: list[str] = [SESSION_STATUS_SCHEDULED, SESSION_STATUS_DONE, *SESSION_STATUS_UNSCHEDULED,
+                                 SESSION_STATUS_NO_SHOW]
 
     SMTP_TLS: bool = True
     SMTP_LOCAL_PORT: int = 1025
@@ -77,6 +88,9 @@ class Settings(BaseSettings):
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 12
     EMAIL_TEMPLATES_DIR: Path = Path(TEMPLATES_DIR) / "email-templates/"
     EMAILS_ENABLED: bool = False
+    SMTP_POOL_SIZE: int = 4  # SMTP connections (and threads) to send emails batches, e.g. the reminders
+    REMINDERS_ENABLED: bool = False  # to send the reminders from this app instance (only one), see send_reminders.py
+    REMINDERS_HOURS_AHEAD: int = 24  # reminders are sent for the sessions of the next hours, every this hours
 
     @validator("EMAILS_ENABLED", pre=True)
     def get_emails_enabled(cls, v: bool, values: dict[str, Any]) -> bool:
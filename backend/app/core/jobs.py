@@ -0,0 +1,205 @@
+"""
+In-process background jobs (e.g. emails sending), to keep slow side effects off the requests latency :
+a job is a registered function enqueued by name with a JSON-able payload (its keyword arguments), then run by worker
+tasks of the app event loop (JOBS_CONCURRENCY jobs at most at once), the sync ones (e.g. SMTP) in threads.
+A failed job is retried (JOBS_MAX_ATTEMPTS times, with a doubling delay) and a job whose dedup_key is already queued
+(or running) is dropped. The jobs of a db transaction are only enqueued once it is committed
+(see enqueue_after_commit()).
+If JOBS_SQLITE_PATH is set, the queued jobs are also kept in this local SQLite file (opened by runner.start())
+until done, so those of a stopped (or crashed) app are run again at the next start.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOBS_AFTER_COMMIT = "jobs_after_commit"  # db.info key of the jobs waiting for the transaction commit
+
+
+@dataclass
+class Job:
+    name: str
+    payload: dict[str, Any]
+    dedup_key: str | None = None
+    attempts: int = 0
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+class SQLiteJobStore:
+    """Queued jobs kept in a local SQLite file (small writes, WAL journal : fast enough to be done from the loop)."""
+
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS job (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+                                "payload TEXT NOT NULL, dedup_key TEXT, attempts INTEGER NOT NULL)")
+
+    def add(self, job: Job) -> None:
+        self.connection.execute("INSERT OR REPLACE INTO job VALUES (?, ?, ?, ?, ?)",
+                                (job.id, job.name, json.dumps(job.payload), job.dedup_key, job.attempts))
+
+    def remove(self, job: Job) -> None:
+        self.connection.execute("DELETE FROM job WHERE id = ?", (job.id,))
+
+    def pending(self) -> list[Job]:
+        rows = self.connection.execute("SELECT name, payload, dedup_key, attempts, id FROM job ORDER BY rowid")
+        return [Job(name, json.loads(payload), dedup_key, attempts, id) for name, payload, dedup_key, attempts, id
+                in rows]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class JobRunner:
+    def __init__(self, concurrency: int = settings.JOBS_CONCURRENCY, max_attempts: int = settings.JOBS_MAX_ATTEMPTS,
+                 retry_delay: float = settings.JOBS_RETRY_DELAY, store: SQLiteJobStore | None = None,
+                 store_path: str | None = None) -> None:
+        """store_path : of the SQLite store to open (if no store) when started, not when created (e.g. imported)."""
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.store = store
+        self.store_path = store_path
+        self.jobs: dict[str, Callable[..., Any]] = {}
+        self.queue: asyncio.Queue[Job] = asyncio.Queue()
+        self.dedup_keys: set[str] = set()
+        self.workers: list[asyncio.Task] = []
+        self.retries: dict[str, asyncio.TimerHandle] = {}  # by job id, the delayed retries not queued yet
+
+    def register(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Decorator : the function can then be enqueued by its name."""
+        self.jobs[func.__name__] = func
+        return func
+
+    def enqueue(self, name: str, payload: dict[str, Any] | None = None, *, dedup_key: str | None = None) -> Job | None:
+        """The queued job, or None if a job with the same dedup_key is already queued or running."""
+        self.check_registered(name)
+        if dedup_key is not None and dedup_key in self.dedup_keys:
+            metrics.JOBS_TOTAL.inc(job=name, status="deduplicated")
+            return None
+        job = Job(name, payload or {}, dedup_key)
+        if self.store is not None:
+            self.store.add(job)
+        self.put(job)
+        return job
+
+    def check_registered(self, name: str) -> None:
+        if name not in self.jobs:
+            raise KeyError(f"{name} is not a registered job")
+
+    def put(self, job: Job) -> None:
+        if job.dedup_key is not None:
+            self.dedup_keys.add(job.dedup_key)
+        self.queue.put_nowait(job)
+        metrics.JOBS_QUEUED.set(self.queue.qsize())
+
+    async def start(self) -> None:
+        """Start the workers (after having queued again the stored jobs)."""
+        if self.store is None and self.store_path:
+            self.store = SQLiteJobStore(self.store_path)
+        if self.store is not None:
+            for job in self.store.pending():
+                self.put(job)
+        self.workers = [asyncio.create_task(self.work()) for _ in range(self.concurrency)]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Wait (timeout at most) for the queued jobs to be done, then stop the workers and cancel the delayed retries.
+        Stored jobs are kept.
+        """
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%s jobs still queued when stopping", self.queue.qsize())
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        for handle in self.retries.values():
+            handle.cancel()
+        self.retries.clear()
+
+    async def work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            metrics.JOBS_QUEUED.set(self.queue.qsize())
+            try:
+                await self.run(job)
+            finally:
+                self.queue.task_done()
+
+    def retry(self, job: Job) -> None:
+        del self.retries[job.id]
+        self.put(job)
+
+    async def run(self, job: Job) -> None:
+        func = self.jobs.get(job.name)
+        if func is None:  # e.g. a stored job of a function since renamed or removed
+            logger.error("Job %s (%s) is not registered, dropped", job.name, job.id)
+            metrics.JOBS_TOTAL.inc(job=job.name, status="failed")
+            self.done(job)
+            return
+        job.attempts += 1
+        status = "ok"
+        with metrics.JOB_DURATION.time(job=job.name):
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    await func(**job.payload)
+                else:
+                    await asyncio.to_thread(func, **job.payload)
+            except Exception:
+                status = "retry" if job.attempts < self.max_attempts else "failed"
+                logger.exception("Job %s (%s) failed, attempt %s/%s", job.name, job.id, job.attempts,
+                                 self.max_attempts)
+        metrics.JOBS_TOTAL.inc(job=job.name, status=status)
+        if status == "retry":
+            if self.store is not None:
+                self.store.add(job)
+            self.retries[job.id] = asyncio.get_running_loop().call_later(
+                self.retry_delay * 2 ** (job.attempts - 1), self.retry, job)
+            return
+        self.done(job)
+
+    def done(self, job: Job) -> None:
+        """The job is not to run (again) : its dedup_key is released and it is removed from the store."""
+        self.dedup_keys.discard(job.dedup_key)
+        if self.store is not None:
+            self.store.remove(job)
+
+
+runner = JobRunner(store_path=settings.JOBS_SQLITE_PATH)
+
+
+def enqueue_after_commit(db: AsyncSession, name: str, payload: dict[str, Any] | None = None, *,
+                         dedup_key: str | None = None) -> None:
+    """
+    Enqueue the job (in runner) once the db transaction is committed, e.g. at the end of a unit of work
+    (see crud/base.py), so that it never runs for rolled back writes (the job is then dropped).
+    """
+    runner.check_registered(name)
+    db.info.setdefault(JOBS_AFTER_COMMIT, []).append((name, payload, dedup_key))
+
+
+@event.listens_for(Session, "after_commit")
+def enqueue_committed_jobs(session: Session) -> None:
+    for name, payload, dedup_key in session.info.pop(JOBS_AFTER_COMMIT, ()):
+        runner.enqueue(name, payload, dedup_key=dedup_key)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_rolled_back_jobs(session: Session) -> None:
+    session.info.pop(JOBS_AFTER_COMMIT, None)
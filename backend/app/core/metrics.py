@@ -0,0 +1,196 @@
+"""
+In-process metrics exported in the Prometheus text format by the /metrics endpoint (see main.py),
+without any external service nor package : requests latency by route, db pool checkout wait and size,
+api key (bcrypt) verification time, SMTP sending time, event loop lag, db queries by route and background jobs.
+"""
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.lock = threading.Lock()  # some values are observed from threads (e.g. bcrypt, SMTP)
+        registry.append(self)
+
+    def labels_key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        """The (sample name, labels, value) to render."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines += [f"{name}{format_labels(labels)} {format_value(value)}" for name, labels, value in self.samples()]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self.labels_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for key, value in list(self.values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Metric):
+    """Gauge whose values are set, or read from a callback when rendered (returning {labels values: value})."""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 callback: Callable[[], dict[tuple[str, ...], float]] = None) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[self.labels_key(labels)] = value
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        values = self.callback() if self.callback else self.values
+        for key, value in list(values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = sorted(buckets)
+        self.counts: dict[tuple[str, ...], list[int]] = {}  # by bucket (not cumulative), last one is +Inf
+        self.sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self.labels_key(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self.lock:
+            counts = self.counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self.sums[key] = self.sums.get(key, 0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for key, counts in list(self.counts.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip([*self.buckets, float("inf")], counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": "+Inf" if bound == float("inf") else f"{bound:g}"}, \
+                    cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, self.sums[key]
+
+
+registry: list[Metric] = []
+
+
+def render() -> str:
+    return "".join(metric.render() for metric in registry)
+
+
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "HTTP requests latency by route.",
+                             ("method", "route", "status"))
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being processed.")
+DB_POOL_CHECKOUT_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time waited to get a db connection from the pool.",
+                                  buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+PASSWORD_VERIFY_DURATION = Histogram("password_verify_seconds", "Api keys hashes (bcrypt) verification time.",
+                                     buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0))
+SMTP_SEND_DURATION = Histogram("smtp_send_seconds", "Emails sending time (connection, login and sending).",
+                               ("status",), buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+JOBS_TOTAL = Counter("jobs_total", "Background jobs runs (ok, retry, failed) and dropped duplicates.",
+                     ("job", "status"))
+JOBS_QUEUED = Gauge("jobs_queued", "Background jobs waiting for a worker.")
+JOB_DURATION = Histogram("job_duration_seconds", "Background jobs running time.", ("job",),
+                         buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "Event loop delay to wake up a sleeping task.",
+                           buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+
+
+def get_route_name(scope: Scope) -> str:
+    """The matched route path template (e.g. /api/v1/sessions/{id}) to not have one serie by id."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or ("unmatched" if scope.get("endpoint") is None else scope["path"])
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware measuring the http requests latency (until the response body is fully sent)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.in_progress = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        self.in_progress += 1
+        REQUESTS_IN_PROGRESS.set(self.in_progress)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - start, method=scope["method"],
+                                     route=get_route_name(scope), status=status)
+            self.in_progress -= 1
+            REQUESTS_IN_PROGRESS.set(self.in_progress)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """To run as a background task : how late the loop wakes up this task is the time it was blocked/busy."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0))
@@ -5,6 +5,7 @@ from jose import jwt
 
 from passlib.context import CryptContext
 
+from app.core import metrics
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -25,7 +26,8 @@ def create_access_token(subject: str | Any, expires_delta: dt.timedelta = None)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with metrics.PASSWORD_VERIFY_DURATION.time():
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -9,3 +9,6 @@ from app.crud.session.crud_session_status import session_status  # noqa
 from app.crud.session.crud_session import session  # noqa
 from app.crud.crud_availability import availability  # noqa
 from app.crud.crud_reservation import reservation  # noqa
+from app.crud.crud_speaker_week_stats import speaker_week_stats  # noqa
+from app.crud.crud_change_counter import change_counter  # noqa
+from app.crud.crud_watermark import watermark  # noqa
@@ -1,17 +1,89 @@
-from typing import Any, Generic, Type, TypeVar
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Generic, Sequence, Type, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy import inspect, select
+from sqlalchemy.sql import Select
 
+from app.core.config import settings
 from app.db.base_class import Base
+from app import crud
+from app.utils import json_utils
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+UNIT_OF_WORK = "unit_of_work"  # db.info flag set inside unit_of_work() blocks
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Group several CRUD writes in one transaction : inside the block they are only flushed (the new objects get
+    their ids from INSERT ... RETURNING), then committed once at the end of the block, or all rolled back if it
+    raises. A nested block is part of the outermost one.
+    """
+    if not start_unit_of_work(db):
+        yield db
+        return
+    try:
+        yield db
+    except BaseException:
+        await end_unit_of_work(db, commit=False)
+        raise
+    await end_unit_of_work(db, commit=True)
+
+
+def start_unit_of_work(db: AsyncSession) -> bool:
+    """False if db is already in a unit of work (which then has to be ended by its starter only)."""
+    if db.info.get(UNIT_OF_WORK):
+        return False
+    db.info[UNIT_OF_WORK] = True
+    return True
+
+
+async def end_unit_of_work(db: AsyncSession, *, commit: bool) -> None:
+    try:
+        if commit:
+            await db.commit()
+        else:
+            await db.rollback()
+    finally:
+        del db.info[UNIT_OF_WORK]
+
+
+async def save(db: AsyncSession) -> None:
+    """
+    End a CRUD write : commit (or only flush inside a unit_of_work() block).
+    No refresh() after : the sessions don't expire on commit and the ids come back with the INSERT (RETURNING),
+    so the written objects are up to date without another SELECT.
+    """
+    if db.info.get(UNIT_OF_WORK):
+        await db.flush()
+    else:
+        await db.commit()
+
+
+async def fetch_all(db: AsyncSession, query: Select, *, rows: bool = False) -> list[Any]:
+    """All the results of query : the ORM objects, or its rows if rows=True (see CRUDBase.select_entities())."""
+    result = await db.execute(query)
+    return result.all() if rows else result.scalars().all()
+
+
+def set_columns(db_obj: Base, data: dict[str, Any]) -> None:
+    """Set the db_obj mapped columns (of its own class, e.g. a Speaker's ones for a User) which are in data."""
+    for field in inspect(db_obj).mapper.column_attrs.keys():
+        if field in data:
+            setattr(db_obj, field, data[field])
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    version_scope: str | None = None
+    row_fields: Sequence[str] | None = None  # the columns of the rows mode (all the model ones if None)
+
     def __init__(self, model: Type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -21,13 +93,43 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    async def get_version_scopes(self, db: AsyncSession, db_obj: ModelType) -> set[str]:
+        """
+        Version stamps scopes (see crud_change_counter.py) to bump when db_obj is created/updated/removed.
+        By default only the version_scope (if set) of the whole table, e.g. for the types/status lists.
+        """
+        return {self.version_scope} if self.version_scope else set()
+
+    def select_entities(self, rows: bool = False) -> Select:
+        """
+        select(self.model), or with rows=True (rows mode) select only the row_fields columns : the results are then
+        Row named tuples (the fields as attributes), not ORM objects, so there is no identity map, instance state
+        nor relationships to build. For the read only lists, e.g. serialized right away (see utils/json_utils.py).
+        """
+        if not rows:
+            return select(self.model)
+        fields = self.row_fields or inspect(self.model).column_attrs.keys()
+        return select(*(getattr(self.model, field) for field in fields))
+
     async def get(self, db: AsyncSession, id: Any) -> ModelType | None:
         return await db.get(self.model, id)
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
-    ) -> list[ModelType]:
-        return (await db.execute(select(self.model).offset(skip).limit(limit))).scalars().all()
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, rows: bool = False
+    ) -> list[ModelType] | list[Row]:
+        return await fetch_all(db, self.select_entities(rows).offset(skip).limit(limit), rows=rows)
+
+    async def stream_multi(self, db: AsyncSession, *, skip: int = 0, limit: int | None = None) -> AsyncResult:
+        """Stream (server-side cursor) the rows mode rows, e.g. for a streamed JSON list (see json_serializer())."""
+        return await db.stream(self.select_entities(rows=True).offset(skip).limit(limit)
+                               .execution_options(yield_per=settings.STREAM_YIELD_PER))
+
+    async def json_serializer(self, db: AsyncSession) -> Callable[[Any], dict[str, Any]]:
+        """
+        Serializer of a row (or an object) into a JSON ready dict (see utils/json_utils.py), by default the dict of its
+        row_fields. To override if the returned schema has fields which are not columns (e.g. names read from db).
+        """
+        return json_utils.fields_serializer(self.row_fields or inspect(self.model).column_attrs.keys())
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         if isinstance(obj_in, dict):
@@ -36,8 +138,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await crud.change_counter.bump(db, await self.get_version_scopes(db, db_obj))
+        await save(db)
         return db_obj
 
     async def update(
@@ -47,21 +149,20 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: UpdateSchemaType | dict[str, Any]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        scopes = await self.get_version_scopes(db, db_obj)
+        set_columns(db_obj, update_data)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await crud.change_counter.bump(db, scopes | await self.get_version_scopes(db, db_obj))
+        await save(db)
         return db_obj
 
     async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
         obj = await db.get(self.model, id)
+        await crud.change_counter.bump(db, await self.get_version_scopes(db, obj))
         await db.delete(obj)
-        await db.commit()
+        await save(db)
         return obj
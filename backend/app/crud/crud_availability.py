@@ -1,19 +1,28 @@
 import datetime as dt
 from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncResult
 from sqlalchemy import select
 from fastapi.encoders import jsonable_encoder
 
 
-from app.crud.base import CRUDBase
-from app import crud
-from app.utils import subtract_time, add_time
+from app.crud.base import CRUDBase, fetch_all, save, set_columns
+from app import crud, scheduling
+from app.core.config import settings
 from app.models import Availability
 from app.schemas import AvailabilityCreate, AvailabilityUpdate
+from app.schemas import Availability as AvailabilitySchema
+from app.utils import json_utils
 
 
 class CRUDAvailability(CRUDBase[Availability, AvailabilityCreate, AvailabilityUpdate]):
+    row_fields = json_utils.schema_fields(AvailabilitySchema)
+    json_fields = staticmethod(json_utils.fields_serializer(row_fields))
+
+    async def get_version_scopes(self, db: AsyncSession, db_obj: Availability) -> set[str]:
+        return {crud.change_counter.speaker_scope(db_obj.speaker_id)}
+
     async def create(self, db: AsyncSession, *, obj_in: AvailabilityCreate, speaker_id: int) -> Availability:
         if isinstance(obj_in, dict):
             obj_in_data = obj_in
@@ -25,47 +34,57 @@ class CRUDAvailability(CRUDBase[Availability, AvailabilityCreate, AvailabilityUp
             ("time", dt.time.fromisoformat(obj_in_data["time"])),
             ("speaker_id", speaker_id)
         ])
+        await crud.speaker_week_stats.apply_availabilities(db, speaker_id=speaker_id, added=[
+            (obj_in_data["start_date"], obj_in_data["end_date"], obj_in_data["week_day"])])
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await crud.change_counter.bump(db, await self.get_version_scopes(db, db_obj))
+        await save(db)
         return db_obj
 
     async def update(self, db: AsyncSession, *, db_obj: Availability,
                      obj_in: AvailabilityUpdate | dict[str, Any]) -> Availability:
-
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        old_stats_key = (db_obj.start_date, db_obj.end_date, db_obj.week_day)
+        new_stats_key = (update_data.get("start_date") or db_obj.start_date,
+                         update_data.get("end_date") or db_obj.end_date,
+                         db_obj.week_day if update_data.get("week_day") is None else update_data["week_day"])
+        if new_stats_key != old_stats_key:
+            await crud.speaker_week_stats.apply_availabilities(db, speaker_id=db_obj.speaker_id,
+                                                               added=[new_stats_key], removed=[old_stats_key])
+        set_columns(db_obj, update_data)
 
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await crud.change_counter.bump(db, await self.get_version_scopes(db, db_obj))
+        await save(db)
         return db_obj
 
+    async def remove(self, db: AsyncSession, *, id: int) -> Availability:
+        db_obj = await db.get(self.model, id)
+        await crud.speaker_week_stats.apply_availabilities(db, speaker_id=db_obj.speaker_id, removed=[
+            (db_obj.start_date, db_obj.end_date, db_obj.week_day)])
+        return await super().remove(db, id=id)
+
     async def is_start_before_end_date(self, start_date: dt.date, end_date: dt.date) -> bool:
         return start_date <= end_date
 
     async def is_a_good_weekday_int(self, start_date: dt.date, end_date: dt.date, weekday_int: int) -> bool:
-        if (end_date - start_date) < dt.timedelta(days=6):
-            date_to_check = start_date
-            while date_to_check <= end_date:
-                if date_to_check.weekday() == weekday_int:
-                    return True
-                elif date_to_check == end_date:
-                    return False
-                else:
-                    date_to_check += dt.timedelta(days=1)
-        return True
-
-    async def get_by_speaker(self, db: AsyncSession, speaker_id: int) -> list[Availability]:
-        return (await db.execute(select(self.model)
-                                 .where(self.model.speaker_id == speaker_id))).scalars().all()
+        return scheduling.has_weekday_in_period(start_date, end_date, weekday_int)
+
+    async def get_by_speaker(self, db: AsyncSession, speaker_id: int, *,
+                             rows: bool = False) -> list[Availability] | list[Row]:
+        return await fetch_all(db, self.select_entities(rows).where(self.model.speaker_id == speaker_id), rows=rows)
+
+    async def stream_by_speaker(self, db: AsyncSession, speaker_id: int) -> AsyncResult:
+        """Stream (server-side cursor) all speaker's availabilities, e.g. to build a calendar."""
+        return await db.stream(select(self.model.id, self.model.start_date, self.model.end_date,
+                                      self.model.week_day, self.model.time)
+                               .where(self.model.speaker_id == speaker_id)
+                               .order_by(self.model.start_date, self.model.time)
+                               .execution_options(yield_per=settings.STREAM_YIELD_PER))
 
     async def get_all_around_date_same_weekday_speaker(self, db: AsyncSession,
                                                        speaker_id: int, date: dt.date) -> list[Availability]:
@@ -94,6 +113,17 @@ class CRUDAvailability(CRUDBase[Availability, AvailabilityCreate, AvailabilityUp
                                         self.model.end_date >= date,
                                         self.model.time == time))).scalar_one_or_none()
 
+    async def get_all_in_period_speaker(self, db: AsyncSession, speaker_id: int, start_date: dt.date,
+                                        end_date: dt.date) -> list[Availability]:
+        """
+        Return all speaker's availabilities which overlap the period from start_date to end_date.
+        Useful to check many sessions at once (see CRUDSpeaker.get_not_free_sessions_in()).
+        """
+        return (await db.execute(select(self.model)
+                                 .where(self.model.speaker_id == speaker_id,
+                                        self.model.start_date <= end_date,
+                                        self.model.end_date >= start_date))).scalars().all()
+
     async def get_times_list_by_date_speaker(self, db: AsyncSession, speaker_id: int, date: dt.date,
                                              ) -> list[Availability]:
         """
@@ -105,7 +135,6 @@ class CRUDAvailability(CRUDBase[Availability, AvailabilityCreate, AvailabilityUp
                                           time: dt.time, speaker_id: int) -> list[Availability]:
         """
         Return all speaker's availabilities that correspond to the weekday and time.
-        Useful to then compare with a period... see is_same_weekday_time_period_speaker() below.
         """
         return (await db.execute(select(self.model)
                                  .where(self.model.speaker_id == speaker_id,
@@ -115,12 +144,15 @@ class CRUDAvailability(CRUDBase[Availability, AvailabilityCreate, AvailabilityUp
     async def get_by_weekday_speaker(self, db: AsyncSession, week_day: int, speaker_id: int) -> list[Availability]:
         """
         Return all speaker's availabilities that correspond to the weekday.
-        Useful to then compare with a period... see is_same_weekday_period_speaker() below.
         """
         return (await db.execute(select(self.model)
                                  .where(self.model.speaker_id == speaker_id,
                                         self.model.week_day == week_day))).scalars().all()
 
+    async def get_scheduling_snapshot(self, db: AsyncSession, speaker_id: int) -> scheduling.SpeakerSnapshot:
+        """All speaker's availabilities, to check the ones to create (see the methods below)."""
+        return await crud.speaker.get_scheduling_snapshot(db, await crud.speaker.get(db, id=speaker_id))
+
     async def is_same_weekday_time_period_speaker(self, db: AsyncSession, *, speaker_id: int,
                                                   obj_in: AvailabilityCreate) -> bool:
         """
@@ -129,15 +161,8 @@ class CRUDAvailability(CRUDBase[Availability, AvailabilityCreate, AvailabilityUp
         between start & end date.
         Returns True if at least 1 availability exists... the obj_in can't be created.
         """
-        db_avails = await self.get_by_weekday_time_speaker(db, obj_in.week_day, obj_in.time, speaker_id)
-        for av in db_avails:
-            if obj_in.start_date <= av.end_date:
-                if obj_in.start_date >= av.start_date:
-                    return True
-                else:
-                    if obj_in.end_date >= av.start_date:
-                        return True
-        return False
+        return scheduling.is_same_weekday_time_period(await self.get_scheduling_snapshot(db, speaker_id),
+                                                      self.to_rule(obj_in))
 
     async def is_same_weekday_period_speaker(self, db: AsyncSession, *, speaker_id: int,
                                              obj_in: AvailabilityCreate) -> bool:
@@ -149,49 +174,32 @@ class CRUDAvailability(CRUDBase[Availability, AvailabilityCreate, AvailabilityUp
         *Used by has_too_close_previous/next methods below to check if the obj_in can be created
         without overlaping (or being overlapped by) another availability.*
         """
-        db_avails = await self.get_by_weekday_speaker(db, obj_in.week_day, speaker_id)
-        for av in db_avails:
-            if obj_in.start_date <= av.end_date:
-                if obj_in.start_date >= av.start_date:
-                    return True
-                else:
-                    if obj_in.end_date >= av.start_date:
-                        return True
-        return False
+        return scheduling.is_same_weekday_period(await self.get_scheduling_snapshot(db, speaker_id),
+                                                 self.to_rule(obj_in))
 
     async def has_too_close_previous(self, db: AsyncSession, *, speaker_id: int,
-                                     obj_in: AvailabilityCreate) -> Availability | None:
+                                     obj_in: AvailabilityCreate) -> bool:
         """
         Checks if the most close previous availability is at least 1 speaker's slot_time before the one to create.
         """
-        speaker = await crud.speaker.get(db, id=speaker_id)
-        if await self.is_same_weekday_period_speaker(db, speaker_id=speaker.id, obj_in=obj_in):
-            avails = await self.get_by_weekday_speaker(db, obj_in.week_day, speaker_id)
-            # Calculate the time of the closest possible previous availability that would allow to create this obj_in
-            # # No matter the date to calculate the time
-            closest_possible_prev_time = subtract_time(date=dt.date.today(), time=obj_in.time,
-                                                       minutes_to_subtract=speaker.slot_time)
-            for av in avails:
-                if av.time > closest_possible_prev_time and av.time < obj_in.time:
-                    return True
-        return False
+        return scheduling.has_too_close_previous(await self.get_scheduling_snapshot(db, speaker_id),
+                                                 self.to_rule(obj_in))
 
     async def has_too_close_next(self, db: AsyncSession, *, speaker_id: int,
-                                 obj_in: AvailabilityCreate) -> Availability | None:
+                                 obj_in: AvailabilityCreate) -> bool:
         """
         Checks if the most close next availability is at least 1 speaker's slot_time after the one to create.
         """
-        speaker = await crud.speaker.get(db, id=speaker_id)
-        if await self.is_same_weekday_period_speaker(db, speaker_id=speaker.id, obj_in=obj_in):
-            avails = await self.get_by_weekday_speaker(db, obj_in.week_day, speaker_id)
-            # Calculate the time of the closest possible next availability that would allow to create this obj_in
-            # No matter the date to calculate the time
-            closest_possible_next_time = add_time(date=dt.date.today(), time=obj_in.time,
-                                                  minutes_to_add=speaker.slot_time)
-            for av in avails:
-                if av.time < closest_possible_next_time and av.time > obj_in.time:
-                    return True
-        return False
+        return scheduling.has_too_close_next(await self.get_scheduling_snapshot(db, speaker_id),
+                                             self.to_rule(obj_in))
+
+    def to_json_list(self, db_objs: list[Availability] | list[Row]) -> list[dict[str, Any]]:
+        """JSON ready dicts of schemas.Availability, for a FastJSONResponse (no schema built)."""
+        return [self.json_fields(db_obj) for db_obj in db_objs]
+
+    @staticmethod
+    def to_rule(obj_in: AvailabilityCreate) -> scheduling.AvailabilityRule:
+        return scheduling.AvailabilityRule(None, obj_in.start_date, obj_in.end_date, obj_in.week_day, obj_in.time)
 
 
 availability = CRUDAvailability(Availability)
@@ -0,0 +1,40 @@
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import ChangeCounter
+
+
+class CRUDChangeCounter:
+    """
+    Version stamps by resource scope, used as ETag by read-mostly endpoints (see api/deps.py check_not_modified())
+    so they can answer 304 without running their queries.
+    Scopes are bumped by CRUD writing methods (see CRUDBase.get_version_scopes()) in the same transaction.
+    """
+    def __init__(self, model: type[ChangeCounter]):
+        self.model = model
+
+    @staticmethod
+    def speaker_scope(speaker_id: int) -> str:
+        """Scope of all speaker's availabilities and sessions (and so of his participants' sessions)."""
+        return f"speaker:{speaker_id}"
+
+    async def get_versions(self, db: AsyncSession, scopes: list[str]) -> list[int]:
+        """Return the scopes versions (0 if never bumped) in the scopes order, with only one query."""
+        versions = dict((await db.execute(select(self.model.scope, self.model.version)
+                                          .where(self.model.scope.in_(scopes)))).all())
+        return [versions.get(scope, 0) for scope in scopes]
+
+    async def bump(self, db: AsyncSession, scopes: Iterable[str]) -> None:
+        """Increment the scopes versions (without commit) with only one INSERT ... ON CONFLICT DO UPDATE query."""
+        scopes = sorted(set(scopes))  # always the same rows locking order
+        if not scopes:
+            return
+        await db.execute(insert(self.model).values([{"scope": scope, "version": 1} for scope in scopes])
+                         .on_conflict_do_update(index_elements=[self.model.scope],
+                                                set_={"version": self.model.version + 1}))
+
+
+change_counter = CRUDChangeCounter(ChangeCounter)
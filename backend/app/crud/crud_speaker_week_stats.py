@@ -0,0 +1,147 @@
+import datetime as dt
+from collections import Counter, defaultdict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.crud.base import CRUDBase, save
+from app import crud
+from app.core.config import settings
+from app.utils import get_week_start, weekday_ordinals
+from app.models import Session, SpeakerWeekStats, SessionStatus
+from app.schemas import SpeakerWeekStatsInDB
+
+COUNTERS = ("available_slots", "booked_slots", "done", "no_show")
+
+
+def count_session(delta: Counter, status_name: str, nb_session_week: int, sign: int) -> None:
+    """Count (sign 1) or uncount (sign -1) a session in its week delta : a booked one counts nb_session_week slots."""
+    if status_name not in settings.SESSION_STATUS_UNSCHEDULED:
+        delta["booked_slots"] += sign * nb_session_week
+    if status_name == settings.SESSION_STATUS_DONE:
+        delta["done"] += sign
+    elif status_name == settings.SESSION_STATUS_NO_SHOW:
+        delta["no_show"] += sign
+
+
+class CRUDSpeakerWeekStats(CRUDBase[SpeakerWeekStats, SpeakerWeekStatsInDB, SpeakerWeekStatsInDB]):
+    """
+    Counters are updated incrementally (without commit : in the same transaction as the session/availability
+    writing) by CRUDSession, CRUDAvailability and CRUDParticipant (for a participant's type or speaker change).
+    """
+    async def get_multi_by_period_speaker(self, db: AsyncSession, *, speaker_id: int = None,
+                                          start_date: dt.date = None, end_date: dt.date = None,
+                                          skip: int = 0, limit: int = 100) -> list[SpeakerWeekStats]:
+        query = select(self.model)
+        if speaker_id is not None:
+            query = query.where(self.model.speaker_id == speaker_id)
+        if start_date is not None:
+            query = query.where(self.model.week_start >= get_week_start(start_date))
+        if end_date is not None:
+            query = query.where(self.model.week_start <= end_date)
+        return (await db.execute(query.order_by(self.model.speaker_id, self.model.week_start)
+                                 .offset(skip).limit(limit))).scalars().all()
+
+    async def add_to_counters(self, db: AsyncSession, deltas: dict[tuple[int, dt.date], Counter]) -> None:
+        """
+        deltas is a dict {(speaker_id, week_start): Counter({counter name: value to add})}.
+        All rows are inserted/updated with only one INSERT ... ON CONFLICT DO UPDATE query.
+        """
+        rows = [{"speaker_id": speaker_id, "week_start": week_start, **{c: delta[c] for c in COUNTERS}}
+                for (speaker_id, week_start), delta in deltas.items() if any(delta.values())]
+        if not rows:
+            return
+        stmt = insert(self.model).values(rows)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[self.model.speaker_id, self.model.week_start],
+            set_={c: getattr(self.model, c) + getattr(stmt.excluded, c) for c in COUNTERS}))
+
+    async def apply_sessions(self, db: AsyncSession, *, added: list[tuple[int, int, dt.date]] = (),
+                             removed: list[tuple[int, int, dt.date]] = ()) -> None:
+        """
+        Count added sessions and uncount removed ones, given as (participant_id, status_id, date) tuples.
+        A booked session (i.e not unscheduled) counts as many slots as its participant's nb_session_week.
+        """
+        sessions = [(*s, 1) for s in added] + [(*s, -1) for s in removed]
+        if not sessions:
+            return
+        participants = await crud.participant.get_speaker_id_and_nb_session_week_by_ids(
+            db, list({participant_id for participant_id, *_ in sessions}))
+        status_names = dict((await db.execute(select(SessionStatus.id, SessionStatus.name)
+                                              .where(SessionStatus.id.in_({s[1] for s in sessions})))).all())
+        deltas = defaultdict(Counter)
+        for participant_id, status_id, date, sign in sessions:
+            participant = participants[participant_id]
+            count_session(deltas[(participant.speaker_id, get_week_start(date))], status_names[status_id],
+                          participant.nb_session_week, sign)
+        await self.add_to_counters(db, deltas)
+
+    async def move_participant_sessions(self, db: AsyncSession, *, participant_id: int, old: tuple[int, int],
+                                        new: tuple[int, int]) -> None:
+        """
+        Move the counts of all the participant's sessions from the old to the new (speaker_id, nb_session_week),
+        when the participant's speaker or type changes (one query for the sessions).
+        """
+        if old == new:
+            return
+        sessions = (await db.execute(select(Session.date, SessionStatus.name)
+                                     .join(SessionStatus, Session.status_id == SessionStatus.id)
+                                     .where(Session.participant_id == participant_id))).all()
+        deltas = defaultdict(Counter)
+        for (speaker_id, nb_session_week), sign in ((old, -1), (new, 1)):
+            for date, status_name in sessions:
+                count_session(deltas[(speaker_id, get_week_start(date))], status_name, nb_session_week, sign)
+        await self.add_to_counters(db, deltas)
+
+    async def apply_availabilities(self, db: AsyncSession, *, speaker_id: int,
+                                   added: list[tuple[dt.date, dt.date, int]] = (),
+                                   removed: list[tuple[dt.date, dt.date, int]] = ()) -> None:
+        """
+        Count added availabilities and uncount removed ones, given as (start_date, end_date, week_day) tuples :
+        1 available slot for each week with a week_day between start and end dates.
+        """
+        deltas = defaultdict(Counter)
+        for availabilities, sign in ((added, 1), (removed, -1)):
+            for start_date, end_date, week_day in availabilities:
+                # the mondays of the week_day dates (no date built for the days in between)
+                for ordinal in weekday_ordinals(start_date, end_date, week_day):
+                    deltas[(speaker_id, dt.date.fromordinal(ordinal - week_day))]["available_slots"] += sign
+        await self.add_to_counters(db, deltas)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """
+        Recompute all counters from scratch with set-based SQL (no row goes through Python),
+        e.g. to initialize the table.
+        """
+        await db.execute(delete(self.model))
+        await db.execute(text("""
+            INSERT INTO speakerweekstats (speaker_id, week_start, available_slots, booked_slots, done, no_show)
+            SELECT speaker_id, week_start, sum(available_slots), sum(booked_slots), sum(done), sum(no_show)
+            FROM (
+                SELECT a.speaker_id, date_trunc('week', d)::date AS week_start,
+                       1 AS available_slots, 0 AS booked_slots, 0 AS done, 0 AS no_show
+                FROM availability a
+                CROSS JOIN LATERAL generate_series(
+                    -- first date with the availability weekday (python weekday : 0 = monday = isodow 1)
+                    a.start_date + ((a.week_day - extract(isodow FROM a.start_date)::int + 1) % 7 + 7) % 7,
+                    a.end_date, interval '7 days') AS d
+                UNION ALL
+                SELECT p.speaker_id, date_trunc('week', s.date)::date,
+                       0,
+                       CASE WHEN ss.name = ANY(:unscheduled) THEN 0 ELSE pt.nb_session_week END,
+                       CASE WHEN ss.name = :done THEN 1 ELSE 0 END,
+                       CASE WHEN ss.name = :no_show THEN 1 ELSE 0 END
+                FROM session s
+                JOIN participant p ON s.participant_id = p.id
+                JOIN participanttype pt ON p.type_id = pt.id
+                JOIN sessionstatus ss ON s.status_id = ss.id
+            ) AS counts
+            GROUP BY speaker_id, week_start
+            """), {"unscheduled": settings.SESSION_STATUS_UNSCHEDULED,
+                   "done": settings.SESSION_STATUS_DONE,
+                   "no_show": settings.SESSION_STATUS_NO_SHOW})
+        await save(db)
+
+
+speaker_week_stats = CRUDSpeakerWeekStats(SpeakerWeekStats)
@@ -0,0 +1,24 @@
+import datetime as dt
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import Watermark
+
+
+class CRUDWatermark:
+    """Periodic tasks progress, kept in the db to survive the app restarts (e.g. see send_reminders.py)."""
+    def __init__(self, model: type[Watermark]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, name: str) -> dt.datetime | None:
+        return (await db.execute(select(self.model.value).where(self.model.name == name))).scalar()
+
+    async def set(self, db: AsyncSession, name: str, value: dt.datetime) -> None:
+        """Without commit, with only one INSERT ... ON CONFLICT DO UPDATE query."""
+        await db.execute(insert(self.model).values(name=name, value=value)
+                         .on_conflict_do_update(index_elements=[self.model.name], set_={"value": value}))
+
+
+watermark = CRUDWatermark(Watermark)
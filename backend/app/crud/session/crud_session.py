@@ -1,19 +1,27 @@
 import datetime as dt
-from typing import Any
+from typing import Any, Callable
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncResult
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.sql import Select
 from fastapi.encoders import jsonable_encoder
 from fastapi import HTTPException
 
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, fetch_all, save
 from app import crud
-from app.models import Session, Participant, User
+from app.core.config import settings
+from app.models import Session, Participant, User, ParticipantType, SessionType, SessionStatus
+from app.models.session.session import COMMENTS_SEARCH_CONFIG
 from app.schemas import SessionCreate, SessionUpdate
 from app.schemas import Session as SessionSchema
+from app.utils import json_utils
 
 
 class CRUDSession(CRUDBase[Session, SessionCreate, SessionUpdate]):
+    row_fields = json_utils.schema_fields(SessionSchema, exclude=("type_name", "status_name"))
+    json_fields = staticmethod(json_utils.fields_serializer(row_fields))
+
     # async def get_speaker(self,  db: AsyncSession, db_obj: Session) -> list[Speaker]:
     #     spk = aliased(Speaker, flat=True)
     #     return (await db.execute(select(spk)
@@ -21,32 +29,216 @@ class CRUDSession(CRUDBase[Session, SessionCreate, SessionUpdate]):
     #                             .join(self.model, Participant.id == self.model.participant_id)
     #                             .where(self.model.participant_id == db_obj.participant_id))).scalar()
 
-    async def get_by_participant_email(self, db: AsyncSession, participant_email: str) -> list[Session]:
+    async def get_version_scopes(self, db: AsyncSession, db_obj: Session) -> set[str]:
+        return {crud.change_counter.speaker_scope(db_obj.speaker_id)}
+
+    async def get_speaker_id(self, db: AsyncSession, participant_id: int) -> int | None:
+        """The speaker_id to denormalize on a participant's session."""
+        return (await db.execute(select(Participant.__table__.c.speaker_id)
+                                 .where(Participant.__table__.c.id == participant_id))).scalar()
+
+    async def get_by_participant_email(self, db: AsyncSession, participant_email: str, *,
+                                       rows: bool = False) -> list[Session] | list[Row]:
         participant_id = (await crud.user.get_by_email(db, email=participant_email)).id
-        return (await db.execute(select(self.model)
-                                 .where(self.model.participant_id == participant_id))).scalars().all()
+        return await fetch_all(db, self.select_entities(rows).where(self.model.participant_id == participant_id),
+                               rows=rows)
 
     async def get_by_speaker_email(self, db: AsyncSession, speaker_email: str) -> list[Session]:
         speaker_id = (await crud.user.get_by_email(db, email=speaker_email)).id
         return (await db.execute(select(self.model)
-                                 .join(Participant, self.model.participant_id == Participant.id)
-                                 .where(Participant.speaker_id == speaker_id))).scalars().all()
+                                 .where(self.model.speaker_id == speaker_id))).scalars().all()
 
     async def get_by_date_speaker(self, db: AsyncSession, date: dt.date, speaker_id: int) -> list[Session]:
         return (await db.execute(select(self.model)
+                                 .where(self.model.speaker_id == speaker_id, self.model.date == date))).scalars().all()
+
+    def date_range_select(self, start_date: dt.date | None, end_date: dt.date | None, rows: bool = False) -> Select:
+        """Sessions from start_date and/or to end_date (both included, unbounded if None), in chronological order."""
+        query = self.select_entities(rows)
+        if start_date is not None:
+            query = query.where(self.model.date >= start_date)
+        if end_date is not None:
+            query = query.where(self.model.date <= end_date)
+        return query.order_by(self.model.date, self.model.time)
+
+    async def get_by_speaker_date_range(self, db: AsyncSession, speaker_id: int, start_date: dt.date = None,
+                                        end_date: dt.date = None, *, rows: bool = False) -> list[Session] | list[Row]:
+        """
+        Return the speaker's sessions from start_date to end_date (e.g. a week or month view) :
+        a single range of the session (speaker_id, date, time) index.
+        """
+        return await fetch_all(db, self.date_range_select(start_date, end_date, rows)
+                               .where(self.model.speaker_id == speaker_id), rows=rows)
+
+    async def get_by_participant_date_range(self, db: AsyncSession, participant_id: int, start_date: dt.date = None,
+                                            end_date: dt.date = None, *,
+                                            rows: bool = False) -> list[Session] | list[Row]:
+        return await fetch_all(db, self.date_range_select(start_date, end_date, rows)
+                               .where(self.model.participant_id == participant_id), rows=rows)
+
+    async def get_dates_times_nb_session_week_by_period_speaker(self, db: AsyncSession, start_date: dt.date,
+                                                                end_date: dt.date, speaker_id: int) -> list[Any]:
+        """
+        Return rows (date, time, nb_session_week) for all speaker's sessions from start_date to end_date.
+        nb_session_week is the one of the session's participant (i.e the number of consecutive slots used).
+        """
+        return (await db.execute(select(self.model.date, self.model.time, ParticipantType.nb_session_week)
                                  .join(Participant, self.model.participant_id == Participant.id)
-                                 .where(Participant.speaker_id == speaker_id, self.model.date == date))).scalars()\
-                                                                                                        .all()
+                                 .join(ParticipantType, Participant.type_id == ParticipantType.id)
+                                 .where(self.model.speaker_id == speaker_id,
+                                        self.model.date >= start_date,
+                                        self.model.date <= end_date))).all()
 
     async def get_by_date_and_time(self, db: AsyncSession, date: dt.date, time: dt.time) -> list[Session] | None:
         return (await db.execute(select(self.model)
                                  .where(self.model.date == date, self.model.time == time))).scalars().all()
 
+    async def search_comments(self, db: AsyncSession, q: str, *, skip: int = 0, limit: int = 100) -> list[Session]:
+        """
+        Sessions whose comments match q (web search syntax : words, "quoted phrase", -excluded word, or),
+        the best ranked first (served by the comments_tsv GIN index).
+        """
+        query = func.websearch_to_tsquery(COMMENTS_SEARCH_CONFIG, q)
+        return (await db.execute(select(self.model)
+                                 .where(self.model.comments_tsv.op("@@")(query))
+                                 .order_by(func.ts_rank(self.model.comments_tsv, query).desc(),
+                                           self.model.date.desc(), self.model.id)
+                                 .offset(skip).limit(limit))).scalars().all()
+
+    async def stream_calendar_rows(self, db: AsyncSession, *, speaker_id: int = None,
+                                   participant_id: int = None) -> AsyncResult:
+        """
+        Stream (server-side cursor) the speaker's or participant's sessions rows needed to build a calendar,
+        see utils/ical_utils.py session_event().
+        """
+        return await db.stream(select(self.model.id, self.model.date, self.model.time, self.model.comments,
+                                      SessionType.name.label("type_name"), SessionStatus.name.label("status_name"),
+                                      ParticipantType.nb_session_week, Participant.first_name, Participant.last_name)
+                               .join(Participant, self.model.participant_id == Participant.id)
+                               .join(ParticipantType, Participant.type_id == ParticipantType.id)
+                               .join(SessionType, self.model.type_id == SessionType.id)
+                               .join(SessionStatus, self.model.status_id == SessionStatus.id)
+                               .where(self.calendar_filter(speaker_id=speaker_id, participant_id=participant_id))
+                               .order_by(self.model.date, self.model.time)
+                               .execution_options(yield_per=settings.STREAM_YIELD_PER))
+
+    def calendar_filter(self, *, speaker_id: int = None, participant_id: int = None) -> Any:
+        if speaker_id is not None:
+            return self.model.speaker_id == speaker_id
+        return self.model.participant_id == participant_id
+
+    def export_select(self) -> Select:
+        """
+        All sessions joined with their participant, speaker, type and status (for reporting).
+        Core tables are used to join the user table twice without the polymorphic User loading.
+        """
+        session_t, participant_t = self.model.__table__, Participant.__table__
+        participant_user_t = User.__table__.alias("participant_user")
+        speaker_user_t = User.__table__.alias("speaker_user")
+        return (select(session_t.c.id, session_t.c.date, session_t.c.time, session_t.c.comments,
+                       SessionType.__table__.c.name.label("type_name"),
+                       SessionStatus.__table__.c.name.label("status_name"),
+                       participant_t.c.id.label("participant_id"),
+                       participant_user_t.c.first_name.label("participant_first_name"),
+                       participant_user_t.c.last_name.label("participant_last_name"),
+                       participant_user_t.c.email.label("participant_email"),
+                       speaker_user_t.c.id.label("speaker_id"),
+                       speaker_user_t.c.first_name.label("speaker_first_name"),
+                       speaker_user_t.c.last_name.label("speaker_last_name"),
+                       speaker_user_t.c.email.label("speaker_email"))
+                .select_from(session_t
+                             .join(participant_t, session_t.c.participant_id == participant_t.c.id)
+                             .join(participant_user_t, participant_t.c.id == participant_user_t.c.id)
+                             .join(speaker_user_t, session_t.c.speaker_id == speaker_user_t.c.id)
+                             .join(SessionType.__table__, session_t.c.type_id == SessionType.__table__.c.id)
+                             .join(SessionStatus.__table__, session_t.c.status_id == SessionStatus.__table__.c.id))
+                .order_by(session_t.c.id))
+
+    async def stream_export_rows(self, db: AsyncSession) -> AsyncResult:
+        """Stream (server-side cursor) all export_select() rows."""
+        return await db.stream(self.export_select().execution_options(yield_per=settings.STREAM_YIELD_PER))
+
+    def reminders_select(self, start: dt.datetime, end: dt.datetime) -> Select:
+        """
+        The scheduled sessions from start (included) to end (excluded) with their participant (recipient) and
+        speaker names, to send reminders : one range of the session (date, time) index, then sorted by participant
+        (so that each recipient rows follow each other).
+        """
+        session_t = self.model.__table__
+        participant_user_t = User.__table__.alias("participant_user")
+        speaker_user_t = User.__table__.alias("speaker_user")
+        date_time = tuple_(session_t.c.date, session_t.c.time)
+        return (select(session_t.c.participant_id, participant_user_t.c.email,
+                       participant_user_t.c.first_name, session_t.c.date, session_t.c.time,
+                       speaker_user_t.c.first_name.label("speaker_first_name"),
+                       speaker_user_t.c.last_name.label("speaker_last_name"))
+                .select_from(session_t
+                             .join(participant_user_t, session_t.c.participant_id == participant_user_t.c.id)
+                             .join(speaker_user_t, session_t.c.speaker_id == speaker_user_t.c.id)
+                             .join(SessionStatus.__table__, session_t.c.status_id == SessionStatus.__table__.c.id))
+                .where(date_time >= tuple_(start.date(), start.time()), date_time < tuple_(end.date(), end.time()),
+                       SessionStatus.__table__.c.name == settings.SESSION_STATUS_SCHEDULED)
+                .order_by(session_t.c.participant_id, session_t.c.date, session_t.c.time))
+
+    async def stream_reminders_rows(self, db: AsyncSession, start: dt.datetime, end: dt.datetime) -> AsyncResult:
+        """Stream (server-side cursor) the reminders_select() rows."""
+        return await db.stream(self.reminders_select(start, end)
+                               .execution_options(yield_per=settings.STREAM_YIELD_PER))
+
     async def create(self, db: AsyncSession, *, obj_in: SessionCreate) -> Session:
-        return await super().create(db, obj_in=await self.from_schema_to_db_model(db, obj_in=obj_in))
+        obj_in_data = await self.from_schema_to_db_model(db, obj_in=obj_in)
+        obj_in_data["speaker_id"] = await self.get_speaker_id(db, obj_in_data["participant_id"])
+        await crud.speaker_week_stats.apply_sessions(db, added=[(obj_in_data["participant_id"],
+                                                                 obj_in_data["status_id"], obj_in_data["date"])])
+        return await super().create(db, obj_in=obj_in_data)
 
     async def update(self, db: AsyncSession, *, db_obj: Session, obj_in: SessionUpdate | dict[str, Any]) -> Session:
-        return await super().update(db, db_obj=db_obj, obj_in=await self.from_schema_to_db_model(db, obj_in=obj_in))
+        obj_in_data = await self.from_schema_to_db_model(db, obj_in=obj_in)
+        if obj_in_data.get("participant_id") and obj_in_data["participant_id"] != db_obj.participant_id:
+            obj_in_data["speaker_id"] = await self.get_speaker_id(db, obj_in_data["participant_id"])
+        old_stats_key = (db_obj.participant_id, db_obj.status_id, db_obj.date)
+        new_stats_key = (obj_in_data.get("participant_id") or db_obj.participant_id,
+                         obj_in_data.get("status_id") or db_obj.status_id,
+                         obj_in_data.get("date") or db_obj.date)
+        if new_stats_key != old_stats_key:
+            await crud.speaker_week_stats.apply_sessions(db, added=[new_stats_key], removed=[old_stats_key])
+        return await super().update(db, db_obj=db_obj, obj_in=obj_in_data)
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Session:
+        db_obj = await db.get(self.model, id)
+        await crud.speaker_week_stats.apply_sessions(db, removed=[(db_obj.participant_id, db_obj.status_id,
+                                                                   db_obj.date)])
+        return await super().remove(db, id=id)
+
+    async def get_types_and_status_ids(self, db: AsyncSession) -> tuple[dict[str, int], dict[str, int]]:
+        """The ({type name: id}, {status name: id}) maps, to read the types and status once for many sessions."""
+        return ({s_type.name: s_type.id for s_type in await crud.session_type.get_multi(db, limit=None)},
+                {s_status.name: s_status.id for s_status in await crud.session_status.get_multi(db, limit=None)})
+
+    async def create_multi(self, db: AsyncSession, *, objs_in: list[SessionCreate],
+                           types_and_status_ids: tuple[dict[str, int], dict[str, int]] = None) -> list[Session]:
+        """
+        Insert all sessions in one transaction (i.e one commit).
+        Types and status ids are read once for all sessions, or given if already read
+        (see types_and_status_names_checks()).
+        """
+        types_ids, status_ids = types_and_status_ids or await self.get_types_and_status_ids(db)
+        participants = await crud.participant.get_speaker_id_and_nb_session_week_by_ids(
+            db, list({obj_in.participant_id for obj_in in objs_in}))
+        db_objs = []
+        for obj_in in objs_in:
+            obj_in_data = obj_in.dict(exclude={"type_name", "status_name"})
+            obj_in_data.update([("type_id", types_ids[obj_in.type_name]),
+                                ("status_id", status_ids[obj_in.status_name]),
+                                ("speaker_id", participants[obj_in.participant_id].speaker_id)])
+            db_objs.append(self.model(**obj_in_data))
+        await crud.speaker_week_stats.apply_sessions(db, added=[(db_obj.participant_id, db_obj.status_id, db_obj.date)
+                                                                for db_obj in db_objs])
+        await crud.change_counter.bump(db, {crud.change_counter.speaker_scope(db_obj.speaker_id)
+                                            for db_obj in db_objs})
+        db.add_all(db_objs)
+        await save(db)
+        return db_objs
 
     async def participant_checks_and_get_id(self, db: AsyncSession, obj_in: SessionCreate | SessionUpdate,
                                             *, current_user: User) -> int | None:
@@ -61,10 +253,11 @@ class CRUDSession(CRUDBase[Session, SessionCreate, SessionUpdate]):
             raise HTTPException(
                 status_code=400,
                 detail="If you are not a Participant user, you have to set the participant_id value...")
-        elif not await crud.participant.get(db, id=obj_in.participant_id):
+        participant = await crud.participant.get(db, id=obj_in.participant_id)
+        if not participant:
             raise HTTPException(
                 status_code=400, detail="A participant user with this id does not exist in the system...")
-        elif (await crud.participant.get(db, id=obj_in.participant_id)).speaker_id != current_user.id:
+        elif participant.speaker_id != current_user.id:
             raise HTTPException(
                         status_code=400,
                         detail="The participant with this id is not one of yours...",
@@ -72,6 +265,33 @@ class CRUDSession(CRUDBase[Session, SessionCreate, SessionUpdate]):
         else:
             return obj_in.participant_id
 
+    async def participants_checks_and_get_ids(self, db: AsyncSession, objs_in: list[SessionCreate],
+                                              *, current_user: User) -> dict[int, Any]:
+        """
+        Same as participant_checks_and_get_id() but for many sessions and with only one query.
+        Set each session.participant_id and return a dict {participant id: row(speaker_id, nb_session_week)}.
+        """
+        if await crud.user.is_participant(current_user):
+            for obj_in in objs_in:
+                obj_in.participant_id = current_user.id
+        elif any(obj_in.participant_id is None for obj_in in objs_in):
+            raise HTTPException(
+                status_code=400,
+                detail="If you are not a Participant user, you have to set the participant_id value...")
+        participants = await crud.participant.get_speaker_id_and_nb_session_week_by_ids(
+            db, list({obj_in.participant_id for obj_in in objs_in}))
+        for obj_in in objs_in:
+            if obj_in.participant_id not in participants:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"A participant user with id {obj_in.participant_id} does not exist in the system...")
+            if (not await crud.user.is_participant(current_user)
+                    and participants[obj_in.participant_id].speaker_id != current_user.id):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"The participant with id {obj_in.participant_id} is not one of yours...")
+        return participants
+
     async def type_and_status_names_checks(self, db: AsyncSession, obj_in: SessionCreate | SessionUpdate) -> None:
         """To checks if the type and status names (used for session creating/updating) exists in db."""
         if obj_in.type_name and not await crud.session_type.get_by_name(db, obj_in.type_name):
@@ -103,11 +323,50 @@ class CRUDSession(CRUDBase[Session, SessionCreate, SessionUpdate]):
             obj_in_data.update([("time", dt.time.fromisoformat(obj_in_data["time"]))])
         return obj_in_data
 
+    async def types_and_status_names_checks(self, db: AsyncSession, objs_in: list[SessionCreate]
+                                            ) -> tuple[dict[str, int], dict[str, int]]:
+        """
+        Same as type_and_status_names_checks() but for many sessions (types and status are read once).
+        Return the types and status ids maps, to give to create_multi().
+        """
+        types_ids, status_ids = await self.get_types_and_status_ids(db)
+        for obj_in in objs_in:
+            if obj_in.type_name not in types_ids:
+                raise HTTPException(
+                    status_code=400, detail=f"Type {obj_in.type_name} does not exists...")
+            if obj_in.status_name not in status_ids:
+                raise HTTPException(
+                    status_code=400, detail=f"Status {obj_in.status_name} does not exists...")
+        return types_ids, status_ids
+
     async def from_db_model_to_schema(self, db: AsyncSession, db_obj: Session) -> SessionSchema:
         """ Build the pydantic schema Session (with the good field) to return/display to user/client. """
         s_type_name = (await crud.session_type.get(db, id=db_obj.type_id)).name
         s_status_name = (await crud.session_status.get(db, id=db_obj.status_id)).name
         return SessionSchema(**jsonable_encoder(db_obj), type_name=s_type_name, status_name=s_status_name)
 
+    async def from_db_models_to_schemas(self, db: AsyncSession, db_objs: list[Session]) -> list[SessionSchema]:
+        """ Same as from_db_model_to_schema() but for many sessions (types and status are read once). """
+        types_names = {s_type.id: s_type.name for s_type in await crud.session_type.get_multi(db, limit=None)}
+        status_names = {s_status.id: s_status.name for s_status in await crud.session_status.get_multi(db, limit=None)}
+        return [SessionSchema(**jsonable_encoder(db_obj), type_name=types_names[db_obj.type_id],
+                              status_name=status_names[db_obj.status_id]) for db_obj in db_objs]
+
+    async def json_serializer(self, db: AsyncSession) -> Callable[[Session | Row], dict[str, Any]]:
+        """schemas.Session JSON ready dicts, the types and status names are read once for all sessions."""
+        types_names = {s_type.id: s_type.name for s_type in await crud.session_type.get_multi(db, limit=None)}
+        status_names = {s_status.id: s_status.name for s_status in await crud.session_status.get_multi(db, limit=None)}
+
+        def serialize(db_obj: Session | Row) -> dict[str, Any]:
+            json_obj = self.json_fields(db_obj)
+            json_obj["type_name"], json_obj["status_name"] = types_names[db_obj.type_id], status_names[db_obj.status_id]
+            return json_obj
+        return serialize
+
+    async def to_json_list(self, db: AsyncSession, db_objs: list[Session] | list[Row]) -> list[dict[str, Any]]:
+        """Same as from_db_models_to_schemas() but JSON ready dicts, for a FastJSONResponse (no schema built)."""
+        serialize = await self.json_serializer(db)
+        return [serialize(db_obj) for db_obj in db_objs]
+
 
 session = CRUDSession(Session)
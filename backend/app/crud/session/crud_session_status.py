@@ -7,6 +7,8 @@ from app.schemas import SessionStatusCreate, SessionStatusUpdate
 
 
 class CRUDSessionStatus(CRUDBase[SessionStatus, SessionStatusCreate, SessionStatusUpdate]):
+    version_scope = "sessionstatus"
+
     async def get_by_name(self, db: AsyncSession, name: str) -> SessionStatus | None:
         db_obj = await db.execute(select(self.model).where(self.model.name == name))
         return db_obj.scalar()
@@ -7,6 +7,8 @@ from app.schemas import SessionTypeCreate, SessionTypeUpdate
 
 
 class CRUDSessionType(CRUDBase[SessionType, SessionTypeCreate, SessionTypeUpdate]):
+    version_scope = "sessiontype"
+
     async def get_by_name(self, db: AsyncSession, name: str) -> SessionType | None:
         db_obj = await db.execute(select(self.model).where(self.model.name == name))
         return db_obj.scalar()
@@ -1,32 +1,59 @@
-from typing import Any
+from typing import Any, Callable
 
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from fastapi.encoders import jsonable_encoder
 from fastapi import HTTPException
 
 from app import crud
 from app.crud.user.crud_user import CRUDUser
-from app.models import User, Participant, ParticipantType
+from app.models import User, Participant, ParticipantType, Session
 from app.schemas import Participant as ParticipantSchema
 from app.schemas import ParticipantCreate, ParticipantUpdate
+from app.utils import json_utils
 
 
 class CRUDParticipant(CRUDUser[Participant, ParticipantCreate, ParticipantUpdate]):
-    async def get_multi(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> list[Participant]:
-        return (await db.execute(select(self.model).offset(skip).limit(limit))).scalars().all()
+    # the reservation relationship is never loaded with the participants (so always null, as with the schemas)
+    row_fields = json_utils.schema_fields(ParticipantSchema, exclude=("type_name", "status_name", "reservation"))
+    json_fields = staticmethod(json_utils.fields_serializer(row_fields))
 
     async def get_nb_session_week(self, db: AsyncSession, id) -> int:
         return (await db.execute(select(ParticipantType.nb_session_week)
                                  .join(self.model, self.model.type_id == ParticipantType.id)
                                  .where(self.model.id == id))).scalar()
 
+    async def get_speaker_id_and_nb_session_week_by_ids(self, db: AsyncSession, ids: list[int]) -> dict[int, Any]:
+        """
+        Return a dict {participant id: row(speaker_id, nb_session_week)} for all existing participants in ids.
+        One query for many participants (e.g. when creating many sessions at once).
+        """
+        rows = (await db.execute(select(self.model.id, self.model.speaker_id, ParticipantType.nb_session_week)
+                                 .join(ParticipantType, self.model.type_id == ParticipantType.id)
+                                 .where(self.model.id.in_(ids)))).all()
+        return {row.id: row for row in rows}
+
     async def create(self, db: AsyncSession, *, obj_in: ParticipantCreate) -> Participant:
         return await super().create(db, obj_in=await self.from_schema_to_db_model(db, obj_in=obj_in))
 
     async def update(self, db: AsyncSession, *, db_obj: Participant,
                      obj_in: ParticipantUpdate | dict[str, Any]) -> Participant:
-        return await super().update(db, db_obj=db_obj, obj_in=await self.from_schema_to_db_model(db, obj_in=obj_in))
+        obj_in_data = await self.from_schema_to_db_model(db, obj_in=obj_in)
+        speaker_id = obj_in_data.get("speaker_id") or db_obj.speaker_id
+        type_id = obj_in_data.get("type_id") or db_obj.type_id
+        if speaker_id != db_obj.speaker_id:
+            # keep the denormalized session.speaker_id consistent (in the same transaction)
+            await db.execute(update(Session).where(Session.participant_id == db_obj.id)
+                             .values(speaker_id=speaker_id)
+                             .execution_options(synchronize_session="fetch"))
+        if speaker_id != db_obj.speaker_id or type_id != db_obj.type_id:
+            # the participant's sessions counts move to the new speaker and/or nb_session_week
+            await crud.speaker_week_stats.move_participant_sessions(
+                db, participant_id=db_obj.id,
+                old=(db_obj.speaker_id, (await crud.participant_type.get(db, id=db_obj.type_id)).nb_session_week),
+                new=(speaker_id, (await crud.participant_type.get(db, id=type_id)).nb_session_week))
+        return await super().update(db, db_obj=db_obj, obj_in=obj_in_data)
 
     async def from_schema_to_db_model(self, db: AsyncSession, *,
                                       obj_in: ParticipantCreate | ParticipantUpdate) -> dict:
@@ -83,5 +110,23 @@ class CRUDParticipant(CRUDUser[Participant, ParticipantCreate, ParticipantUpdate
         p_status_name = (await crud.participant_status.get(db, id=db_obj.status_id)).name
         return ParticipantSchema(**jsonable_encoder(db_obj), type_name=p_type_name, status_name=p_status_name)
 
+    async def json_serializer(self, db: AsyncSession) -> Callable[[Participant | Row], dict[str, Any]]:
+        """schemas.Participant JSON ready dicts, the types and status names are read once for all participants."""
+        types_names = {p_type.id: p_type.name for p_type in await crud.participant_type.get_multi(db, limit=None)}
+        status_names = {p_status.id: p_status.name
+                        for p_status in await crud.participant_status.get_multi(db, limit=None)}
+
+        def serialize(db_obj: Participant | Row) -> dict[str, Any]:
+            json_obj = self.json_fields(db_obj)
+            json_obj.update(type_name=types_names[db_obj.type_id], status_name=status_names[db_obj.status_id],
+                            reservation=None)
+            return json_obj
+        return serialize
+
+    async def to_json_list(self, db: AsyncSession, db_objs: list[Participant] | list[Row]) -> list[dict[str, Any]]:
+        """JSON ready dicts of schemas.Participant, for a FastJSONResponse (no schema built)."""
+        serialize = await self.json_serializer(db)
+        return [serialize(db_obj) for db_obj in db_objs]
+
 
 participant = CRUDParticipant(Participant)
@@ -7,6 +7,8 @@ from app.schemas import ParticipantTypeCreate, ParticipantTypeUpdate
 
 
 class CRUDParticipantType(CRUDBase[ParticipantType, ParticipantTypeCreate, ParticipantTypeUpdate]):
+    version_scope = "participanttype"
+
     async def get_by_name(self, db: AsyncSession, name: str) -> ParticipantType | None:
         db_obj = await db.execute(select(self.model).where(self.model.name == name))
         return db_obj.scalar()
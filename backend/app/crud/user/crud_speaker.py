@@ -1,11 +1,11 @@
 import datetime as dt
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import aliased
 
-from app import crud
-from app.utils import add_time
+from app import crud, scheduling
 from app.crud.user.crud_user import CRUDUser
 from app.models import Speaker, Participant
 from app.schemas import SpeakerCreate, SpeakerUpdate, SessionCreate
@@ -23,64 +23,64 @@ class CRUDSpeaker(CRUDUser[Speaker, SpeakerCreate, SpeakerUpdate]):
 
     async def get_sessions_times_by_date(self, db: AsyncSession, db_obj: Speaker, date: dt.date) -> list[dt.time]:
         """
-        Return a list with all date speaker's sessions start times (with 2 consecutive start times for a session
-        with a participant having 2 sessions week..).
+        Return a sorted list with all date speaker's sessions start times (with 2 consecutive start times for
+        a session with a participant having 2 sessions week..).
         """
-        spk_date_sessions = await crud.session.get_by_date_speaker(db, date, db_obj.id)
-        # build a list with all date speaker's sessions start times (with 2 consecutives start times for a session
-        # with a participant having 2 sessions week..)
-        day_sessions_start_times = []
-        for session in spk_date_sessions:
-            day_sessions_start_times.append(session.time)
-            part_nb_sess_week = await crud.participant.get_nb_session_week(db, session.participant_id)
-            if part_nb_sess_week > 1:
-                for i in range(1, part_nb_sess_week):
-                    day_sessions_start_times.append((dt.datetime.combine(session.date, session.time)
-                                                     + dt.timedelta(minutes=db_obj.slot_time * i))
-                                                    .time())
-        return day_sessions_start_times
+        snapshot = await self.get_scheduling_snapshot(db, db_obj, date, date)
+        return sorted(snapshot.occupancy.times(date))
 
     async def get_free_sessions_times_by_date(self, db: AsyncSession, db_obj: Speaker, date: dt.date) -> list[dt.time]:
-        spk_date_sessions_times_list = await self.get_sessions_times_by_date(db, db_obj, date)
-        spk_date_avails_times_list = await crud.availability.get_times_list_by_date_speaker(db, db_obj.id, date)
+        snapshot = await self.get_scheduling_snapshot(db, db_obj, date, date)
+        return scheduling.free_start_times(snapshot, date)
 
-        spk_date_free_sessions_times = []
-        for av_time in spk_date_avails_times_list:
-            if av_time not in spk_date_sessions_times_list:
-                spk_date_free_sessions_times.append(av_time)
-
-        return spk_date_free_sessions_times
+    async def get_scheduling_snapshot(self, db: AsyncSession, db_obj: Speaker, start_date: dt.date | None = None,
+                                      end_date: dt.date | None = None) -> scheduling.SpeakerSnapshot:
+        """
+        Load at once (1 or 2 queries) what the scheduling rules need about the speaker :
+         - without period : all his availabilities (and no sessions),
+         - with a period : his availabilities overlapping it and his sessions during it.
+        """
+        if start_date is None or end_date is None:
+            avails = await crud.availability.get_by_speaker(db, db_obj.id)
+            db_sessions = []
+        else:
+            avails = await crud.availability.get_all_in_period_speaker(db, db_obj.id, start_date, end_date)
+            db_sessions = await crud.session.get_dates_times_nb_session_week_by_period_speaker(
+                db, start_date, end_date, db_obj.id)
+        return scheduling.SpeakerSnapshot(
+            db_obj.id, db_obj.slot_time,
+            availabilities=[scheduling.AvailabilityRule(av.id, av.start_date, av.end_date, av.week_day, av.time)
+                            for av in avails],
+            sessions=[scheduling.Slot(row.date, row.time, row.nb_session_week) for row in db_sessions])
 
     async def is_free_for_session(self, db: AsyncSession, db_obj: Speaker, session_in: SessionCreate) -> bool:
         """
         Checks if Speaker is free for a session te be created :
-         - Does he have an availability on same weekday and time concerning this date ?
-            - If yes, does he already have a session on this date at same time ?
+         - Does he have availabilities on same weekday and times (more than 1 consecutive slot if the participant
+           has more than 1 session week) concerning this date ?
+            - If yes, does he already have a session on this date at one of these times ?
          """
-        # If speaker has not a corresponding availability, no need to check more :
-        if not await crud.availability.get_one_around_date_same_weekday_time_speaker(db, db_obj.id, session_in.date,
-                                                                                     session_in.time):
-            return False
+        snapshot = await self.get_scheduling_snapshot(db, db_obj, session_in.date, session_in.date)
+        nb_session_week = await crud.participant.get_nb_session_week(db, session_in.participant_id)
+        return scheduling.is_free(snapshot, scheduling.Slot(session_in.date, session_in.time, nb_session_week))
 
-        # Else, speaker has a corresponding availability => check if it is free (i.e no other session) :
-        speaker_date_free_sessions_times = await self.get_free_sessions_times_by_date(db, db_obj, session_in.date)
-        if session_in.time in speaker_date_free_sessions_times:
-            session_in_participant_nb_session_week = await crud.participant\
-                                                               .get_nb_session_week(db, session_in.participant_id)
-            # if session start time is free and participant has 1 session week => simplest case
-            if session_in_participant_nb_session_week < 2:
-                return True
-            # else session start time is free but participant has more than 1 session week
-            # => check if the whole slot time if free :
-            else:
-                for i in range(1, session_in_participant_nb_session_week):
-                    time_to_check = add_time(date=session_in.date, time=session_in.time,
-                                             minutes_to_add=i * db_obj.slot_time)
-                    if time_to_check not in speaker_date_free_sessions_times:
-                        return False
-                return True
-        else:
-            return False
+    async def get_not_free_sessions_in(self, db: AsyncSession, db_obj: Speaker, sessions_in: list[SessionCreate],
+                                       participants: dict[int, Any]) -> list[SessionCreate]:
+        """
+        Same checks as is_free_for_session() but for many sessions to be created at once :
+        speaker's availabilities and sessions are read once for the whole period (2 queries),
+        then every session is checked in memory, including against the previous sessions_in.
+        participants is a dict {participant id: row(speaker_id, nb_session_week)},
+        see CRUDSession.participants_checks_and_get_ids().
+        Returns the sessions_in which cannot be created (an empty list if all can be created).
+        """
+        snapshot = await self.get_scheduling_snapshot(db, db_obj, min(session_in.date for session_in in sessions_in),
+                                                      max(session_in.date for session_in in sessions_in))
+        slots = [scheduling.Slot(session_in.date, session_in.time,
+                                 participants[session_in.participant_id].nb_session_week)
+                 for session_in in sessions_in]
+        not_free_slots_ids = {id(slot) for slot in scheduling.not_free_slots(snapshot, slots)}
+        return [session_in for session_in, slot in zip(sessions_in, slots) if id(slot) in not_free_slots_ids]
 
 
 speaker = CRUDSpeaker(Speaker)
@@ -1,23 +1,75 @@
-from typing import Any, TypeVar, Generic
+from typing import Any, Iterable, TypeVar, Generic
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, inspect, literal, or_, select
 
 from app.core.security import get_password_hash, verify_password
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, save
+from app import crud
 from app.models import User as model_user
 from app.schemas import User as schema_user
+from app.utils import json_utils
 UserType = TypeVar("UserType", bound=model_user)
 CreateSchemaUserType = TypeVar("CreateSchemaUserType", bound=schema_user)
 UpdateSchemaUserType = TypeVar("UpdateSchemaUserType", bound=schema_user)
 
 
 class CRUDUser(CRUDBase, Generic[UserType, CreateSchemaUserType, UpdateSchemaUserType]):
+    row_fields = json_utils.schema_fields(schema_user)  # the users (base table) common fields
+
+    async def get_version_scopes(self, db: AsyncSession, db_obj: UserType) -> set[str]:
+        """Speaker's calendars show his slot_time and his participants names/types."""
+        if await self.is_speaker(db_obj):
+            return {crud.change_counter.speaker_scope(db_obj.id)}
+        if await self.is_participant(db_obj):
+            await self.load_profile(db, db_obj)
+            if db_obj.speaker_id is not None:
+                return {crud.change_counter.speaker_scope(db_obj.speaker_id)}
+        return set()
+
+    async def load_profile(self, db: AsyncSession, user: UserType) -> UserType:
+        """
+        Load the profile (Speaker, Participant...) columns of a user loaded by a User query (e.g. current_user), which
+        selects the user table only : one SELECT of the unloaded ones (none if already loaded).
+        """
+        profile_columns = set(inspect(type(user)).column_attrs.keys()) - set(inspect(model_user).column_attrs.keys())
+        unloaded = inspect(user).unloaded & profile_columns
+        if unloaded:
+            await db.refresh(user, attribute_names=sorted(unloaded))
+        return user
+
     async def get_by_email(self, db: AsyncSession, *, email: str) -> UserType | None:
         db_obj = await db.execute(select(self.model).where(self.model.email == email))
         return db_obj.scalar()
 
+    async def email_exists(self, db: AsyncSession, email: str) -> bool:
+        """
+        Whatever the user profile (i.e even from crud.speaker...) : SELECT 1 ... LIMIT 1 on the unique email index,
+        without loading any user object.
+        """
+        return (await db.execute(select(literal(1)).where(model_user.email == email).limit(1))).scalar() is not None
+
+    async def get_existing_emails(self, db: AsyncSession, emails: Iterable[str]) -> set[str]:
+        """The emails (of a batch, e.g. for an import) that are already used by a user, in one query."""
+        emails = set(emails)
+        if not emails:
+            return set()
+        return set((await db.execute(select(model_user.email).where(model_user.email.in_(emails)))).scalars())
+
+    async def search(self, db: AsyncSession, q: str, *, skip: int = 0, limit: int = 100) -> list[UserType]:
+        """
+        Users whose first name, last name or email contains q (case insensitive, served by the trigram indexes),
+        the most similar first.
+        """
+        pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        columns = (self.model.first_name, self.model.last_name, self.model.email)
+        similarity = func.greatest(*(func.similarity(column, q) for column in columns))
+        return (await db.execute(select(self.model)
+                                 .where(or_(*(column.ilike(pattern, escape="\\") for column in columns)))
+                                 .order_by(similarity.desc(), self.model.id)
+                                 .offset(skip).limit(limit))).scalars().all()
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaUserType) -> UserType:
         """
         This method should never be direclty used. Only a base for subclasses creation methods.
@@ -38,8 +90,7 @@ class CRUDUser(CRUDBase, Generic[UserType, CreateSchemaUserType, UpdateSchemaUse
 
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await save(db)
         return db_obj
 
     async def update(self, db: AsyncSession, *, db_obj: UserType,
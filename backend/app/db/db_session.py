@@ -1,9 +1,25 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.core import metrics
 from app.core.config import settings
 
-engine = create_async_engine(settings.POSTGRES_DATABASE_URI, echo=True, future=True)
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Measure how long connections checkouts wait (e.g. when all pool connections are used)."""
+    def _do_get(self):
+        with metrics.DB_POOL_CHECKOUT_WAIT.time():
+            return super()._do_get()
+
+
+engine = create_async_engine(settings.POSTGRES_DATABASE_URI, echo=True, future=True,
+                             poolclass=TimedAsyncAdaptedQueuePool)
 
 AsyncSessionLocal = sessionmaker(class_=AsyncSession, future=True, expire_on_commit=False,
                                  autocommit=False, autoflush=False, bind=engine)
+
+DB_POOL_CONNECTIONS = metrics.Gauge("db_pool_connections", "Db pool size and connections by state.", ("state",),
+                                    callback=lambda: {("size",): engine.pool.size(),
+                                                      ("checked_out",): engine.pool.checkedout(),
+                                                      ("overflow",): engine.pool.overflow()})
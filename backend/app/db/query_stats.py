@@ -0,0 +1,126 @@
+"""
+SQL queries counting by request : number of statements, db time and repeated identical statements
+(same SQL with maybe other parameters, i.e. the "N+1 queries" pattern).
+Engines events record each statement into all the QueryStats being tracked in the current context
+(a request, see QueryStatsMiddleware, or a test block, see the query_budget fixture in tests/conftest.py).
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_tracked_stats: ContextVar[tuple["QueryStats", ...]] = ContextVar("tracked_query_stats", default=())
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def repeated(self) -> int:
+        """Number of statements that were already executed before (with the same SQL)."""
+        return sum(n - 1 for n in self.statements.values())
+
+    def n_plus_one_statements(self, threshold: int = None) -> list[tuple[str, int]]:
+        threshold = threshold or settings.QUERY_STATS_N_PLUS_ONE_THRESHOLD
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def report(self) -> str:
+        return "\n".join(f"{n} x {statement}" for statement, n in self.statements.most_common())
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Count the statements executed in this block (also by the enclosing tracked blocks)."""
+    stats = QueryStats()
+    token = _tracked_stats.set((*_tracked_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _tracked_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                          executemany: bool) -> None:
+    if _tracked_stats.get():
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                         executemany: bool) -> None:
+    tracked_stats = _tracked_stats.get()
+    if tracked_stats and conn.info.get("query_start_times"):
+        duration = time.perf_counter() - conn.info["query_start_times"].pop()
+        for stats in tracked_stats:
+            stats.record(statement, duration)
+
+
+DB_QUERIES = metrics.Counter("db_queries_total", "SQL statements executed by route.", ("route",))
+DB_QUERIES_DURATION = metrics.Counter("db_queries_seconds_total", "SQL statements execution time by route.",
+                                      ("route",))
+DB_REPEATED_QUERIES = metrics.Counter("db_repeated_queries_total",
+                                      "SQL statements executed again with the same SQL in a request, by route.",
+                                      ("route",))
+DB_N_PLUS_ONE_REQUESTS = metrics.Counter("db_n_plus_one_requests_total",
+                                         "Requests with N+1 queries (see QUERY_STATS_N_PLUS_ONE_THRESHOLD), by route.",
+                                         ("route",))
+
+
+class QueryStatsMiddleware:
+    """
+    Track the queries of each http request : cumulated by route in metrics (see core/metrics.py),
+    a warning is logged for repeated statements (N+1) and, in DEBUG, sent as X-DB-Query-Count, X-DB-Time-Ms
+    and X-DB-Repeated-Queries response headers.
+    Pure ASGI middleware (not BaseHTTPMiddleware) so the endpoint runs in the same context as the tracking.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track() as stats:
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.1f}"
+                    headers["X-DB-Repeated-Queries"] = str(stats.repeated)
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
+
+        route = metrics.get_route_name(scope)
+        DB_QUERIES.inc(stats.count, route=route)
+        DB_QUERIES_DURATION.inc(stats.duration, route=route)
+        DB_REPEATED_QUERIES.inc(stats.repeated, route=route)
+        n_plus_one_statements = stats.n_plus_one_statements()
+        if n_plus_one_statements:
+            DB_N_PLUS_ONE_REQUESTS.inc(route=route)
+        for statement, n in n_plus_one_statements:
+            logger.warning("N+1 queries on %s %s : %s times %s", scope["method"], route, n, statement)
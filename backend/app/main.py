@@ -1,9 +1,18 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 
+from app import send_reminders
 from app.api.api_v1.api import api_router
+from app.core import jobs, metrics
 from app.core.config import settings
+from app.db.query_stats import QueryStatsMiddleware
+from app.utils.http_utils import NotModified
+# the modules defining jobs, imported so that their jobs are registered before the runner starts
+from app.utils import email_utils  # noqa: F401
 
 tags_metadata = [
     {
@@ -43,6 +52,14 @@ tags_metadata = [
         "description": "Mainly for reading session types and status that exist in db. "
                        "<br>ℹ️ *For creating/updating, uncomment endpoints in source code...*",
     },
+    {
+        "name": "stats",
+        "description": "Precomputed statistics. **Allowed for admin user only.**",
+    },
+    {
+        "name": "search",
+        "description": "Users and sessions search. **Allowed for admin user only.**",
+    },
 ]
 
 """ Run the init_db_data.py to create a super user before launching the main app."""
@@ -61,6 +78,52 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+@app.on_event("startup")
+async def start_event_loop_lag_monitoring() -> None:
+    app.state.event_loop_lag_task = asyncio.create_task(metrics.monitor_event_loop_lag())
+
+
+@app.on_event("shutdown")
+async def stop_event_loop_lag_monitoring() -> None:
+    app.state.event_loop_lag_task.cancel()
+
+
+@app.on_event("startup")
+async def start_jobs_runner() -> None:
+    await jobs.runner.start()
+
+
+@app.on_event("shutdown")
+async def stop_jobs_runner() -> None:
+    await jobs.runner.stop()
+
+
+@app.on_event("startup")
+async def start_reminders_scheduling() -> None:
+    if settings.REMINDERS_ENABLED:
+        app.state.reminders_task = asyncio.create_task(send_reminders.schedule_reminders())
+
+
+@app.on_event("shutdown")
+async def stop_reminders_scheduling() -> None:
+    if settings.REMINDERS_ENABLED:
+        app.state.reminders_task.cancel()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics() -> PlainTextResponse:
+    """Prometheus text exposition format (to be scraped, e.g. only from the internal network)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.exception_handler(NotModified)
+async def not_modified_exception_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag})
+
 
 app.mount(settings.STATIC_DIR, StaticFiles(directory="app/static"), name='static')
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -9,4 +9,7 @@ from .session.session_type import SessionType  # noqa
 from .session.session_status import SessionStatus  # noqa
 from .availability import Availability  # noqa
 from .reservation import Reservation  # noqa
+from .speaker_week_stats import SpeakerWeekStats  # noqa
+from .change_counter import ChangeCounter  # noqa
+from .watermark import Watermark  # noqa
 from app.db.base_class import Base  # noqa
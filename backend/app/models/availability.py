@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, Integer, Date, Time, ForeignKey
+from sqlalchemy import Column, Integer, Date, Time, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -11,13 +11,20 @@ if TYPE_CHECKING:
 
 
 class Availability(Base):
-    id = Column(Integer, primary_key=True, index=True)
-    start_date = Column(Date, index=True, nullable=False)
-    end_date = Column(Date, index=True, nullable=False)
-    week_day = Column(Integer, index=True, nullable=False)
-    time = Column(Time, index=True, nullable=False)
-
-    speaker_id = Column(Integer, ForeignKey('speaker.id'), index=True, nullable=False)  # one to many
+    __table_args__ = (
+        # speaker's availabilities on a weekday (and time), see CRUDAvailability
+        Index("ix_availability_speaker_id_week_day_time", "speaker_id", "week_day", "time"),
+        # speaker's availabilities overlapping a period (end_date >= period start is the selective bound)
+        Index("ix_availability_speaker_id_end_date", "speaker_id", "end_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    week_day = Column(Integer, nullable=False)
+    time = Column(Time, nullable=False)
+
+    speaker_id = Column(Integer, ForeignKey('speaker.id'), nullable=False)  # one to many
     speaker = relationship("Speaker", back_populates="availabilities")
 
     reservation = relationship("Reservation", back_populates="availability", uselist=False)  # one to one
@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.db.base_class import Base
+
+
+class ChangeCounter(Base):
+    """
+    Version stamp of a resource scope (e.g. "speaker:12" for all availabilities and sessions of the speaker 12),
+    incremented on each writing in this scope (see crud/crud_change_counter.py).
+    """
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"ChangeCounter(scope={self.scope!r}, version={self.version!r})"
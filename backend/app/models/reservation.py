@@ -11,7 +11,7 @@ if TYPE_CHECKING:
 
 
 class Reservation(Base):
-    participant_id = Column(Integer, ForeignKey('participant.id'), primary_key=True, index=True)
+    participant_id = Column(Integer, ForeignKey('participant.id'), primary_key=True)
     availability_id = Column(Integer, ForeignKey('availability.id'), primary_key=True, index=True)
 
     participant = relationship("Participant", back_populates="reservation", uselist=False)
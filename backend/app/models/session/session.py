@@ -1,7 +1,8 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, Integer, Date, Time, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, Date, Time, ForeignKey, Text, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base_class import Base
 
@@ -10,16 +11,35 @@ if TYPE_CHECKING:
     from app.models.session.session_type import SessionType  # noqa: F401
     from app.models.session.session_status import SessionStatus  # noqa: F401
 
+COMMENTS_SEARCH_CONFIG = "simple"  # text search configuration : no stemming, comments can be in any language
 
-class Session(Base):
-    id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, index=True, nullable=False)
-    time = Column(Time, index=True, nullable=False)
-    comments = Column(Text, index=True)
 
-    participant_id = Column(Integer, ForeignKey('participant.id'), index=True, nullable=False)  # one to many
+class Session(Base):
+    __table_args__ = (
+        # the participant's or speaker's sessions of a period
+        Index("ix_session_participant_id_date_time", "participant_id", "date", "time"),
+        Index("ix_session_speaker_id_date_time", "speaker_id", "date", "time"),
+        # sessions of a date at a time (see CRUDSession.get_by_date_and_time())
+        Index("ix_session_date_time", "date", "time"),
+        # comments full text search (see CRUDSession.search_comments())
+        Index("ix_session_comments_tsv", "comments_tsv", postgresql_using="gin"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    time = Column(Time, nullable=False)
+    comments = Column(Text)
+    # generated by the db from comments (never written by the app), deferred : only loaded if explicitly accessed
+    comments_tsv = deferred(Column(TSVECTOR, Computed(f"to_tsvector('{COMMENTS_SEARCH_CONFIG}', "
+                                                      "coalesce(comments, ''))", persisted=True)))
+
+    participant_id = Column(Integer, ForeignKey('participant.id'), nullable=False)  # one to many
     participant = relationship("Participant", back_populates="sessions")
 
+    # denormalized participant.speaker_id (kept up to date by CRUDSession and CRUDParticipant) : speaker's sessions
+    # are read without joining participant (indexed by ix_session_speaker_id_date_time)
+    speaker_id = Column(Integer, ForeignKey('speaker.id'), nullable=False)
+
     type_id = Column(Integer, ForeignKey('sessiontype.id'), index=True, nullable=False)  # one to many
     type = relationship("SessionType", back_populates="sessions")
 
@@ -28,4 +48,5 @@ class Session(Base):
 
     def __repr__(self):
         return (f"Session(id={self.id!r}, date={self.date!s}, time={self.time!s}, comments={self.comments!r} "
-                f"participant_id={self.participant_id!r}, type_id={self.type_id!r}, status_id={self.status_id!r})")
+                f"participant_id={self.participant_id!r}, speaker_id={self.speaker_id!r}, type_id={self.type_id!r}, "
+                f"status_id={self.status_id!r})")
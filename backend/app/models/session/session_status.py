@@ -10,7 +10,7 @@ if TYPE_CHECKING:
 
 
 class SessionStatus(Base):
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, index=True, nullable=False, unique=True)
     sessions = relationship("Session", back_populates="status")  # many to one
 
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+
+from app.db.base_class import Base
+
+
+class SpeakerWeekStats(Base):
+    """
+    Precomputed counters by speaker and week (updated on each session/availability writing,
+    see crud/crud_speaker_week_stats.py).
+    """
+    speaker_id = Column(Integer, ForeignKey('speaker.id', ondelete="CASCADE"), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # monday of the week
+    available_slots = Column(Integer, nullable=False, default=0)
+    booked_slots = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
+    no_show = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (f"SpeakerWeekStats(speaker_id={self.speaker_id!r}, week_start={self.week_start!s}, "
+                f"available_slots={self.available_slots!r}, booked_slots={self.booked_slots!r}, "
+                f"done={self.done!r}, no_show={self.no_show!r})")
@@ -4,7 +4,7 @@ from app.models.user.user import User
 
 
 class Admin(User):
-    id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True, index=True)
+    id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True)
 
     __mapper_args__ = {
         'polymorphic_identity': 'admin',
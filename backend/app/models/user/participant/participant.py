@@ -14,7 +14,7 @@ if TYPE_CHECKING:
 
 
 class Participant(User):
-    id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True, index=True)
+    id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True)
 
     type_id = Column(Integer, ForeignKey('participanttype.id'), index=True, nullable=False)  # one to many
     type = relationship("ParticipantType", back_populates="participants")
@@ -10,9 +10,9 @@ if TYPE_CHECKING:
 
 
 class ParticipantType(Base):
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, index=True, nullable=False, unique=True)
-    nb_session_week = Column(Integer, index=True, nullable=False)
+    nb_session_week = Column(Integer, nullable=False)
     participants = relationship("Participant", back_populates="type")
 
     def __repr__(self):
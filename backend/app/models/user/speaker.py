@@ -11,9 +11,9 @@ if TYPE_CHECKING:
 
 
 class Speaker(User):
-    id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True, index=True)
+    id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True)
 
-    slot_time = Column(Integer, nullable=False, index=True)
+    slot_time = Column(Integer, nullable=False)
     # many to one :
     participants = relationship("Participant", back_populates="speaker", foreign_keys="Participant.speaker_id")
     availabilities = relationship("Availability", back_populates="speaker")  # many to one
@@ -1,26 +1,45 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import DDL, Boolean, Column, Index, Integer, String, event
 
 from app.db.base_class import Base
 
 
+def trigram_index(column: str) -> Index:
+    """GIN trigram index : serves ILIKE '%...%' (substring) and similarity searches on the column."""
+    return Index(f"ix_user_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
+
 class User(Base):
     """
     Base class of Admin, Speaker and Participant.
     """
-    id = Column(Integer, primary_key=True, index=True)
-    first_name = Column(String, index=True, nullable=False)
-    last_name = Column(String, index=True, nullable=False)
+    __table_args__ = (
+        # users search (see CRUDUser.search())
+        trigram_index("first_name"),
+        trigram_index("last_name"),
+        trigram_index("email"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    first_name = Column(String, nullable=False)
+    last_name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_api_key = Column(String, nullable=False)
     is_active = Column(Boolean(), default=True)
 
     profile = Column(String(50))
+    # no with_polymorphic (i.e no LEFT OUTER JOIN of all the subclasses tables) : a User query (e.g. auth, emails
+    # checks) selects the user table only. The loaded Speaker/Participant... profile columns are then unloaded :
+    # load them where they are read (see CRUDUser.load_profile()), as AsyncSession cannot lazy load them
     __mapper_args__ = {
         'polymorphic_identity': 'user',
         'polymorphic_on': profile,
-        'with_polymorphic': '*'
     }
 
     def __repr__(self):
         return (f"User(id={self.id!r}, email={self.email!r}, first_name={self.first_name!r}, "
                 f"last_name={self.last_name!r}, isactive={self.is_active!r}, profile={self.profile!r})")
+
+
+# trigram operators classes (created by the migrations, but needed by metadata.create_all() as well e.g. for tests)
+event.listen(User.__table__, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
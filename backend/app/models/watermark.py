@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.db.base_class import Base
+
+
+class Watermark(Base):
+    """
+    Where a periodic task stopped (e.g. "session_reminders" : the end of the last reminded sessions window),
+    so that it goes on from there after a restart (see crud/crud_watermark.py).
+    """
+    name = Column(String, primary_key=True)
+    value = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"Watermark(name={self.name!r}, value={self.value!r})"
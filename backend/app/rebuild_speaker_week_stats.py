@@ -0,0 +1,29 @@
+"""
+Recompute all speakers statistics by week (see crud/crud_speaker_week_stats.py).
+Statistics are updated on each session/availability writing but have to be rebuilt after changing
+a participant's type or speaker (or to initialize them for an existing db).
+"""
+
+import logging
+import asyncio
+
+from app import crud
+from app.db.db_session import AsyncSessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def rebuild() -> None:
+    async with AsyncSessionLocal() as db:
+        await crud.speaker_week_stats.rebuild(db)
+
+
+async def main() -> None:
+    logger.info("Rebuilding speakers statistics")
+    await rebuild()
+    logger.info("Speakers statistics rebuilt")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
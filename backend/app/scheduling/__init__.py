@@ -0,0 +1,11 @@
+"""
+Speakers scheduling rules (availabilities overlaps, free slots...) in pure python : no db access in here,
+the CRUD layer loads a SpeakerSnapshot (see CRUDSpeaker.get_scheduling_snapshot()) and the rules are checked on it.
+"""
+
+from app.scheduling.types import AvailabilityRule, Occupancy, Slot, SpeakerSnapshot  # noqa
+from app.scheduling.rules import has_weekday_in_period, overlapping_availabilities  # noqa
+from app.scheduling.rules import is_same_weekday_period, is_same_weekday_time_period  # noqa
+from app.scheduling.rules import has_too_close_previous, has_too_close_next  # noqa
+from app.scheduling.rules import availability_times, free_bitmap, free_times, free_start_times  # noqa
+from app.scheduling.rules import is_free, not_free_slots  # noqa
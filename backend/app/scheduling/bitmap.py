@@ -0,0 +1,66 @@
+"""
+Day bitmaps : an int whose bit m is set if something (an availability, a session slot...) starts at the minute m
+of the day (0 for 00:00 ... 1439 for 23:59). Sets of times become bitwise operations :
+    available & ~occupied            free start times
+    mask & free == mask              all the slot's consecutive times are free
+    free & (free >> slot_time) ...   start times of n consecutive free slots
+A bitmap fits in DAY_BYTES bytes (e.g. to be stored in a bytea/LargeBinary column).
+"""
+
+import datetime as dt
+from typing import Iterable, Iterator
+
+MINUTES_PER_DAY = 24 * 60
+DAY_BYTES = MINUTES_PER_DAY // 8
+
+
+def minute_of(time: dt.time) -> int:
+    """Times are handled at minute granularity (seconds are ignored)."""
+    return time.hour * 60 + time.minute
+
+
+def time_of(minute: int) -> dt.time:
+    return dt.time(minute // 60, minute % 60)
+
+
+def from_times(times: Iterable[dt.time]) -> int:
+    bitmap = 0
+    for time in times:
+        bitmap |= 1 << minute_of(time)
+    return bitmap
+
+
+def iter_times(bitmap: int) -> Iterator[dt.time]:
+    """The times of the set bits, in ascending order."""
+    while bitmap:
+        low_bit = bitmap & -bitmap
+        yield time_of(low_bit.bit_length() - 1)
+        bitmap ^= low_bit
+
+
+def slot_mask(time: dt.time, nb_slots: int, slot_time: int) -> int:
+    """
+    The start times of nb_slots consecutive slots from time (as add_time(), a time after midnight wraps around
+    to the beginning of the same day).
+    """
+    start = minute_of(time)
+    mask = 0
+    for i in range(max(nb_slots, 1)):
+        mask |= 1 << (start + i * slot_time) % MINUTES_PER_DAY
+    return mask
+
+
+def consecutive_starts(free: int, nb_slots: int, slot_time: int) -> int:
+    """The start times from which nb_slots consecutive slots are all in free (without wrapping around midnight)."""
+    starts = free
+    for i in range(1, max(nb_slots, 1)):
+        starts &= free >> (i * slot_time)
+    return starts
+
+
+def to_bytes(bitmap: int) -> bytes:
+    return bitmap.to_bytes(DAY_BYTES, "little")
+
+
+def from_bytes(data: bytes) -> int:
+    return int.from_bytes(data, "little")
@@ -0,0 +1,92 @@
+import datetime as dt
+from typing import Iterable
+
+from app.scheduling import bitmap
+from app.scheduling.types import AvailabilityRule, Slot, SpeakerSnapshot
+from app.utils import shift_time, weekday_ordinals
+
+
+def has_weekday_in_period(start_date: dt.date, end_date: dt.date, week_day: int) -> bool:
+    return len(weekday_ordinals(start_date, end_date, week_day)) > 0
+
+
+def overlapping_availabilities(snapshot: SpeakerSnapshot, candidate: AvailabilityRule,
+                               same_time: bool = False) -> list[AvailabilityRule]:
+    """Speaker's availabilities on the candidate's weekday (and time if same_time) which overlap its period."""
+    return [av for av in snapshot.availabilities_by_weekday.get(candidate.week_day, ())
+            if (not same_time or av.time == candidate.time)
+            and av.overlaps(candidate.start_date, candidate.end_date)]
+
+
+def is_same_weekday_time_period(snapshot: SpeakerSnapshot, candidate: AvailabilityRule) -> bool:
+    return bool(overlapping_availabilities(snapshot, candidate, same_time=True))
+
+
+def is_same_weekday_period(snapshot: SpeakerSnapshot, candidate: AvailabilityRule) -> bool:
+    return bool(overlapping_availabilities(snapshot, candidate))
+
+
+def has_too_close_previous(snapshot: SpeakerSnapshot, candidate: AvailabilityRule) -> bool:
+    """
+    True if an availability on the same weekday starts less than 1 slot_time before the candidate.
+    Once the candidate's period overlaps one of them, all the weekday availabilities are compared (whatever their
+    period).
+    """
+    if not is_same_weekday_period(snapshot, candidate):
+        return False
+    closest_possible_prev_time = shift_time(candidate.time, -snapshot.slot_time)
+    return any(closest_possible_prev_time < av.time < candidate.time
+               for av in snapshot.availabilities_by_weekday[candidate.week_day])
+
+
+def has_too_close_next(snapshot: SpeakerSnapshot, candidate: AvailabilityRule) -> bool:
+    """Same as has_too_close_previous() but for an availability starting less than 1 slot_time after."""
+    if not is_same_weekday_period(snapshot, candidate):
+        return False
+    closest_possible_next_time = shift_time(candidate.time, snapshot.slot_time)
+    return any(candidate.time < av.time < closest_possible_next_time
+               for av in snapshot.availabilities_by_weekday[candidate.week_day])
+
+
+def availability_times(snapshot: SpeakerSnapshot, date: dt.date) -> set[dt.time]:
+    return set(bitmap.iter_times(snapshot.availability_bitmap(date)))
+
+
+def free_bitmap(snapshot: SpeakerSnapshot, date: dt.date) -> int:
+    return snapshot.availability_bitmap(date) & ~snapshot.occupancy.bitmap(date)
+
+
+def free_times(snapshot: SpeakerSnapshot, date: dt.date) -> set[dt.time]:
+    return set(bitmap.iter_times(free_bitmap(snapshot, date)))
+
+
+def free_start_times(snapshot: SpeakerSnapshot, date: dt.date, nb_slots: int = 1) -> list[dt.time]:
+    """Sorted start times of nb_slots consecutive free slots on the date (e.g. for a participant's session)."""
+    return list(bitmap.iter_times(bitmap.consecutive_starts(free_bitmap(snapshot, date), nb_slots,
+                                                            snapshot.slot_time)))
+
+
+def is_free(snapshot: SpeakerSnapshot, slot: Slot) -> bool:
+    """
+    All the slot times have to be speaker's availabilities times on this date, and none already used by a session.
+    The snapshot has to contain the sessions of the slot date.
+    """
+    mask = slot.mask(snapshot.slot_time)
+    return mask & free_bitmap(snapshot, slot.date) == mask
+
+
+def not_free_slots(snapshot: SpeakerSnapshot, slots: Iterable[Slot]) -> list[Slot]:
+    """
+    Check many slots (e.g. sessions to create at once) : each one against the snapshot but also against
+    the previous free slots (which are booked in a copy of the snapshot occupancy).
+    Returns the slots which are not free (an empty list if all are free).
+    """
+    occupancy = snapshot.occupancy.copy()
+    not_free = []
+    for slot in slots:
+        mask = slot.mask(snapshot.slot_time)
+        if mask & snapshot.availability_bitmap(slot.date) & ~occupancy.bitmap(slot.date) == mask:
+            occupancy.add(slot)
+        else:
+            not_free.append(slot)
+    return not_free
@@ -0,0 +1,129 @@
+import datetime as dt
+from typing import Iterable
+
+from app.scheduling import bitmap
+from app.utils import slot_times
+
+
+class Slot:
+    """A session start (date + time) using nb_slots consecutive speaker's slots (i.e participant's nb_session_week)."""
+    __slots__ = ("date", "time", "nb_slots")
+
+    def __init__(self, date: dt.date, time: dt.time, nb_slots: int = 1) -> None:
+        self.date = date
+        self.time = time
+        self.nb_slots = max(nb_slots, 1)
+
+    def times(self, slot_time: int) -> list[dt.time]:
+        """The start times of all the consecutive slots used."""
+        return slot_times(self.time, self.nb_slots, slot_time)
+
+    def mask(self, slot_time: int) -> int:
+        """The same start times as a day bitmap."""
+        return bitmap.slot_mask(self.time, self.nb_slots, slot_time)
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, Slot)
+                and (self.date, self.time, self.nb_slots) == (other.date, other.time, other.nb_slots))
+
+    def __hash__(self) -> int:
+        return hash((self.date, self.time, self.nb_slots))
+
+    def __repr__(self) -> str:
+        return f"Slot(date={self.date!s}, time={self.time!s}, nb_slots={self.nb_slots!r})"
+
+
+class AvailabilityRule:
+    """A weekly recurring availability : every week_day between start and end dates, at time."""
+    __slots__ = ("id", "start_date", "end_date", "week_day", "time")
+
+    def __init__(self, id: int | None, start_date: dt.date, end_date: dt.date, week_day: int, time: dt.time) -> None:
+        self.id = id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.week_day = week_day
+        self.time = time
+
+    def overlaps(self, start_date: dt.date, end_date: dt.date) -> bool:
+        return start_date <= self.end_date and end_date >= self.start_date
+
+    def covers(self, date: dt.date) -> bool:
+        return self.week_day == date.weekday() and self.start_date <= date <= self.end_date
+
+    def __repr__(self) -> str:
+        return (f"AvailabilityRule(id={self.id!r}, start_date={self.start_date!s}, end_date={self.end_date!s}, "
+                f"week_day={self.week_day!r}, time={self.time!s})")
+
+
+class Occupancy:
+    """
+    Occupied slots start times by date, as day bitmaps (a session with nb_slots > 1 occupies its consecutive slots).
+    It can be dumped to bytes (e.g. to be stored in a bytea/LargeBinary column) : for each date, its ordinal
+    (4 bytes) and its bitmap (bitmap.DAY_BYTES bytes).
+    """
+    __slots__ = ("slot_time", "bitmaps")
+
+    RECORD_SIZE = 4 + bitmap.DAY_BYTES
+
+    def __init__(self, slot_time: int, slots: Iterable[Slot] = ()) -> None:
+        self.slot_time = slot_time
+        self.bitmaps: dict[dt.date, int] = {}
+        for slot in slots:
+            self.add(slot)
+
+    def add(self, slot: Slot) -> None:
+        self.bitmaps[slot.date] = self.bitmaps.get(slot.date, 0) | slot.mask(self.slot_time)
+
+    def bitmap(self, date: dt.date) -> int:
+        return self.bitmaps.get(date, 0)
+
+    def times(self, date: dt.date) -> set[dt.time]:
+        return set(bitmap.iter_times(self.bitmap(date)))
+
+    def copy(self) -> "Occupancy":
+        occupancy = Occupancy(self.slot_time)
+        occupancy.bitmaps = dict(self.bitmaps)
+        return occupancy
+
+    def to_bytes(self) -> bytes:
+        return b"".join(date.toordinal().to_bytes(4, "little") + bitmap.to_bytes(day_bitmap)
+                        for date, day_bitmap in sorted(self.bitmaps.items()) if day_bitmap)
+
+    @classmethod
+    def from_bytes(cls, slot_time: int, data: bytes) -> "Occupancy":
+        occupancy = cls(slot_time)
+        for offset in range(0, len(data), cls.RECORD_SIZE):
+            date = dt.date.fromordinal(int.from_bytes(data[offset:offset + 4], "little"))
+            occupancy.bitmaps[date] = bitmap.from_bytes(data[offset + 4:offset + cls.RECORD_SIZE])
+        return occupancy
+
+
+class SpeakerSnapshot:
+    """
+    Everything the scheduling rules need about a speaker, loaded at once (see CRUDSpeaker.get_scheduling_snapshot()) :
+    his availabilities and his sessions (occupancy), maybe only those of a period.
+    """
+    __slots__ = ("speaker_id", "slot_time", "availabilities", "availabilities_by_weekday", "occupancy",
+                 "availability_bitmaps")
+
+    def __init__(self, speaker_id: int, slot_time: int, availabilities: Iterable[AvailabilityRule] = (),
+                 sessions: Iterable[Slot] = ()) -> None:
+        self.speaker_id = speaker_id
+        self.slot_time = slot_time
+        self.availabilities = list(availabilities)
+        self.availabilities_by_weekday: dict[int, list[AvailabilityRule]] = {}
+        for availability in self.availabilities:
+            self.availabilities_by_weekday.setdefault(availability.week_day, []).append(availability)
+        self.occupancy = Occupancy(slot_time, sessions)
+        self.availability_bitmaps: dict[dt.date, int] = {}
+
+    def availability_bitmap(self, date: dt.date) -> int:
+        """The availabilities start times on the date (computed once by date)."""
+        if date not in self.availability_bitmaps:
+            self.availability_bitmaps[date] = bitmap.from_times(
+                av.time for av in self.availabilities_by_weekday.get(date.weekday(), ()) if av.covers(date))
+        return self.availability_bitmaps[date]
+
+    def __repr__(self) -> str:
+        return (f"SpeakerSnapshot(speaker_id={self.speaker_id!r}, slot_time={self.slot_time!r}, "
+                f"availabilities={len(self.availabilities)}, dates={len(self.occupancy.bitmaps)})")
@@ -10,3 +10,5 @@ from .session.session_status import SessionStatus, SessionStatusCreate, SessionS
 from .session.session_type import SessionType, SessionTypeCreate, SessionTypeInDB, SessionTypeUpdate  # noqa
 from .availability import Availability, AvailabilityCreate, AvailabilityInDB, AvailabilityUpdate  # noqa
 from .reservation import Reservation, ReservationCreate, ReservationInDB, ReservationUpdate  # noqa
+from .speaker_week_stats import SpeakerWeekStats, SpeakerWeekStatsInDB  # noqa
+from .search import SearchResults  # noqa
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+from app.schemas.user.user import User
+from app.schemas.session.session import Session
+
+
+class SearchResults(BaseModel):
+    """Each list is ranked (best matches first) and paginated with the same skip/limit."""
+    users: list[User] = []
+    sessions: list[Session] = []
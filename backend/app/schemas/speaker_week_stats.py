@@ -0,0 +1,31 @@
+import datetime as dt
+
+from pydantic import BaseModel, validator
+
+
+class SpeakerWeekStatsBase(BaseModel):
+    speaker_id: int
+    week_start: dt.date
+    available_slots: int = 0
+    booked_slots: int = 0
+    done: int = 0
+    no_show: int = 0
+
+
+class SpeakerWeekStatsInDBBase(SpeakerWeekStatsBase):
+    class Config:
+        orm_mode = True
+
+
+class SpeakerWeekStats(SpeakerWeekStatsInDBBase):
+    utilization: float = None  # booked_slots / available_slots
+
+    @validator("utilization", always=True)
+    def compute_utilization(cls, v: float | None, values: dict) -> float | None:
+        if not values.get("available_slots"):
+            return None
+        return round(values["booked_slots"] / values["available_slots"], 3)
+
+
+class SpeakerWeekStatsInDB(SpeakerWeekStatsInDBBase):
+    pass
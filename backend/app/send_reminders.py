@@ -0,0 +1,107 @@
+"""
+Send a reminder email to each participant having scheduled sessions in the next hours (settings.REMINDERS_HOURS_AHEAD),
+one email by participant for all their sessions. The sessions are streamed from one range query (see
+crud_session.py reminders_select()) and each chunk of rows is rendered then sent through a pool of SMTP connections
+(see utils/email_utils.py SMTPPool), so memory does not depend on the reminders number.
+Run by the app every REMINDERS_HOURS_AHEAD hours (as a background job, see core/jobs.py) if REMINDERS_ENABLED,
+or once (e.g. from a cron) :
+    $ cd backend
+    $ python -m app.send_reminders
+"""
+
+import asyncio
+import datetime as dt
+import logging
+from email.mime.multipart import MIMEMultipart
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app import crud
+from app.core.config import settings
+from app.core.jobs import runner
+from app.db.db_session import AsyncSessionLocal
+from app.utils import email_utils
+
+logger = logging.getLogger(__name__)
+
+
+async def recipients_batches(rows: AsyncResult) -> AsyncIterator[list[list[Any]]]:
+    """
+    Batches (about one by chunk of STREAM_YIELD_PER rows) of the rows grouped by recipient, the rows being sorted by
+    participant : the last group of a chunk is kept for the next one, as it may go on in it.
+    """
+    pending = []
+    async for chunk in rows.partitions(settings.STREAM_YIELD_PER):
+        groups = [list(group) for _, group in groupby(pending + chunk, key=attrgetter("participant_id"))]
+        pending = groups.pop()
+        if groups:
+            yield groups
+    if pending:
+        yield [pending]
+
+
+def build_reminders(groups: list[list[Any]]) -> list[MIMEMultipart]:
+    return [email_utils.build_session_reminder_email(
+        rows[0].email, rows[0].first_name,
+        [{"date": row.date, "time": row.time, "speaker_name": f"{row.speaker_first_name} {row.speaker_last_name}"}
+         for row in rows]) for rows in groups]
+
+
+REMINDERS_WATERMARK = "session_reminders"  # crud.watermark name : the end of the last reminded sessions window
+
+
+@runner.register
+async def send_session_reminders(hours_ahead: int = settings.REMINDERS_HOURS_AHEAD) -> int:
+    """
+    Return the number of sent reminders. The sessions window starts at the end of the last one (kept in the db) if
+    later than now : the sessions already reminded (e.g. before an app restart) are not reminded again.
+    If some reminders could not be sent, the window ends at the first session of them (the next run starts there).
+    If none could be sent (e.g. SMTP server down), raise so that the job is retried on the same window.
+    ⚠️ The reminders are sent at least once : a run failing (raising) part way is retried from its window start,
+    and the reminders of a participant having both sent and not sent reminders are sent again by the next run.
+    """
+    now = dt.datetime.now()
+    end = now + dt.timedelta(hours=hours_ahead)
+    sent = not_sent = 0
+    async with AsyncSessionLocal() as db:
+        start = max(now, await crud.watermark.get(db, REMINDERS_WATERMARK) or now)
+        if start >= end:
+            logger.info("Reminders already sent for the sessions to %s", start)
+            return 0
+        async with email_utils.SMTPPool() as smtp_pool:
+            rows = await crud.session.stream_reminders_rows(db, start, end)
+            async for groups in recipients_batches(rows):
+                sent_flags = await asyncio.to_thread(smtp_pool.send_all, build_reminders(groups))
+                for rows_group, is_sent in zip(groups, sent_flags):
+                    if not is_sent:  # (a participant's rows are sorted by date and time)
+                        end = min(end, dt.datetime.combine(rows_group[0].date, rows_group[0].time))
+                sent += sum(sent_flags)
+                not_sent += len(sent_flags) - sum(sent_flags)
+        if not_sent and not sent:
+            raise RuntimeError(f"None of the {not_sent} reminders could be sent")
+        if not_sent:
+            logger.warning("%s reminders not sent : the next run starts from their first session at %s",
+                           not_sent, end)
+        await crud.watermark.set(db, REMINDERS_WATERMARK, end)
+        await db.commit()
+    logger.info("%s reminders sent for the sessions from %s to %s", sent, start, end)
+    return sent
+
+
+async def schedule_reminders() -> None:
+    """
+    To run as a background task : enqueue the reminders job at start, then every REMINDERS_HOURS_AHEAD hours
+    (each run only covers the sessions after the previous window, see send_session_reminders()).
+    """
+    while True:
+        runner.enqueue("send_session_reminders", {"hours_ahead": settings.REMINDERS_HOURS_AHEAD},
+                       dedup_key="send_session_reminders")
+        await asyncio.sleep(settings.REMINDERS_HOURS_AHEAD * 3600)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(send_session_reminders())
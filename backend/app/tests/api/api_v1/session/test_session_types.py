@@ -95,3 +95,22 @@ async def test_update_session_type_existing_name(async_client: AsyncClient, db_t
                                headers=admin_token_headers, json=data)
     assert r.status_code == 400
     assert "A session type with this name already exists in the system..." in r.json().values()
+
+
+async def test_read_session_types_not_modified(async_client: AsyncClient, db_tests: AsyncSession,
+                                               admin_token_headers: dict[str, str]) -> None:
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/types", headers=admin_token_headers)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/types",
+                               headers={**admin_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag and not r.content
+
+    st = await crud.session_type.create(db_tests, obj_in=SessionTypeCreate(name=ut.random_lower_string(10)))
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/types",
+                               headers={**admin_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert st.name in [s_type["name"] for s_type in r.json()]
+    await crud.session_type.remove(db_tests, id=st.id)
@@ -8,7 +8,7 @@ from fastapi.encoders import jsonable_encoder
 from app.core.config import settings
 from app.tests import utils_for_testing as ut
 from app import crud
-from app.schemas import SessionCreate, SessionTypeCreate, SessionStatusCreate
+from app.schemas import SessionCreate, SessionTypeCreate, SessionStatusCreate, AvailabilityCreate
 
 # This is the same as using the @pytest.mark.anyio on all test functions in the module
 pytestmark = pytest.mark.anyio
@@ -70,6 +70,44 @@ async def test_read_sessions_mine_by_speaker_or_participant(async_client: AsyncC
     await crud.session.remove(db_tests, id=s3.id)
 
 
+async def test_read_sessions_mine_date_range(async_client: AsyncClient, db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id)
+    speaker_token_headers = await ut.speaker_authentication_token_from_email(client=async_client,
+                                                                             email=speaker.email, db=db_tests)
+    s1 = await ut.create_random_session(db_tests, participant_id=participant.id, date_=dt.date(2022, 3, 8))
+    s2 = await ut.create_random_session(db_tests, participant_id=participant.id, date_=dt.date(2022, 3, 20))
+
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/mine",
+                               params={"from": "2022-03-07", "to": "2022-03-13"}, headers=speaker_token_headers)
+    assert r.status_code == 200
+    assert [s["id"] for s in r.json()] == [s1.id]
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/mine",
+                               params={"from": "2022-03-13"}, headers=speaker_token_headers)
+    assert [s["id"] for s in r.json()] == [s2.id]
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/mine",
+                               params={"from": "2022-03-13", "to": "2022-03-07"}, headers=speaker_token_headers)
+    assert r.status_code == 400
+    await crud.session.remove(db_tests, id=s1.id)
+    await crud.session.remove(db_tests, id=s2.id)
+
+
+async def test_read_sessions_mine_query_budget(async_client: AsyncClient, db_tests: AsyncSession,
+                                               query_budget) -> None:
+    """The number of queries must not depend on the number of sessions (no N+1 queries)."""
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id)
+    speaker_token_headers = await ut.speaker_authentication_token_from_email(client=async_client,
+                                                                             email=speaker.email, db=db_tests)
+    sessions = [await ut.create_random_session(db_tests, participant_id=participant.id) for _ in range(10)]
+    with query_budget(10, max_repeated=0):
+        r = await async_client.get(f"{settings.API_V1_STR}/sessions/mine", headers=speaker_token_headers)
+    assert r.status_code == 200
+    assert len(r.json()) == 10
+    for session in sessions:
+        await crud.session.remove(db_tests, id=session.id)
+
+
 async def test_read_sessions_mine_by_not_speaker_nor_participant(async_client: AsyncClient,
                                                                  admin_token_headers: dict[str, str]) -> None:
     """Unnecessary test that actually tests the Depends() which is already tested in test_deps.py."""
@@ -157,3 +195,101 @@ async def test_create_session_speaker_not_free(async_client: AsyncClient, db_tes
     assert mock_spk_is_free.called
     assert ("Cannot create this session. Please, check if Speaker has corresponding availability "
             "and if there is no session that already exists...") in r.json().values()
+
+
+async def test_create_sessions_bulk_by_speaker(async_client: AsyncClient, db_tests: AsyncSession,
+                                               db_session_type_status) -> None:
+    s_type = db_session_type_status["s_type"]
+    s_status = db_session_type_status["s_status"]
+    speaker = await ut.create_random_speaker(db_tests, slot_time=30)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id, p_type_name="initial")
+    speaker_token_headers = await ut.speaker_authentication_token_from_email(client=async_client, email=speaker.email,
+                                                                             db=db_tests)
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 3, 1),
+                                                                               end_date=dt.date(2022, 3, 31),
+                                                                               week_day=0, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    # mondays 07/03/22, 14/03/22 and 21/03/22 at 9:00
+    data = [jsonable_encoder(SessionCreate(date=dt.date(2022, 3, day), time=dt.time(9), participant_id=participant.id,
+                                           type_name=s_type.name, status_name=s_status.name))
+            for day in (7, 14, 21)]
+    r = await async_client.post(f"{settings.API_V1_STR}/sessions/bulk", headers=speaker_token_headers, json=data)
+    assert r.status_code == 200
+    r_sessions = r.json()
+    assert len(r_sessions) == 3
+    for r_session in r_sessions:
+        assert r_session["participant_id"] == participant.id
+        assert r_session["type_name"] == s_type.name
+        await crud.session.remove(db_tests, id=r_session["id"])
+    await crud.availability.remove(db_tests, id=avail.id)
+
+
+async def test_create_sessions_bulk_conflicting_sessions(async_client: AsyncClient, db_tests: AsyncSession,
+                                                         db_session_type_status) -> None:
+    s_type = db_session_type_status["s_type"]
+    s_status = db_session_type_status["s_status"]
+    speaker = await ut.create_random_speaker(db_tests, slot_time=30)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id, p_type_name="initial")
+    participant_token_headers = await ut.participant_authentication_token_from_email(client=async_client,
+                                                                                     email=participant.email,
+                                                                                     db=db_tests)
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 3, 1),
+                                                                               end_date=dt.date(2022, 3, 31),
+                                                                               week_day=0, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    # twice monday 07/03/22 at 9:00 => none session is created
+    data = [jsonable_encoder(SessionCreate(date=dt.date(2022, 3, 7), time=dt.time(9),
+                                           type_name=s_type.name, status_name=s_status.name))
+            for _ in range(2)]
+    r = await async_client.post(f"{settings.API_V1_STR}/sessions/bulk", headers=participant_token_headers, json=data)
+    assert r.status_code == 400
+    assert "2022-03-07 09:00:00" in r.json()["detail"]
+    assert not await crud.session.get_by_date_speaker(db_tests, dt.date(2022, 3, 7), speaker.id)
+    await crud.availability.remove(db_tests, id=avail.id)
+
+
+async def test_read_sessions_mine_ical_by_speaker_or_participant(async_client: AsyncClient,
+                                                                 db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id)
+    speaker_token_headers = await ut.speaker_authentication_token_from_email(client=async_client,
+                                                                             email=speaker.email, db=db_tests)
+    participant_token_headers = await ut.participant_authentication_token_from_email(client=async_client,
+                                                                                     email=participant.email,
+                                                                                     db=db_tests)
+    s1 = await ut.create_random_session(db_tests, participant_id=participant.id)
+    s2 = await ut.create_random_session(db_tests, participant_id=participant.id)
+
+    for token_headers in (speaker_token_headers, participant_token_headers):
+        r = await async_client.get(f"{settings.API_V1_STR}/sessions/mine.ics", headers=token_headers)
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/calendar")
+        assert r.text.count("BEGIN:VEVENT") == 2
+        assert f"UID:session-{s1.id}@" in r.text and f"UID:session-{s2.id}@" in r.text
+
+        r2 = await async_client.get(f"{settings.API_V1_STR}/sessions/mine.ics",
+                                    headers={**token_headers, "If-None-Match": r.headers["etag"]})
+        assert r2.status_code == 304
+    await crud.session.remove(db_tests, id=s1.id)
+    await crud.session.remove(db_tests, id=s2.id)
+
+
+async def test_export_all_sessions_csv_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
+                                                admin_token_headers: dict[str, str]) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id)
+    s1 = await ut.create_random_session(db_tests, participant_id=participant.id)
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/export?format=csv", headers=admin_token_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    lines = r.text.splitlines()
+    assert lines[0].startswith("id,date,time,comments,type_name,status_name,participant_id")
+    s1_line = next(line for line in lines[1:] if line.startswith(f"{s1.id},"))
+    assert participant.email in s1_line and speaker.email in s1_line
+    await crud.session.remove(db_tests, id=s1.id)
+
+
+async def test_export_all_sessions_by_not_admin(async_client: AsyncClient,
+                                                speaker_token_headers: dict[str, str]) -> None:
+    r = await async_client.get(f"{settings.API_V1_STR}/sessions/export", headers=speaker_token_headers)
+    assert r.status_code == 400
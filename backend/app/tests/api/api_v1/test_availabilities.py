@@ -253,3 +253,55 @@ class TestEndpointsAvailabilities:
         r_avail = r.json()
         assert spk1.id in r_avail.values()
         await crud.availability.remove(db_tests, id=r_avail["id"])
+
+
+async def test_read_availabilities_mine_not_modified(async_client: AsyncClient, db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    speaker_token_headers = await ut.speaker_authentication_token_from_email(client=async_client,
+                                                                             email=speaker.email, db=db_tests)
+    r = await async_client.get(f"{settings.API_V1_STR}/availabilities/mine", headers=speaker_token_headers)
+    assert r.status_code == 200 and r.json() == []
+    etag = r.headers["etag"]
+    r = await async_client.get(f"{settings.API_V1_STR}/availabilities/mine",
+                               headers={**speaker_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 2, 2),
+                                                                               end_date=dt.date(2022, 3, 31),
+                                                                               week_day=0, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    r = await async_client.get(f"{settings.API_V1_STR}/availabilities/mine",
+                               headers={**speaker_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert [av["id"] for av in r.json()] == [avail.id]
+    await crud.availability.remove(db_tests, id=avail.id)
+
+
+async def test_read_availabilities_mine_ical(async_client: AsyncClient, db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests, slot_time=30)
+    speaker_token_headers = await ut.speaker_authentication_token_from_email(client=async_client,
+                                                                             email=speaker.email, db=db_tests)
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 2, 2),
+                                                                               end_date=dt.date(2022, 3, 31),
+                                                                               week_day=0, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    r = await async_client.get(f"{settings.API_V1_STR}/availabilities/mine.ics", headers=speaker_token_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/calendar")
+    assert r.text.startswith("BEGIN:VCALENDAR\r\n") and r.text.endswith("END:VCALENDAR\r\n")
+    assert r.text.count("BEGIN:VEVENT") == 1
+    assert "RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20220331T235959" in r.text
+
+    etag = r.headers["etag"]
+    r = await async_client.get(f"{settings.API_V1_STR}/availabilities/mine.ics",
+                               headers={**speaker_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert not r.content
+
+    await crud.availability.update(db_tests, db_obj=avail, obj_in=AvailabilityUpdate(end_date=dt.date(2022, 3, 15)))
+    r = await async_client.get(f"{settings.API_V1_STR}/availabilities/mine.ics",
+                               headers={**speaker_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    await crud.availability.remove(db_tests, id=avail.id)
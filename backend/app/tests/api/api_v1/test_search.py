@@ -0,0 +1,34 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.tests import utils_for_testing as ut
+from app import crud
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+async def test_search_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
+                               admin_token_headers: dict[str, str]) -> None:
+    email = ut.random_email()
+    speaker = await ut.create_random_speaker(db_tests, email=email)
+    r = await async_client.get(f"{settings.API_V1_STR}/search", params={"q": email[:10], "scope": "users"},
+                               headers=admin_token_headers)
+    assert r.status_code == 200
+    results = r.json()
+    assert [user["id"] for user in results["users"]] == [speaker.id]
+    assert results["sessions"] == []
+    await crud.speaker.remove(db_tests, id=speaker.id)
+
+
+async def test_search_too_short_query(async_client: AsyncClient, admin_token_headers: dict[str, str]) -> None:
+    r = await async_client.get(f"{settings.API_V1_STR}/search", params={"q": "ab"}, headers=admin_token_headers)
+    assert r.status_code == 422
+
+
+async def test_search_by_not_admin(async_client: AsyncClient, speaker_token_headers: dict[str, str]) -> None:
+    r = await async_client.get(f"{settings.API_V1_STR}/search", params={"q": "abc"},
+                               headers=speaker_token_headers)
+    assert r.status_code == 400
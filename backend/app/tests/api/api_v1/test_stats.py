@@ -0,0 +1,44 @@
+import datetime as dt
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.tests import utils_for_testing as ut
+from app import crud
+from app.schemas import AvailabilityCreate, SessionUpdate
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+async def test_read_speakers_stats_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
+                                            admin_token_headers: dict[str, str]) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id, p_type_name="initial")
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 3, 1),
+                                                                               end_date=dt.date(2022, 3, 31),
+                                                                               week_day=0, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    session = await ut.create_random_session(db_tests, participant_id=participant.id, date_=dt.date(2022, 3, 7))
+    await crud.session.update(db_tests, db_obj=session,
+                              obj_in=SessionUpdate(status_name=settings.SESSION_STATUS_SCHEDULED))
+
+    r = await async_client.get(f"{settings.API_V1_STR}/stats/speakers",
+                               params={"speaker_id": speaker.id, "start_date": "2022-03-07", "end_date": "2022-03-13"},
+                               headers=admin_token_headers)
+    assert r.status_code == 200
+    stats = r.json()
+    assert len(stats) == 1
+    assert stats[0]["week_start"] == "2022-03-07"
+    assert stats[0]["available_slots"] == 1 and stats[0]["booked_slots"] == 1
+    assert stats[0]["utilization"] == 1
+    await crud.session.remove(db_tests, id=session.id)
+    await crud.availability.remove(db_tests, id=avail.id)
+
+
+async def test_read_speakers_stats_by_not_admin(async_client: AsyncClient,
+                                                speaker_token_headers: dict[str, str]) -> None:
+    r = await async_client.get(f"{settings.API_V1_STR}/stats/speakers", headers=speaker_token_headers)
+    assert r.status_code == 400
@@ -192,6 +192,17 @@ async def test_update_participant_by_id_existing_email_by_admin(async_client: As
     assert "A user with this email already exists in the system..." in r.json().values()
 
 
+async def test_update_participant_by_id_unchanged_email_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
+                                                                 admin_token_headers: dict[str, str]) -> None:
+    participant_to_update = await ut.create_random_participant(db_tests)
+    data = jsonable_encoder(ParticipantUpdate(first_name="Sandra", email=participant_to_update.email),
+                            exclude_unset=True)
+    r = await async_client.put(f"{settings.API_V1_STR}/users/participants/{participant_to_update.id}",
+                               headers=admin_token_headers, json=data)
+    assert r.status_code == 200
+    assert "Sandra" in r.json().values()
+
+
 async def test_update_participant_by_id_not_existing_by_admin(async_client: AsyncClient,
                                                               admin_token_headers: dict[str, str]) -> None:
 
@@ -95,13 +95,24 @@ async def test_update_admin_by_id_by_admin(async_client: AsyncClient, db_tests:
 async def test_update_admin_by_id_existing_email_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
                                                           admin_token_headers: dict[str, str]) -> None:
     db_admin = await ut.create_random_admin(db_tests)
-    data = jsonable_encoder(AdminUpdate(first_name="Sandra", email=db_admin.email), exclude_unset=True)
+    other_admin = await ut.create_random_admin(db_tests)
+    data = jsonable_encoder(AdminUpdate(first_name="Sandra", email=other_admin.email), exclude_unset=True)
     r = await async_client.put(f"{settings.API_V1_STR}/users/admin/{db_admin.id}",
                                headers=admin_token_headers, json=data)
     assert r.status_code == 400
     assert "A user with this email already exists in the system..." in r.json().values()
 
 
+async def test_update_admin_by_id_unchanged_email_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
+                                                           admin_token_headers: dict[str, str]) -> None:
+    db_admin = await ut.create_random_admin(db_tests)
+    data = jsonable_encoder(AdminUpdate(first_name="Sandra", email=db_admin.email), exclude_unset=True)
+    r = await async_client.put(f"{settings.API_V1_STR}/users/admin/{db_admin.id}",
+                               headers=admin_token_headers, json=data)
+    assert r.status_code == 200
+    assert "Sandra" in r.json().values()
+
+
 async def test_update_admin_by_id_not_existing_by_admin(async_client: AsyncClient,
                                                         admin_token_headers: dict[str, str]) -> None:
 
@@ -96,13 +96,24 @@ async def test_update_speaker_by_id_by_admin(async_client: AsyncClient, db_tests
 async def test_update_speaker_by_id_existing_email_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
                                                             admin_token_headers: dict[str, str]) -> None:
     db_speaker = await ut.create_random_speaker(db_tests)
-    data = jsonable_encoder(SpeakerUpdate(first_name="Sandra", email=db_speaker.email), exclude_unset=True)
+    other_speaker = await ut.create_random_speaker(db_tests)
+    data = jsonable_encoder(SpeakerUpdate(first_name="Sandra", email=other_speaker.email), exclude_unset=True)
     r = await async_client.put(f"{settings.API_V1_STR}/users/speaker/{db_speaker.id}",
                                headers=admin_token_headers, json=data)
     assert r.status_code == 400
     assert "A user with this email already exists in the system..." in r.json().values()
 
 
+async def test_update_speaker_by_id_unchanged_email_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
+                                                             admin_token_headers: dict[str, str]) -> None:
+    db_speaker = await ut.create_random_speaker(db_tests)
+    data = jsonable_encoder(SpeakerUpdate(first_name="Sandra", email=db_speaker.email), exclude_unset=True)
+    r = await async_client.put(f"{settings.API_V1_STR}/users/speaker/{db_speaker.id}",
+                               headers=admin_token_headers, json=data)
+    assert r.status_code == 200
+    assert "Sandra" in r.json().values()
+
+
 async def test_update_speaker_by_id_not_existing_by_admin(async_client: AsyncClient,
                                                           admin_token_headers: dict[str, str]) -> None:
     data = jsonable_encoder(SpeakerUpdate(first_name="Sandra"), exclude_unset=True)
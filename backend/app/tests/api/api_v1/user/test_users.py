@@ -29,6 +29,32 @@ async def test_read_all_users_by_admin(async_client: AsyncClient, db_tests: Asyn
     assert a_db.id == a.id
 
 
+async def test_read_all_users_stream_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
+                                              admin_token_headers: dict[str, str]) -> None:
+    p = await ut.create_random_participant(db_tests)
+    r = await async_client.get(f"{settings.API_V1_STR}/users/all/", headers=admin_token_headers,
+                               params={"stream": True, "limit": 100_000})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    users = r.json()
+    r = await async_client.get(f"{settings.API_V1_STR}/users/all/", headers=admin_token_headers,
+                               params={"limit": 100_000})
+    assert sorted(users, key=lambda user: user["id"]) == sorted(r.json(), key=lambda user: user["id"])
+    assert {"id": p.id, "email": p.email, "is_active": True, "first_name": p.first_name, "last_name": p.last_name,
+            "profile": "participant"} in users
+
+
+async def test_read_all_users_stream_not_limited_by_default(async_client: AsyncClient, db_tests: AsyncSession,
+                                                            admin_token_headers: dict[str, str]) -> None:
+    for _ in range(101 - len(await crud.user.get_multi(db_tests, limit=None))):
+        await ut.create_random_participant(db_tests)
+    r = await async_client.get(f"{settings.API_V1_STR}/users/all/", headers=admin_token_headers)
+    assert len(r.json()) == 100
+    r = await async_client.get(f"{settings.API_V1_STR}/users/all/", headers=admin_token_headers,
+                               params={"stream": True})
+    assert len(r.json()) == len(await crud.user.get_multi(db_tests, limit=None)) > 100
+
+
 async def test_read_all_users_by_not_admin(async_client: AsyncClient, db_tests: AsyncSession,
                                            speaker_token_headers: dict[str, str]) -> None:
     """Unnecessary test that actually tests the Depends() which is already tested in test_deps.py."""
@@ -65,6 +91,16 @@ async def test_update_user_me_existing_email(async_client: AsyncClient, db_tests
     assert "A user with this email already exists in the system..." in r.json().values()
 
 
+async def test_update_user_me_unchanged_email(async_client: AsyncClient,
+                                              participant_token_headers: dict[str, str]) -> None:
+    r = await async_client.get(f"{settings.API_V1_STR}/users/me", headers=participant_token_headers)
+    email = r.json()["email"]
+    data = {"first_name": "Sandra", "email": email}
+    r = await async_client.put(f"{settings.API_V1_STR}/users/me", headers=participant_token_headers, json=data)
+    assert r.status_code == 200
+    assert "Sandra" in r.json().values()
+
+
 async def test_read_user_by_id_by_admin(async_client: AsyncClient, db_tests: AsyncSession,
                                         admin_token_headers: dict[str, str]) -> None:
     p = await ut.create_random_participant(db_tests)
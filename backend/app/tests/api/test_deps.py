@@ -1,8 +1,11 @@
 import pytest
-from fastapi import HTTPException
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
 import jose
 
+from app import crud
 from app.api import deps
+from app.crud.base import UNIT_OF_WORK
 
 # This is the same as using the @pytest.mark.anyio on all test functions in the module
 pytestmark = pytest.mark.anyio
@@ -15,7 +18,7 @@ async def test_get_current_user_jwt_ok_and_user_found(mocker):
         "token_type": "bearer",
         "sub": 1
         }
-    mock_crud_user_get = mocker.patch('app.crud.user.get')
+    mock_crud_user_get = mocker.patch.object(crud.user, 'get')
     mock_crud_user_get.return_value = "user found and authenticate!"
     assert await deps.check_jwt_and_get_current_user() == "user found and authenticate!"
     mock_decode.assert_called_once()
@@ -29,7 +32,7 @@ async def test_get_current_user_jwt_validation_error_raises_HTTPException(mocker
         "token_type": "bearer",
         "sub": "str user id"  # to produce the pydantic ValidationError
         }
-    mock_crud_user_get = mocker.patch('app.crud.user.get')
+    mock_crud_user_get = mocker.patch.object(crud.user, 'get')
     with pytest.raises(HTTPException) as he:
         await deps.check_jwt_and_get_current_user()
     assert "Could not validate credentials" in str(he.getrepr())
@@ -40,7 +43,7 @@ async def test_get_current_user_jwt_validation_error_raises_HTTPException(mocker
 async def test_get_current_user_jwt_JWTError_raises_HTTPException(mocker):
     mock_decode = mocker.patch('jose.jwt.decode')
     mock_decode.side_effect = jose.jwt.JWTError
-    mock_crud_user_get = mocker.patch('app.crud.user.get')
+    mock_crud_user_get = mocker.patch.object(crud.user, 'get')
     with pytest.raises(HTTPException) as he:
         await deps.check_jwt_and_get_current_user()
     assert "Could not validate credentials" in str(he.getrepr())
@@ -55,7 +58,7 @@ async def test_get_current_user_jwt_ok_but_user_not_found_raises_HTTPException(m
         "token_type": "bearer",
         "sub": 1
         }
-    mock_crud_user_get = mocker.patch('app.crud.user.get')
+    mock_crud_user_get = mocker.patch.object(crud.user, 'get')
     mock_crud_user_get.return_value = False
     with pytest.raises(HTTPException) as he:
         await deps.check_jwt_and_get_current_user()
@@ -65,14 +68,14 @@ async def test_get_current_user_jwt_ok_but_user_not_found_raises_HTTPException(m
 
 
 async def test_get_current_active_user_active_user(mocker):
-    mock_crud_user_is_active = mocker.patch('app.crud.user.is_active')
+    mock_crud_user_is_active = mocker.patch.object(crud.user, 'is_active')
     mock_crud_user_is_active.return_value = True
     assert await deps.get_current_active_user()
     mock_crud_user_is_active.assert_called_once()
 
 
 async def test_get_current_active_user_inactive_user_raises_HTTPException(mocker):
-    mock_crud_user_is_active = mocker.patch('app.crud.user.is_active')
+    mock_crud_user_is_active = mocker.patch.object(crud.user, 'is_active')
     mock_crud_user_is_active.return_value = False
     with pytest.raises(HTTPException) as he:
         await deps.get_current_active_user()
@@ -81,29 +84,33 @@ async def test_get_current_active_user_inactive_user_raises_HTTPException(mocker
 
 
 async def test_get_current_active_speaker_or_admin_user_admin_user(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_load_profile = mocker.patch.object(crud.user, 'load_profile', side_effect=lambda db, user: user)
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = False
-    mock_crud_user_is_admin = mocker.patch('app.crud.user.is_admin')
+    mock_crud_user_is_admin = mocker.patch.object(crud.user, 'is_admin')
     mock_crud_user_is_admin.return_value = True
-    assert await deps.get_current_active_speaker_or_admin_user()
+    assert await deps.get_current_active_speaker_or_admin_user(db="db", current_user="user") == "user"
+    mock_crud_user_load_profile.assert_called_once_with("db", "user")
     mock_crud_user_is_speaker.assert_called_once()
     mock_crud_user_is_admin.assert_called_once()
 
 
 async def test_get_current_active_speaker_or_admin_user_speaker_user(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_load_profile = mocker.patch.object(crud.user, 'load_profile', side_effect=lambda db, user: user)
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = True
-    mock_crud_user_is_admin = mocker.patch('app.crud.user.is_admin')
+    mock_crud_user_is_admin = mocker.patch.object(crud.user, 'is_admin')
     mock_crud_user_is_admin.return_value = False
-    assert await deps.get_current_active_speaker_or_admin_user()
+    assert await deps.get_current_active_speaker_or_admin_user(db="db", current_user="user") == "user"
+    mock_crud_user_load_profile.assert_called_once_with("db", "user")
     mock_crud_user_is_speaker.assert_called_once()
     mock_crud_user_is_admin.assert_not_called()
 
 
 async def test_get_current_active_speaker_or_admin_user_both_false_raises_HTTPException(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = False
-    mock_crud_user_is_admin = mocker.patch('app.crud.user.is_admin')
+    mock_crud_user_is_admin = mocker.patch.object(crud.user, 'is_admin')
     mock_crud_user_is_admin.return_value = False
     with pytest.raises(HTTPException) as he:
         await deps.get_current_active_speaker_or_admin_user()
@@ -113,29 +120,33 @@ async def test_get_current_active_speaker_or_admin_user_both_false_raises_HTTPEx
 
 
 async def test_get_current_active_speaker_or_participant_user_speaker_user(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_load_profile = mocker.patch.object(crud.user, 'load_profile', side_effect=lambda db, user: user)
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = True
-    mock_crud_user_is_participant = mocker.patch('app.crud.user.is_participant')
+    mock_crud_user_is_participant = mocker.patch.object(crud.user, 'is_participant')
     mock_crud_user_is_participant.return_value = False
-    assert await deps.get_current_active_speaker_or_participant_user()
+    assert await deps.get_current_active_speaker_or_participant_user(db="db", current_user="user") == "user"
+    mock_crud_user_load_profile.assert_called_once_with("db", "user")
     mock_crud_user_is_speaker.assert_called_once()
     mock_crud_user_is_participant.assert_not_called()
 
 
 async def test_get_current_active_speaker_or_participant_user_participant_user(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_load_profile = mocker.patch.object(crud.user, 'load_profile', side_effect=lambda db, user: user)
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = False
-    mock_crud_user_is_participant = mocker.patch('app.crud.user.is_participant')
+    mock_crud_user_is_participant = mocker.patch.object(crud.user, 'is_participant')
     mock_crud_user_is_participant.return_value = True
-    assert await deps.get_current_active_speaker_or_participant_user()
+    assert await deps.get_current_active_speaker_or_participant_user(db="db", current_user="user") == "user"
+    mock_crud_user_load_profile.assert_called_once_with("db", "user")
     mock_crud_user_is_speaker.assert_called_once()
     mock_crud_user_is_participant.assert_called_once()
 
 
 async def test_get_current_active_speaker_or_participant_user_both_false_raises_HTTPException(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = False
-    mock_crud_user_is_participant = mocker.patch('app.crud.user.is_participant')
+    mock_crud_user_is_participant = mocker.patch.object(crud.user, 'is_participant')
     mock_crud_user_is_participant.return_value = False
     with pytest.raises(HTTPException) as he:
         await deps.get_current_active_speaker_or_participant_user()
@@ -145,14 +156,14 @@ async def test_get_current_active_speaker_or_participant_user_both_false_raises_
 
 
 async def test_get_current_active_admin_user_admin_user(mocker):
-    mock_crud_user_is_admin = mocker.patch('app.crud.user.is_admin')
+    mock_crud_user_is_admin = mocker.patch.object(crud.user, 'is_admin')
     mock_crud_user_is_admin.return_value = True
     assert await deps.get_current_active_admin_user()
     mock_crud_user_is_admin.assert_called_once()
 
 
 async def test_get_current_active_admin_user_not_admin_user(mocker):
-    mock_crud_user_is_admin = mocker.patch('app.crud.user.is_admin')
+    mock_crud_user_is_admin = mocker.patch.object(crud.user, 'is_admin')
     mock_crud_user_is_admin.return_value = False
     with pytest.raises(HTTPException) as he:
         await deps.get_current_active_admin_user()
@@ -161,16 +172,68 @@ async def test_get_current_active_admin_user_not_admin_user(mocker):
 
 
 async def test_get_current_active_speaker_user_speaker_user(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_load_profile = mocker.patch.object(crud.user, 'load_profile', side_effect=lambda db, user: user)
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = True
-    assert await deps.get_current_active_speaker_user()
+    assert await deps.get_current_active_speaker_user(db="db", current_user="user") == "user"
+    mock_crud_user_load_profile.assert_called_once_with("db", "user")
     mock_crud_user_is_speaker.assert_called_once()
 
 
 async def test_get_current_active_speaker_user_not_speaker_user(mocker):
-    mock_crud_user_is_speaker = mocker.patch('app.crud.user.is_speaker')
+    mock_crud_user_is_speaker = mocker.patch.object(crud.user, 'is_speaker')
     mock_crud_user_is_speaker.return_value = False
     with pytest.raises(HTTPException) as he:
         await deps.get_current_active_speaker_user()
     assert "To do this, the user has to be a Speaker user" in str(he.getrepr())
     mock_crud_user_is_speaker.assert_called_once()
+
+
+class FakeDb:
+    """Only what a unit of work uses of an AsyncSession."""
+    def __init__(self) -> None:
+        self.info, self.ends = {}, []
+
+    async def commit(self) -> None:
+        self.ends.append("commit")
+
+    async def rollback(self) -> None:
+        self.ends.append("rollback")
+
+
+def transactional_app(db: FakeDb) -> FastAPI:
+    router = APIRouter(route_class=deps.TransactionalRoute)
+
+    @router.get("/ok")
+    async def ok(db_: FakeDb = Depends(deps.get_transactional_db)) -> dict:
+        assert db_.info[UNIT_OF_WORK]
+        return {}
+
+    @router.get("/fail")
+    async def fail(db_: FakeDb = Depends(deps.get_transactional_db)) -> dict:
+        raise HTTPException(status_code=400, detail="check failed after writes")
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[deps.get_async_db] = lambda: db
+    return app
+
+
+def test_transactional_route_commits_once_when_endpoint_returns() -> None:
+    db = FakeDb()
+    r = TestClient(transactional_app(db)).get("/ok")
+    assert r.status_code == 200
+    assert db.ends == ["commit"] and UNIT_OF_WORK not in db.info
+
+
+def test_transactional_route_rolls_back_when_endpoint_raises() -> None:
+    db = FakeDb()
+    r = TestClient(transactional_app(db)).get("/fail")
+    assert r.status_code == 400
+    assert db.ends == ["rollback"] and UNIT_OF_WORK not in db.info
+
+
+async def test_get_transactional_db_outside_transactional_route_raises() -> None:
+    request = Request({"type": "http", "state": {}})
+    with pytest.raises(RuntimeError):
+        await deps.get_transactional_db(request, FakeDb())
@@ -1,4 +1,5 @@
-from typing import Generator
+from contextlib import contextmanager
+from typing import Callable, Generator, Iterator
 
 import pytest
 from httpx import AsyncClient
@@ -7,6 +8,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.db.init_db import initialize_db
+from app.db import query_stats
 from app.main import app
 from app.api.deps import get_async_db
 from app import models
@@ -85,3 +87,23 @@ async def participant_token_headers(async_client: AsyncClient, db_tests: AsyncSe
         email=settings.EMAIL_TEST_PARTICIPANT,
         db=db_tests
     )
+
+
+@pytest.fixture
+def query_budget() -> Callable:
+    """
+    To fail a test if a block (e.g. an endpoint calling) runs more SQL queries than its budget :
+        with query_budget(3):
+            r = await async_client.get(...)
+    max_repeated is the budget of statements executed again with the same SQL (i.e N+1 queries).
+    """
+    @contextmanager
+    def check_budget(max_queries: int, max_repeated: int = None) -> Iterator[query_stats.QueryStats]:
+        with query_stats.track() as stats:
+            yield stats
+        assert stats.count <= max_queries, \
+            f"{stats.count} SQL queries, the budget is {max_queries} :\n{stats.report()}"
+        if max_repeated is not None:
+            assert stats.repeated <= max_repeated, \
+                f"{stats.repeated} repeated SQL queries, the budget is {max_repeated} :\n{stats.report()}"
+    return check_budget
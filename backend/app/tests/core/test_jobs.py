@@ -0,0 +1,189 @@
+""" Tests of app.core.jobs"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core import jobs, metrics
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+class Calls:
+    """Registers some test jobs on runner and records their calls."""
+    def __init__(self, runner: jobs.JobRunner) -> None:
+        self.calls = []
+        self.failures = 0  # next calls of failing_job to fail
+        runner.register(self.async_job)
+        runner.register(self.sync_job)
+        runner.register(self.failing_job)
+
+    async def async_job(self, value: int) -> None:
+        await asyncio.sleep(0)
+        self.calls.append(("async_job", value))
+
+    def sync_job(self, value: int) -> None:
+        self.calls.append(("sync_job", value))
+
+    def failing_job(self, value: int) -> None:
+        self.calls.append(("failing_job", value))
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("SMTP server unavailable")
+
+
+def count(job: str, status: str) -> float:
+    return metrics.JOBS_TOTAL.values.get((job, status), 0)
+
+
+async def test_run_async_and_sync_jobs() -> None:
+    runner = jobs.JobRunner(concurrency=2)
+    calls = Calls(runner)
+    ok_count = count("sync_job", "ok")
+    await runner.start()
+    runner.enqueue("async_job", {"value": 1})
+    runner.enqueue("sync_job", {"value": 2})
+    await runner.stop()
+    assert sorted(calls.calls) == [("async_job", 1), ("sync_job", 2)]
+    assert count("sync_job", "ok") == ok_count + 1
+    assert runner.workers == [] and runner.dedup_keys == set()
+
+
+async def test_enqueue_unknown_job() -> None:
+    with pytest.raises(KeyError):
+        jobs.JobRunner().enqueue("unknown_job")
+
+
+async def test_dedup_key() -> None:
+    runner = jobs.JobRunner()
+    calls = Calls(runner)
+    deduplicated_count = count("sync_job", "deduplicated")
+    assert runner.enqueue("sync_job", {"value": 1}, dedup_key="key")
+    assert runner.enqueue("sync_job", {"value": 2}, dedup_key="key") is None
+    assert count("sync_job", "deduplicated") == deduplicated_count + 1
+    await runner.start()
+    await runner.stop()
+    assert calls.calls == [("sync_job", 1)]
+    assert runner.enqueue("sync_job", {"value": 3}, dedup_key="key")  # the first one is done
+
+
+async def test_retry_then_ok() -> None:
+    runner = jobs.JobRunner(max_attempts=3, retry_delay=0.01)
+    calls = Calls(runner)
+    calls.failures = 2
+    await runner.start()
+    job = runner.enqueue("failing_job", {"value": 1}, dedup_key="key")
+    while len(calls.calls) < 3:
+        await asyncio.sleep(0.01)
+    await runner.stop()
+    assert job.attempts == 3
+    assert "key" not in runner.dedup_keys
+
+
+async def test_failed_after_max_attempts() -> None:
+    runner = jobs.JobRunner(max_attempts=2, retry_delay=0.01)
+    calls = Calls(runner)
+    calls.failures = 5
+    failed_count = count("failing_job", "failed")
+    await runner.start()
+    runner.enqueue("failing_job", {"value": 1})
+    while count("failing_job", "failed") == failed_count:
+        await asyncio.sleep(0.01)
+    await runner.stop()
+    assert calls.calls == [("failing_job", 1)] * 2
+
+
+async def test_stop_cancels_delayed_retries() -> None:
+    runner = jobs.JobRunner(max_attempts=2, retry_delay=0.05)
+    calls = Calls(runner)
+    calls.failures = 1
+    await runner.start()
+    runner.enqueue("failing_job", {"value": 1})
+    while not runner.retries:
+        await asyncio.sleep(0.01)
+    await runner.stop()
+    assert runner.retries == {}
+    await asyncio.sleep(0.1)
+    assert runner.queue.empty() and calls.calls == [("failing_job", 1)]
+
+
+async def test_unregistered_stored_job_is_dropped(tmp_path: Path) -> None:
+    path = str(tmp_path / "jobs.sqlite")
+    store = jobs.SQLiteJobStore(path)
+    store.add(jobs.Job("removed_job", {}, "key"))
+    runner = jobs.JobRunner(concurrency=1, store=store)
+    calls = Calls(runner)
+    failed_count = count("removed_job", "failed")
+    await runner.start()
+    runner.enqueue("sync_job", {"value": 1})
+    await runner.stop()
+    assert calls.calls == [("sync_job", 1)]  # the worker is still alive
+    assert count("removed_job", "failed") == failed_count + 1
+    assert store.pending() == [] and runner.dedup_keys == set()
+    store.close()
+
+
+async def test_sqlite_store_keeps_jobs_until_done(tmp_path: Path) -> None:
+    path = str(tmp_path / "jobs.sqlite")
+    runner = jobs.JobRunner(store=jobs.SQLiteJobStore(path))
+    Calls(runner)
+    job = runner.enqueue("sync_job", {"value": 1}, dedup_key="key")
+    runner.store.close()  # e.g. the app stopped before running it
+
+    restarted_runner = jobs.JobRunner(store=jobs.SQLiteJobStore(path))
+    calls = Calls(restarted_runner)
+    assert [(stored.id, stored.payload, stored.dedup_key) for stored in restarted_runner.store.pending()] \
+        == [(job.id, {"value": 1}, "key")]
+    await restarted_runner.start()
+    await restarted_runner.stop()
+    assert calls.calls == [("sync_job", 1)]
+    assert restarted_runner.store.pending() == []
+    restarted_runner.store.close()
+
+
+async def test_store_path_opened_at_start(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.sqlite"
+    runner = jobs.JobRunner(store_path=str(path))
+    assert runner.store is None and not path.exists()  # e.g. only imported
+    Calls(runner)
+    await runner.start()
+    assert runner.store is not None and path.exists()
+    await runner.stop()
+    runner.store.close()
+
+
+def test_enqueue_after_commit_unknown_job(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(jobs, "runner", jobs.JobRunner())
+    with Session(create_engine("sqlite://", future=True), future=True) as db:
+        with pytest.raises(KeyError):
+            jobs.enqueue_after_commit(db, "unknown_job")
+
+
+def test_enqueue_after_commit(monkeypatch: pytest.MonkeyPatch) -> None:
+    runner = jobs.JobRunner()
+    Calls(runner)
+    monkeypatch.setattr(jobs, "runner", runner)
+    with Session(create_engine("sqlite://", future=True), future=True) as db:
+        db.execute(text("SELECT 1"))
+        jobs.enqueue_after_commit(db, "sync_job", {"value": 1})
+        assert runner.queue.empty()
+        db.commit()
+        assert runner.queue.get_nowait().payload == {"value": 1}
+
+        db.execute(text("SELECT 1"))
+        jobs.enqueue_after_commit(db, "sync_job", {"value": 2})
+        db.rollback()
+        db.commit()
+        assert runner.queue.empty()
@@ -0,0 +1,58 @@
+""" Tests of app.core.metrics"""
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import metrics
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+def test_counter_render() -> None:
+    counter = metrics.Counter("test_counter_total", "A counter.", ("route",))
+    counter.inc(route="/a")
+    counter.inc(2, route="/a")
+    counter.inc(0.5, route='/b"')
+    assert counter.render() == ('# HELP test_counter_total A counter.\n'
+                                '# TYPE test_counter_total counter\n'
+                                'test_counter_total{route="/a"} 3\n'
+                                'test_counter_total{route="/b\\""} 0.5\n')
+    metrics.registry.remove(counter)
+
+
+def test_gauge_callback() -> None:
+    gauge = metrics.Gauge("test_gauge", "A gauge.", ("state",), callback=lambda: {("size",): 5})
+    assert 'test_gauge{state="size"} 5\n' in gauge.render()
+    metrics.registry.remove(gauge)
+
+
+def test_histogram_render() -> None:
+    histogram = metrics.Histogram("test_seconds", "A histogram.", buckets=(0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3)
+    lines = histogram.render().splitlines()
+    assert lines[2:] == ['test_seconds_bucket{le="0.1"} 1',
+                         'test_seconds_bucket{le="1"} 2',
+                         'test_seconds_bucket{le="+Inf"} 3',
+                         'test_seconds_count 3',
+                         'test_seconds_sum 3.55']
+    metrics.registry.remove(histogram)
+
+
+async def test_read_metrics(async_client: AsyncClient) -> None:
+    await async_client.get("/metrics")
+    r = await async_client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/metrics",status="200"}' in r.text
+    assert "# TYPE db_pool_connections gauge" in r.text
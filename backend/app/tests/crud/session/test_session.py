@@ -29,6 +29,37 @@ async def test_create_session(db_tests: AsyncSession) -> None:
     await crud.session.remove(db_tests, id=created_session.id)
 
 
+async def test_create_multi_session(db_tests: AsyncSession) -> None:
+    participant = await ut.create_random_participant(db_tests)
+    sessions_in = [SessionCreate(date=dt.date(2022, 3, day), time=dt.time(10), participant_id=participant.id,
+                                 type_name=settings.SESSION_TYPES[0], status_name=settings.SESSION_STATUS[0])
+                   for day in (7, 14, 21)]
+    created_sessions = await crud.session.create_multi(db_tests, objs_in=sessions_in)
+    assert len(created_sessions) == 3
+    for created_session in created_sessions:
+        db_created_session = await crud.session.get(db_tests, id=created_session.id)
+        assert db_created_session.participant_id == participant.id
+        assert db_created_session.time == dt.time(10)
+        await crud.session.remove(db_tests, id=created_session.id)
+
+
+async def test_create_multi_session_with_checked_types_and_status(db_tests: AsyncSession, mocker) -> None:
+    participant = await ut.create_random_participant(db_tests)
+    sessions_in = [SessionCreate(date=dt.date(2022, 3, day), time=dt.time(10), participant_id=participant.id,
+                                 type_name=settings.SESSION_TYPES[0], status_name=settings.SESSION_STATUS[0])
+                   for day in (7, 14)]
+    get_types_and_status_ids = mocker.spy(crud.session, "get_types_and_status_ids")
+    types_and_status_ids = await crud.session.types_and_status_names_checks(db_tests, sessions_in)
+    created_sessions = await crud.session.create_multi(db_tests, objs_in=sessions_in,
+                                                       types_and_status_ids=types_and_status_ids)
+    # the types and status are read once, by the checks
+    assert get_types_and_status_ids.call_count == 1
+    assert {created_session.type_id for created_session in created_sessions} == \
+        {types_and_status_ids[0][settings.SESSION_TYPES[0]]}
+    for created_session in created_sessions:
+        await crud.session.remove(db_tests, id=created_session.id)
+
+
 async def test_get_session(db_tests: AsyncSession) -> None:
     created_session = await ut.create_random_session(db_tests)
     got_session = await crud.session.get(db_tests, id=created_session.id)
@@ -226,6 +257,9 @@ async def test_get_by_participant_email(db_tests: AsyncSession) -> None:
     p1_sessions_id = [session.id for session in p1_sessions]
     assert (s1_p1.id and s2_p1.id) in p1_sessions_id
     assert s_p2.id not in p1_sessions_id
+    p1_rows = await crud.session.get_by_participant_email(db_tests, p1.email, rows=True)
+    assert sorted(row.id for row in p1_rows) == sorted(p1_sessions_id)
+    assert tuple(p1_rows[0]._fields) == crud.session.row_fields
     await crud.session.remove(db_tests, id=s1_p1.id)
     await crud.session.remove(db_tests, id=s2_p1.id)
     await crud.session.remove(db_tests, id=s_p2.id)
@@ -255,6 +289,34 @@ async def test_get_by_speaker_email(db_tests: AsyncSession) -> None:
     await crud.session.remove(db_tests, id=s_p4.id)
 
 
+async def test_get_by_speaker_date_range(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    p1_id = (await ut.create_random_participant(db_tests, speaker_id=speaker.id)).id
+    p2_id = (await ut.create_random_participant(db_tests, speaker_id=speaker.id)).id
+    s1 = await ut.create_random_session(db_tests, participant_id=p1_id, date_=dt.date(2022, 3, 8), time_=dt.time(10))
+    s2 = await ut.create_random_session(db_tests, participant_id=p2_id, date_=dt.date(2022, 3, 8), time_=dt.time(9))
+    s3 = await ut.create_random_session(db_tests, participant_id=p1_id, date_=dt.date(2022, 3, 15), time_=dt.time(9))
+    s4 = await ut.create_random_session(db_tests, participant_id=p1_id, date_=dt.date(2022, 4, 1), time_=dt.time(9))
+    other_speaker_p_id = (await ut.create_random_participant(db_tests)).id
+    s5 = await ut.create_random_session(db_tests, participant_id=other_speaker_p_id, date_=dt.date(2022, 3, 8),
+                                        time_=dt.time(9))
+
+    week_sessions = await crud.session.get_by_speaker_date_range(db_tests, speaker.id, dt.date(2022, 3, 7),
+                                                                 dt.date(2022, 3, 13))
+    assert [s.id for s in week_sessions] == [s2.id, s1.id]
+    month_sessions = await crud.session.get_by_speaker_date_range(db_tests, speaker.id, dt.date(2022, 3, 1),
+                                                                  dt.date(2022, 3, 31))
+    assert [s.id for s in month_sessions] == [s2.id, s1.id, s3.id]
+    from_sessions = await crud.session.get_by_speaker_date_range(db_tests, speaker.id, start_date=dt.date(2022, 3, 9))
+    assert [s.id for s in from_sessions] == [s3.id, s4.id]
+    all_sessions = await crud.session.get_by_speaker_date_range(db_tests, speaker.id)
+    assert [s.id for s in all_sessions] == [s2.id, s1.id, s3.id, s4.id]
+    p1_sessions = await crud.session.get_by_participant_date_range(db_tests, p1_id, end_date=dt.date(2022, 3, 31))
+    assert [s.id for s in p1_sessions] == [s1.id, s3.id]
+    for session in (s1, s2, s3, s4, s5):
+        await crud.session.remove(db_tests, id=session.id)
+
+
 async def test_participant_checks_and_get_id_current_user_participant(db_tests: AsyncSession) -> None:
     session_in = SessionCreate(date=dt.date.today(), time=dt.datetime.now().time(),
                                participant_id=None, type_name="type name", status_name="status name")
@@ -343,3 +405,42 @@ async def test_type_and_status_names_checks_status_not_existing(db_tests: AsyncS
     with pytest.raises(HTTPException) as he:
         await crud.session.type_and_status_names_checks(db_tests, session_in)
     assert f"Status {session_in.status_name} does not exists..." in str(he)
+
+
+async def test_search_comments(db_tests: AsyncSession) -> None:
+    participant = await ut.create_random_participant(db_tests)
+    session = await ut.create_random_session(db_tests, participant_id=participant.id)
+    other_session = await ut.create_random_session(db_tests, participant_id=participant.id,
+                                                   date_=dt.date.today() + dt.timedelta(days=1))
+    word = ut.random_lower_string(12)
+    await crud.session.update(db_tests, db_obj=session, obj_in=SessionUpdate(comments=f"Worked on {word} today"))
+    await crud.session.update(db_tests, db_obj=other_session, obj_in=SessionUpdate(comments="Nothing to say"))
+    found_sessions = await crud.session.search_comments(db_tests, word)
+    assert [found_session.id for found_session in found_sessions] == [session.id]
+    assert await crud.session.search_comments(db_tests, f"{word} -today") == []
+    await crud.session.remove(db_tests, id=session.id)
+    await crud.session.remove(db_tests, id=other_session.id)
+    await crud.participant.remove(db_tests, id=participant.id)
+
+
+async def test_stream_reminders_rows(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id)
+    sessions = [await ut.create_random_session(db_tests, date_=date_, time_=time_, participant_id=participant.id)
+                for date_, time_ in [(dt.date(2099, 1, 7), dt.time(8)), (dt.date(2099, 1, 7), dt.time(10)),
+                                     (dt.date(2099, 1, 8), dt.time(9, 30)), (dt.date(2099, 1, 8), dt.time(10))]]
+    for session in sessions:
+        await crud.session.update(db_tests, db_obj=session,
+                                  obj_in=SessionUpdate(status_name=settings.SESSION_STATUS_SCHEDULED))
+    await crud.session.update(db_tests, db_obj=sessions[2],
+                              obj_in=SessionUpdate(status_name=settings.SESSION_STATUS_DONE))
+
+    # from 01/07/99 9:00 (included) to 01/08/99 10:00 (excluded)
+    rows = await (await crud.session.stream_reminders_rows(db_tests, dt.datetime(2099, 1, 7, 9),
+                                                           dt.datetime(2099, 1, 8, 10))).all()
+    assert [(row.date, row.time) for row in rows] == [(dt.date(2099, 1, 7), dt.time(10))]
+    assert rows[0].participant_id == participant.id and rows[0].email == participant.email
+    assert (rows[0].speaker_first_name, rows[0].speaker_last_name) == (speaker.first_name, speaker.last_name)
+    for session in sessions:
+        await crud.session.remove(db_tests, id=session.id)
+    await crud.participant.remove(db_tests, id=participant.id)
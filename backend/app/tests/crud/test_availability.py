@@ -131,6 +131,13 @@ class TestCrudAvailabilityOne:
                 and db_avails["avail3_spk1"].id) not in av_ids_spk2
         assert db_avails["avail1_spk2"].id in av_ids_spk2
 
+    async def test_get_by_speaker_rows(self, db_avails, db_tests: AsyncSession) -> None:
+        rows = await crud.availability.get_by_speaker(db_tests, db_avails["speaker2"].id, rows=True)
+        assert len(rows) == 1
+        assert rows[0]._asdict() == {field: getattr(db_avails["avail1_spk2"], field)
+                                     for field in crud.availability.row_fields}
+        assert crud.availability.to_json_list(rows) == crud.availability.to_json_list([db_avails["avail1_spk2"]])
+
     async def test_get_all_around_date_same_weekday_speaker(self, db_avails, db_tests: AsyncSession) -> None:
         spk1_id = db_avails["speaker1"].id
         # thursday
@@ -0,0 +1,48 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.crud.base import unit_of_work
+from app.schemas import AvailabilityCreate
+import app.tests.utils_for_testing as ut
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_without_refresh(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    assert speaker.id is not None and speaker.is_active
+    assert (await crud.speaker.get(db_tests, id=speaker.id)).slot_time == speaker.slot_time
+    await crud.speaker.remove(db_tests, id=speaker.id)
+
+
+async def test_unit_of_work_commits_all_writes(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    async with unit_of_work(db_tests):
+        avail1 = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(
+            start_date=dt.date(2022, 3, 1), end_date=dt.date(2022, 3, 31), week_day=0, time=dt.time(9)),
+            speaker_id=speaker.id)
+        avail2 = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(
+            start_date=dt.date(2022, 3, 1), end_date=dt.date(2022, 3, 31), week_day=1, time=dt.time(9)),
+            speaker_id=speaker.id)
+        assert avail1.id is not None and avail2.id is not None  # flushed
+        assert db_tests.in_transaction()
+    assert {av.id for av in await crud.availability.get_by_speaker(db_tests, speaker.id)} == {avail1.id, avail2.id}
+    await crud.availability.remove(db_tests, id=avail1.id)
+    await crud.availability.remove(db_tests, id=avail2.id)
+    await crud.speaker.remove(db_tests, id=speaker.id)
+
+
+async def test_unit_of_work_rolls_back_all_writes(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    with pytest.raises(ValueError):
+        async with unit_of_work(db_tests):
+            await crud.availability.create(db_tests, obj_in=AvailabilityCreate(
+                start_date=dt.date(2022, 3, 1), end_date=dt.date(2022, 3, 31), week_day=0, time=dt.time(9)),
+                speaker_id=speaker.id)
+            raise ValueError
+    assert await crud.availability.get_by_speaker(db_tests, speaker.id) == []
+    await crud.speaker.remove(db_tests, id=speaker.id)
@@ -0,0 +1,47 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.schemas import AvailabilityCreate, AvailabilityUpdate, SessionUpdate
+import app.tests.utils_for_testing as ut
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_versions_never_bumped(db_tests: AsyncSession) -> None:
+    assert await crud.change_counter.get_versions(db_tests, [ut.random_lower_string(10)]) == [0]
+
+
+async def test_bump(db_tests: AsyncSession) -> None:
+    scope1, scope2 = ut.random_lower_string(10), ut.random_lower_string(10)
+    await crud.change_counter.bump(db_tests, [scope1, scope2])
+    await crud.change_counter.bump(db_tests, [scope1])
+    await db_tests.commit()
+    assert await crud.change_counter.get_versions(db_tests, [scope2, scope1]) == [1, 2]
+
+
+async def test_speaker_scope_bumped_by_availability_and_session_writing(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id)
+    scopes = [crud.change_counter.speaker_scope(speaker.id)]
+    version = (await crud.change_counter.get_versions(db_tests, scopes))[0]
+
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 3, 5),
+                                                                               end_date=dt.date(2022, 3, 22),
+                                                                               week_day=0, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    assert await crud.change_counter.get_versions(db_tests, scopes) == [version + 1]
+    await crud.availability.update(db_tests, db_obj=avail, obj_in=AvailabilityUpdate(end_date=dt.date(2022, 3, 15)))
+    assert await crud.change_counter.get_versions(db_tests, scopes) == [version + 2]
+
+    session = await ut.create_random_session(db_tests, participant_id=participant.id)
+    assert await crud.change_counter.get_versions(db_tests, scopes) == [version + 3]
+    await crud.session.update(db_tests, db_obj=session, obj_in=SessionUpdate(comments="new comments"))
+    assert await crud.change_counter.get_versions(db_tests, scopes) == [version + 4]
+
+    await crud.session.remove(db_tests, id=session.id)
+    await crud.availability.remove(db_tests, id=avail.id)
+    assert await crud.change_counter.get_versions(db_tests, scopes) == [version + 6]
@@ -0,0 +1,97 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.schemas import AvailabilityCreate, ParticipantUpdate, SessionUpdate
+import app.tests.utils_for_testing as ut
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+async def get_stats_by_week(db: AsyncSession, speaker_id: int) -> dict:
+    stats = await crud.speaker_week_stats.get_multi_by_period_speaker(db, speaker_id=speaker_id, limit=None)
+    return {s.week_start: (s.available_slots, s.booked_slots, s.done, s.no_show) for s in stats}
+
+
+async def test_counters_updated_on_availability_and_session_writing(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id, p_type_name="continue")
+    # mondays 07/03/22, 14/03/22 and 21/03/22
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 3, 5),
+                                                                               end_date=dt.date(2022, 3, 22),
+                                                                               week_day=0, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    stats = await get_stats_by_week(db_tests, speaker.id)
+    assert stats == {dt.date(2022, 3, 7): (1, 0, 0, 0),
+                     dt.date(2022, 3, 14): (1, 0, 0, 0),
+                     dt.date(2022, 3, 21): (1, 0, 0, 0)}
+
+    # "continue" participant type => 2 slots by session
+    session = await ut.create_random_session(db_tests, participant_id=participant.id, date_=dt.date(2022, 3, 9))
+    await crud.session.update(db_tests, db_obj=session,
+                              obj_in=SessionUpdate(status_name=settings.SESSION_STATUS_SCHEDULED))
+    assert (await get_stats_by_week(db_tests, speaker.id))[dt.date(2022, 3, 7)] == (1, 2, 0, 0)
+
+    await crud.session.update(db_tests, db_obj=session, obj_in=SessionUpdate(status_name=settings.SESSION_STATUS_DONE))
+    assert (await get_stats_by_week(db_tests, speaker.id))[dt.date(2022, 3, 7)] == (1, 2, 1, 0)
+
+    await crud.session.update(db_tests, db_obj=session, obj_in=SessionUpdate(date=dt.date(2022, 3, 14)))
+    stats = await get_stats_by_week(db_tests, speaker.id)
+    assert stats[dt.date(2022, 3, 7)] == (1, 0, 0, 0)
+    assert stats[dt.date(2022, 3, 14)] == (1, 2, 1, 0)
+
+    await crud.session.update(db_tests, db_obj=session,
+                              obj_in=SessionUpdate(status_name=settings.SESSION_STATUS_UNSCHEDULED[0]))
+    assert (await get_stats_by_week(db_tests, speaker.id))[dt.date(2022, 3, 14)] == (1, 0, 0, 0)
+
+    await crud.session.remove(db_tests, id=session.id)
+    await crud.availability.remove(db_tests, id=avail.id)
+    assert not any(any(counters) for counters in (await get_stats_by_week(db_tests, speaker.id)).values())
+
+
+async def test_rebuild(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id)
+    avail = await crud.availability.create(db_tests, obj_in=AvailabilityCreate(start_date=dt.date(2022, 3, 1),
+                                                                               end_date=dt.date(2022, 3, 31),
+                                                                               week_day=2, time=dt.time(9)),
+                                           speaker_id=speaker.id)
+    s1 = await ut.create_random_session(db_tests, participant_id=participant.id, date_=dt.date(2022, 3, 2))
+    s2 = await ut.create_random_session(db_tests, participant_id=participant.id, date_=dt.date(2022, 3, 16))
+    incremental_stats = await get_stats_by_week(db_tests, speaker.id)
+
+    await crud.speaker_week_stats.rebuild(db_tests)
+    rebuilt_stats = await get_stats_by_week(db_tests, speaker.id)
+    # rebuild does not keep weeks with all counters to 0
+    assert rebuilt_stats == {week: counters for week, counters in incremental_stats.items() if any(counters)}
+    assert sum(counters[0] for counters in rebuilt_stats.values()) == 5  # wednesdays of march 2022
+
+    await crud.session.remove(db_tests, id=s1.id)
+    await crud.session.remove(db_tests, id=s2.id)
+    await crud.availability.remove(db_tests, id=avail.id)
+
+
+async def test_counters_moved_on_participant_speaker_and_type_change(db_tests: AsyncSession) -> None:
+    speaker = await ut.create_random_speaker(db_tests)
+    new_speaker = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker.id, p_type_name="initial")
+    session = await ut.create_random_session(db_tests, participant_id=participant.id, date_=dt.date(2022, 3, 9))
+    await crud.session.update(db_tests, db_obj=session, obj_in=SessionUpdate(status_name=settings.SESSION_STATUS_DONE))
+    assert await get_stats_by_week(db_tests, speaker.id) == {dt.date(2022, 3, 7): (0, 1, 1, 0)}
+
+    # "continue" participant type => 2 slots by session
+    await crud.participant.update(db_tests, db_obj=participant, obj_in=ParticipantUpdate(type_name="continue"))
+    assert await get_stats_by_week(db_tests, speaker.id) == {dt.date(2022, 3, 7): (0, 2, 1, 0)}
+
+    await crud.participant.update(db_tests, db_obj=participant, obj_in=ParticipantUpdate(speaker_id=new_speaker.id))
+    assert await get_stats_by_week(db_tests, speaker.id) == {dt.date(2022, 3, 7): (0, 0, 0, 0)}
+    assert await get_stats_by_week(db_tests, new_speaker.id) == {dt.date(2022, 3, 7): (0, 2, 1, 0)}
+
+    await crud.speaker_week_stats.rebuild(db_tests)
+    assert await get_stats_by_week(db_tests, new_speaker.id) == {dt.date(2022, 3, 7): (0, 2, 1, 0)}
+
+    await crud.session.remove(db_tests, id=session.id)
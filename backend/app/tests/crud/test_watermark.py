@@ -0,0 +1,22 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+import app.tests.utils_for_testing as ut
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_never_set(db_tests: AsyncSession) -> None:
+    assert await crud.watermark.get(db_tests, ut.random_lower_string(10)) is None
+
+
+async def test_set(db_tests: AsyncSession) -> None:
+    name = ut.random_lower_string(10)
+    await crud.watermark.set(db_tests, name, dt.datetime(2030, 1, 7, 9, 30))
+    await crud.watermark.set(db_tests, name, dt.datetime(2030, 1, 8, 9, 30))
+    await db_tests.commit()
+    assert await crud.watermark.get(db_tests, name) == dt.datetime(2030, 1, 8, 9, 30)
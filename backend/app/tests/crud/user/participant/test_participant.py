@@ -52,6 +52,20 @@ async def test_update_participant(db_tests: AsyncSession) -> None:
     assert verify_password(new_api_key, updated_participant.hashed_api_key)
 
 
+async def test_update_participant_speaker_updates_sessions_speaker(db_tests: AsyncSession) -> None:
+    speaker1 = await ut.create_random_speaker(db_tests)
+    speaker2 = await ut.create_random_speaker(db_tests)
+    participant = await ut.create_random_participant(db_tests, speaker_id=speaker1.id)
+    session = await ut.create_random_session(db_tests, participant_id=participant.id)
+    assert session.speaker_id == speaker1.id
+    await crud.participant.update(db_tests, db_obj=participant, obj_in=ParticipantUpdate(speaker_id=speaker2.id))
+    await db_tests.refresh(session)
+    assert session.speaker_id == speaker2.id
+    assert [s.id for s in await crud.session.get_by_speaker_date_range(db_tests, speaker2.id)] == [session.id]
+    assert not await crud.session.get_by_speaker_date_range(db_tests, speaker1.id)
+    await crud.session.remove(db_tests, id=session.id)
+
+
 async def test_remove_participant(db_tests: AsyncSession) -> None:
     created_participant = await ut.create_random_participant(db_tests)
     await crud.participant.remove(db_tests, id=created_participant.id)
@@ -267,3 +267,41 @@ async def test_is_free_for_session(db_tests: AsyncSession, db_data, db_data2) ->
     await crud.session.remove(db_tests, id=s3.id)
     await crud.session.remove(db_tests, id=s4.id)
     await crud.session.remove(db_tests, id=s5.id)
+
+
+async def test_get_not_free_sessions_in(db_tests: AsyncSession, db_data, db_data2) -> None:
+    """
+    Same data as test_is_free_for_session() but all sessions are checked at once,
+    including conflicts between the sessions to create.
+    """
+    speaker = db_data["speaker"]
+    p_1sw_id = db_data["p_1sw"].id
+    p_2sw_id = db_data["p_2sw"].id
+    participants = await crud.participant.get_speaker_id_and_nb_session_week_by_ids(db_tests, [p_1sw_id, p_2sw_id])
+
+    # tuesday 24/03/22 9:00 - 1 session week participant
+    s1 = await ut.create_random_session(db_tests, participant_id=p_1sw_id,
+                                        date_=dt.date(2022, 3, 24), time_=dt.time(9))
+
+    # availability + no session
+    s_in_ok = SessionCreate(date=dt.date(2022, 2, 10), time=dt.time(9), participant_id=p_1sw_id,
+                            type_name="s_type_name", status_name="s_status_name")
+    # none availability
+    s_in_no_avail = SessionCreate(date=dt.date(2021, 11, 18), time=dt.time(9), participant_id=p_1sw_id,
+                                  type_name="s_type_name", status_name="s_status_name")
+    # availability but existing session
+    s_in_existing = SessionCreate(date=dt.date(2022, 3, 24), time=dt.time(9), participant_id=p_1sw_id,
+                                  type_name="s_type_name", status_name="s_status_name")
+    # 2 sessions week participant : availability at 10:00 and 10:30 + no session
+    s_in_2sw_ok = SessionCreate(date=dt.date(2022, 5, 26), time=dt.time(10), participant_id=p_2sw_id,
+                                type_name="s_type_name", status_name="s_status_name")
+    # overlapped by s_in_2sw_ok (10:00 + 10:30) which is checked before
+    s_in_conflict = SessionCreate(date=dt.date(2022, 5, 26), time=dt.time(10, 30), participant_id=p_1sw_id,
+                                  type_name="s_type_name", status_name="s_status_name")
+
+    assert not await crud.speaker.get_not_free_sessions_in(db_tests, speaker, [s_in_ok, s_in_2sw_ok], participants)
+    not_free_sessions_in = await crud.speaker.get_not_free_sessions_in(
+        db_tests, speaker, [s_in_ok, s_in_no_avail, s_in_existing, s_in_2sw_ok, s_in_conflict], participants)
+    assert not_free_sessions_in == [s_in_no_avail, s_in_existing, s_in_conflict]
+
+    await crud.session.remove(db_tests, id=s1.id)
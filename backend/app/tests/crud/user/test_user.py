@@ -135,3 +135,33 @@ async def test_remove_user(db_tests: AsyncSession) -> None:
     removed_speaker = await crud.speaker.get(db_tests, id=user.id)
     assert removed_user is None
     assert removed_speaker is None
+
+
+async def test_search_user(db_tests: AsyncSession) -> None:
+    email = ut.random_email()
+    user = await ut.create_random_speaker(db_tests, email=email)
+    other_user = await ut.create_random_speaker(db_tests)
+    found_users = await crud.user.search(db_tests, email[2:12].upper())
+    assert [found_user.id for found_user in found_users] == [user.id]
+    assert await crud.user.search(db_tests, "100%_") == []
+    await crud.user.remove(db_tests, id=user.id)
+    await crud.user.remove(db_tests, id=other_user.id)
+
+
+async def test_email_exists(db_tests: AsyncSession) -> None:
+    user = await ut.create_random_participant(db_tests)
+    assert await crud.user.email_exists(db_tests, user.email)
+    assert await crud.speaker.email_exists(db_tests, user.email)  # whatever the profile
+    assert not await crud.user.email_exists(db_tests, ut.random_email())
+    await crud.user.remove(db_tests, id=user.id)
+
+
+async def test_get_existing_emails(db_tests: AsyncSession) -> None:
+    user = await ut.create_random_speaker(db_tests)
+    other_user = await ut.create_random_admin(db_tests)
+    new_email = ut.random_email()
+    assert await crud.user.get_existing_emails(db_tests, [user.email, new_email, other_user.email, user.email]) \
+        == {user.email, other_user.email}
+    assert await crud.user.get_existing_emails(db_tests, []) == set()
+    await crud.user.remove(db_tests, id=user.id)
+    await crud.user.remove(db_tests, id=other_user.id)
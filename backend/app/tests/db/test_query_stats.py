@@ -0,0 +1,39 @@
+""" Tests of app.db.query_stats"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import query_stats
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+def test_track_counts_statements_and_repeated() -> None:
+    engine = create_engine("sqlite://", future=True)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))  # not tracked
+        with query_stats.track() as stats:
+            conn.execute(text("SELECT 2"))
+            for i in range(3):
+                conn.execute(text("SELECT :i"), {"i": i})
+    assert stats.count == 4
+    assert stats.repeated == 2
+    assert stats.duration > 0
+    assert stats.n_plus_one_statements(threshold=3) == [("SELECT ?", 3)]
+    assert stats.report().startswith("3 x SELECT ?")
+
+
+def test_nested_tracks() -> None:
+    engine = create_engine("sqlite://", future=True)
+    with engine.connect() as conn:
+        with query_stats.track() as outer_stats:
+            conn.execute(text("SELECT 1"))
+            with query_stats.track() as inner_stats:
+                conn.execute(text("SELECT 2"))
+    assert (outer_stats.count, inner_stats.count) == (2, 1)
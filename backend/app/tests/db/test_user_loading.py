@@ -0,0 +1,87 @@
+""" Tests of the User polymorphic loading (see models/user/user.py __mapper_args__)"""
+
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.api import deps
+from app.db import query_stats
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+@pytest.fixture
+def db_sqlite() -> Session:
+    engine = create_engine("sqlite://", future=True)
+    models.Base.metadata.create_all(engine, tables=[models.User.__table__, models.Admin.__table__,
+                                                    models.Speaker.__table__])
+    with Session(engine, future=True) as db:
+        db.add_all([models.Speaker(id=1, first_name="Ada", last_name="L", email="ada@x.com", hashed_api_key="h",
+                                   slot_time=30),
+                    models.Admin(id=2, first_name="Bob", last_name="B", email="bob@x.com", hashed_api_key="h")])
+        db.commit()
+        db.expunge_all()
+        yield db
+
+
+def test_get_user_selects_user_table_only(db_sqlite: Session) -> None:
+    with query_stats.track() as stats:
+        user = db_sqlite.get(models.User, 1)
+    assert stats.count == 1
+    statement = next(iter(stats.statements))
+    assert "JOIN" not in statement and "speaker" not in statement and "admin" not in statement
+    assert isinstance(user, models.Speaker)
+    assert "slot_time" in inspect(user).unloaded
+
+
+class SyncRefreshDb:
+    """The AsyncSession.refresh() used by CRUDUser.load_profile(), on the sync sqlite session."""
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    async def refresh(self, instance: Any, attribute_names: list[str]) -> None:
+        self.db.refresh(instance, attribute_names=attribute_names)
+
+
+async def test_load_profile_selects_profile_columns_once(db_sqlite: Session) -> None:
+    user = db_sqlite.get(models.User, 1)
+    with query_stats.track() as stats:
+        assert await crud.user.load_profile(SyncRefreshDb(db_sqlite), user) is user
+        assert user.slot_time == 30
+        await crud.user.load_profile(SyncRefreshDb(db_sqlite), user)  # already loaded
+    assert stats.count == 1
+    assert next(iter(stats.statements)).startswith("SELECT speaker.slot_time")
+
+
+async def test_load_profile_without_profile_columns(db_sqlite: Session) -> None:
+    admin = db_sqlite.get(models.User, 2)
+    with query_stats.track() as stats:
+        await crud.user.load_profile(SyncRefreshDb(db_sqlite), admin)
+    assert stats.count == 0
+
+
+async def test_speaker_dependency_returns_user_with_profile_loaded(db_sqlite: Session) -> None:
+    user = db_sqlite.get(models.User, 1)  # as check_jwt_and_get_current_user()
+    current_user = await deps.get_current_active_speaker_user(db=SyncRefreshDb(db_sqlite), current_user=user)
+    assert current_user is user
+    assert "slot_time" not in inspect(current_user).unloaded and current_user.slot_time == 30
+
+
+def test_select_users_selects_user_table_only(db_sqlite: Session) -> None:
+    with query_stats.track() as stats:
+        users = db_sqlite.execute(select(models.User).order_by(models.User.id)).scalars().all()
+    assert [type(user) for user in users] == [models.Speaker, models.Admin]
+    assert stats.count == 1
+    assert "speaker" not in stats.report() and "admin" not in stats.report()
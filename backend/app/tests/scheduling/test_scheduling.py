@@ -0,0 +1,96 @@
+""" Tests of app.scheduling (pure python, no db)"""
+
+import datetime as dt
+
+import pytest
+
+from app import scheduling
+from app.scheduling import AvailabilityRule, Occupancy, Slot, SpeakerSnapshot, bitmap
+
+MONDAY = dt.date(2030, 1, 7)
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+@pytest.fixture
+def snapshot() -> SpeakerSnapshot:
+    """Mondays of january 2030 at 9h and 9h30 (slot_time 30), with a session on the first one at 9h."""
+    avails = [AvailabilityRule(1, MONDAY, dt.date(2030, 1, 28), 0, dt.time(9)),
+              AvailabilityRule(2, MONDAY, dt.date(2030, 1, 28), 0, dt.time(9, 30))]
+    return SpeakerSnapshot(1, 30, avails, [Slot(MONDAY, dt.time(9))])
+
+
+def test_has_weekday_in_period() -> None:
+    assert scheduling.has_weekday_in_period(MONDAY, MONDAY + dt.timedelta(days=6), 6)
+    assert scheduling.has_weekday_in_period(MONDAY, MONDAY + dt.timedelta(days=2), 2)
+    assert not scheduling.has_weekday_in_period(MONDAY, MONDAY + dt.timedelta(days=2), 3)
+    assert not scheduling.has_weekday_in_period(MONDAY + dt.timedelta(days=1), MONDAY + dt.timedelta(days=5), 0)
+
+
+def test_is_same_weekday_time_period(snapshot: SpeakerSnapshot) -> None:
+    assert scheduling.is_same_weekday_time_period(
+        snapshot, AvailabilityRule(None, dt.date(2030, 1, 20), dt.date(2030, 2, 20), 0, dt.time(9)))
+    assert not scheduling.is_same_weekday_time_period(
+        snapshot, AvailabilityRule(None, dt.date(2030, 1, 29), dt.date(2030, 2, 20), 0, dt.time(9)))
+    assert not scheduling.is_same_weekday_time_period(
+        snapshot, AvailabilityRule(None, MONDAY, dt.date(2030, 1, 28), 0, dt.time(10)))
+    assert scheduling.is_same_weekday_period(
+        snapshot, AvailabilityRule(None, MONDAY, dt.date(2030, 1, 28), 0, dt.time(10)))
+
+
+def test_has_too_close_previous_and_next(snapshot: SpeakerSnapshot) -> None:
+    assert scheduling.has_too_close_previous(snapshot, AvailabilityRule(None, MONDAY, MONDAY, 0, dt.time(9, 45)))
+    assert not scheduling.has_too_close_previous(snapshot, AvailabilityRule(None, MONDAY, MONDAY, 0, dt.time(10)))
+    assert scheduling.has_too_close_next(snapshot, AvailabilityRule(None, MONDAY, MONDAY, 0, dt.time(8, 45)))
+    assert not scheduling.has_too_close_next(snapshot, AvailabilityRule(None, MONDAY, MONDAY, 0, dt.time(8, 30)))
+    # no availability overlapping the period
+    assert not scheduling.has_too_close_next(snapshot, AvailabilityRule(None, dt.date(2030, 2, 4),
+                                                                        dt.date(2030, 2, 4), 0, dt.time(8, 45)))
+
+
+def test_free_times_and_is_free(snapshot: SpeakerSnapshot) -> None:
+    assert scheduling.free_times(snapshot, MONDAY) == {dt.time(9, 30)}
+    assert scheduling.free_times(snapshot, MONDAY + dt.timedelta(days=1)) == set()
+    assert scheduling.is_free(snapshot, Slot(MONDAY, dt.time(9, 30)))
+    assert not scheduling.is_free(snapshot, Slot(MONDAY, dt.time(9)))
+    # 2 consecutive slots needed but 10h is not an availability
+    assert not scheduling.is_free(snapshot, Slot(MONDAY, dt.time(9, 30), nb_slots=2))
+    assert scheduling.is_free(snapshot, Slot(dt.date(2030, 1, 14), dt.time(9), nb_slots=2))
+
+
+def test_not_free_slots_checks_slots_between_them(snapshot: SpeakerSnapshot) -> None:
+    slots = [Slot(dt.date(2030, 1, 14), dt.time(9), nb_slots=2), Slot(dt.date(2030, 1, 14), dt.time(9, 30)),
+             Slot(MONDAY, dt.time(9)), Slot(MONDAY, dt.time(9, 30))]
+    assert scheduling.not_free_slots(snapshot, slots) == slots[1:3]
+    # the snapshot itself is not modified
+    assert scheduling.free_times(snapshot, dt.date(2030, 1, 14)) == {dt.time(9), dt.time(9, 30)}
+
+
+def test_bitmap_slot_mask_and_consecutive_starts() -> None:
+    free = bitmap.from_times([dt.time(9), dt.time(9, 30), dt.time(10), dt.time(11)])
+    assert list(bitmap.iter_times(free)) == [dt.time(9), dt.time(9, 30), dt.time(10), dt.time(11)]
+    assert bitmap.slot_mask(dt.time(9), 2, 30) == bitmap.from_times([dt.time(9), dt.time(9, 30)])
+    # wraps around midnight as add_time()
+    assert bitmap.slot_mask(dt.time(23, 30), 2, 30) == bitmap.from_times([dt.time(23, 30), dt.time(0)])
+    assert list(bitmap.iter_times(bitmap.consecutive_starts(free, 2, 30))) == [dt.time(9), dt.time(9, 30)]
+    assert list(bitmap.iter_times(bitmap.consecutive_starts(free, 3, 30))) == [dt.time(9)]
+    assert bitmap.from_bytes(bitmap.to_bytes(free)) == free
+    assert len(bitmap.to_bytes(free)) == bitmap.DAY_BYTES
+
+
+def test_free_start_times(snapshot: SpeakerSnapshot) -> None:
+    assert scheduling.free_start_times(snapshot, dt.date(2030, 1, 14), nb_slots=2) == [dt.time(9)]
+    assert scheduling.free_start_times(snapshot, MONDAY, nb_slots=2) == []
+
+
+def test_occupancy_to_bytes_round_trip(snapshot: SpeakerSnapshot) -> None:
+    snapshot.occupancy.add(Slot(dt.date(2030, 3, 4), dt.time(14), nb_slots=2))
+    occupancy = Occupancy.from_bytes(30, snapshot.occupancy.to_bytes())
+    assert occupancy.bitmaps == snapshot.occupancy.bitmaps
+    assert occupancy.times(dt.date(2030, 3, 4)) == {dt.time(14), dt.time(14, 30)}
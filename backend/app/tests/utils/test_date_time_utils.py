@@ -29,6 +29,39 @@ def test_subtract_time() -> None:
     assert ut.subtract_time(date, time, minutes_to_subtract=300) == dt.time(7, 30)
 
 
+def test_shift_time() -> None:
+    assert ut.shift_time(dt.time(12, 30, 15), 45) == dt.time(13, 15, 15)
+    assert ut.shift_time(dt.time(0, 15), -30) == dt.time(23, 45)
+    assert ut.shift_time(dt.time(23, 45), 30) == dt.time(0, 15)
+
+
+def test_slot_times() -> None:
+    assert ut.slot_times(dt.time(9), 3, 30) == [dt.time(9), dt.time(9, 30), dt.time(10)]
+    assert ut.slot_times(dt.time(9), 0, 30) == []
+
+
+def test_weekday_dates() -> None:
+    # 02/02/22 is a wednesday
+    assert ut.weekday_dates(dt.date(2022, 2, 2), dt.date(2022, 2, 23), 2) == [
+        dt.date(2022, 2, 2), dt.date(2022, 2, 9), dt.date(2022, 2, 16), dt.date(2022, 2, 23)]
+    assert ut.weekday_dates(dt.date(2022, 2, 2), dt.date(2022, 2, 6), 0) == []
+    assert len(ut.weekday_ordinals(dt.date(2022, 1, 1), dt.date(2022, 12, 31), 5)) == 53
+    assert dt.date(2022, 2, 16).toordinal() in ut.weekday_ordinals(dt.date(2022, 2, 2), dt.date(2022, 2, 23), 2)
+
+
+def test_first_weekday_date() -> None:
+    # 02/02/22 is a wednesday
+    assert ut.first_weekday_date(dt.date(2022, 2, 2), 2) == dt.date(2022, 2, 2)
+    assert ut.first_weekday_date(dt.date(2022, 2, 2), 4) == dt.date(2022, 2, 4)
+    assert ut.first_weekday_date(dt.date(2022, 2, 2), 0) == dt.date(2022, 2, 7)
+
+
+def test_get_week_start() -> None:
+    assert ut.get_week_start(dt.date(2022, 2, 2)) == dt.date(2022, 1, 31)
+    assert ut.get_week_start(dt.date(2022, 1, 31)) == dt.date(2022, 1, 31)
+    assert ut.get_week_start(dt.date(2022, 2, 6)) == dt.date(2022, 1, 31)
+
+
 def test_from_weekday_int_to_str() -> None:
     with pytest.raises(AssertionError):
         ut.from_weekday_int_to_str(7)
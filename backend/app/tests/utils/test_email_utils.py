@@ -1,11 +1,15 @@
+import datetime as dt
 from pathlib import Path
-from smtplib import SMTPRecipientsRefused, SMTPAuthenticationError
+from smtplib import SMTPRecipientsRefused, SMTPAuthenticationError, SMTPServerDisconnected
 
 import pytest
 from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 
 from app.core.config import settings
 from app.utils.email_utils import (
+    SMTPPool,
+    build_message,
+    build_session_reminder_email,
     send_email,
     send_new_account_email,
     send_reset_api_key_email,
@@ -33,6 +37,13 @@ def test_send_email_wrong_login_smtp_password(mocker) -> None:
     assert e.type == SMTPAuthenticationError
 
 
+def test_send_email_connection_error_raised(mocker) -> None:
+    mocker.patch.object(settings, "EMAILS_ENABLED", True)
+    mocker.patch("app.utils.email_utils.smtplib.SMTP", side_effect=ConnectionRefusedError("SMTP server down"))
+    with pytest.raises(ConnectionRefusedError):  # not hidden by the connection quit
+        send_email(settings.TESTS_EMAIL, "My test mail subject", "html_template", "text_template")
+
+
 def test_send_new_account_email(mocker) -> None:
     no_loader_jinja_env = Environment()
     email_to = settings.TESTS_EMAIL
@@ -95,3 +106,73 @@ def test_send_reset_api_key_email_not_existing_template_raises_exception(mocker)
     with pytest.raises(Exception) as e:
         send_reset_api_key_email(settings.TESTS_EMAIL, "reset apikey token")
     assert e.type == TemplateNotFound
+
+
+class FakeSMTP:
+    """Records the connections and their sent emails, refuses the "refused@" recipients."""
+    connections = []
+
+    def __init__(self, host: str, port: int) -> None:
+        self.sent = []
+        self.closed = False
+        FakeSMTP.connections.append(self)
+
+    def starttls(self, context) -> None:
+        pass
+
+    def login(self, user: str, password: str) -> None:
+        pass
+
+    def sendmail(self, from_addr: str, to_addrs: str, msg: str) -> None:
+        if self.closed:
+            raise SMTPServerDisconnected("Connection unexpectedly closed")
+        if to_addrs.startswith("refused@"):
+            raise SMTPRecipientsRefused({to_addrs: (550, b"No such user")})
+        self.sent.append(to_addrs)
+
+    def quit(self) -> None:
+        self.closed = True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(mocker) -> type[FakeSMTP]:
+    FakeSMTP.connections = []
+    mocker.patch("app.utils.email_utils.smtplib.SMTP", FakeSMTP)
+    mocker.patch.object(settings, "EMAILS_ENABLED", True)
+    return FakeSMTP
+
+
+@pytest.mark.anyio
+async def test_smtp_pool_reuses_connections(fake_smtp: type[FakeSMTP]) -> None:
+    messages = [build_message(f"user{i}@example.com", "subject", "html", "text") for i in range(50)]
+    async with SMTPPool(size=2) as smtp_pool:
+        assert sum(smtp_pool.send_all(messages)) == 50
+        assert sum(smtp_pool.send_all(messages[:10])) == 10
+    assert 1 <= len(fake_smtp.connections) <= 2
+    assert sum(len(connection.sent) for connection in fake_smtp.connections) == 60
+    assert all(connection.closed for connection in fake_smtp.connections)
+
+
+@pytest.mark.anyio
+async def test_smtp_pool_failures(fake_smtp: type[FakeSMTP]) -> None:
+    async with SMTPPool(size=1) as smtp_pool:
+        messages = [build_message("refused@example.com"), build_message("ok@example.com")]
+        assert smtp_pool.send_all(messages) == [False, True]
+        assert fake_smtp.connections[0].closed  # not reused after the error
+        fake_smtp.connections[1].closed = True  # e.g. closed by the server after some idle time
+        assert smtp_pool.send_all([build_message("ok@example.com")]) == [True]
+    assert [connection.sent for connection in fake_smtp.connections] == [[], ["ok@example.com"], ["ok@example.com"]]
+
+
+def test_build_session_reminder_email() -> None:
+    sessions = [{"date": dt.date(2030, 1, 7), "time": dt.time(9, 30), "speaker_name": "Ada Lovelace"},
+                {"date": dt.date(2030, 1, 7), "time": dt.time(14), "speaker_name": "Ada Lovelace"}]
+    message = build_session_reminder_email(settings.TESTS_EMAIL, "Bob", sessions)
+    assert message["To"] == settings.TESTS_EMAIL
+    assert message["Subject"] == f"{settings.PROJECT_NAME} - Reminder : your next session on 2030-01-07 at 09:30"
+    text = message.get_payload()[0].get_payload()
+    assert "Hello Bob" in text
+    assert "- 2030-01-07 at 09:30 with Ada Lovelace" in text and "- 2030-01-07 at 14:00 with Ada Lovelace" in text
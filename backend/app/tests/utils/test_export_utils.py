@@ -0,0 +1,62 @@
+""" Tests of app.utils.export_utils"""
+
+import csv
+import datetime as dt
+import io
+
+import pytest
+from sqlalchemy import Column, Date, Integer, String, Time
+
+from app.utils import export_utils
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+COLUMNS = [Column("id", Integer), Column("date", Date), Column("time", Time), Column("comments", String)]
+ROWS = [(i, dt.date(2022, 3, 7), dt.time(9, 30), None if i % 2 else f"comment {i}") for i in range(10)]
+
+
+class FakeAsyncResult:
+    """Only what export_utils needs from sqlalchemy AsyncResult."""
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+
+    def keys(self) -> list[str]:
+        return [column.key for column in COLUMNS]
+
+    async def partitions(self, size: int):
+        for i in range(0, len(self.rows), size):
+            yield self.rows[i:i + size]
+
+
+async def test_stream_csv(mocker) -> None:
+    mocker.patch.object(export_utils.settings, "STREAM_YIELD_PER", 3)
+    chunks = [chunk async for chunk in export_utils.stream_csv(FakeAsyncResult(ROWS))]
+    assert len(chunks) == 4  # ceil(10 / 3)
+    lines = list(csv.reader(io.StringIO("".join(chunks))))
+    assert lines[0] == ["id", "date", "time", "comments"]
+    assert lines[1] == ["0", "2022-03-07", "09:30:00", "comment 0"]
+    assert len(lines) == 11
+
+
+async def test_stream_parquet(mocker) -> None:
+    if not export_utils.is_parquet_available():
+        pytest.skip("pyarrow is not installed")
+    import pyarrow.parquet as pq
+    mocker.patch.object(export_utils.settings, "STREAM_YIELD_PER", 3)
+    chunks = [chunk async for chunk in export_utils.stream_parquet(FakeAsyncResult(ROWS), COLUMNS)]
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet_file.metadata.num_row_groups == 4
+    table = parquet_file.read()
+    assert table.column_names == ["id", "date", "time", "comments"]
+    assert table.num_rows == 10
+    assert table.column("comments").to_pylist()[:2] == ["comment 0", None]
@@ -0,0 +1,30 @@
+""" Tests of app.utils.http_utils"""
+
+import pytest
+
+from app.utils.http_utils import etag_matches, version_etag
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+def test_etag_matches() -> None:
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"xyz", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"xyz"', '"abc"')
+
+
+def test_version_etag() -> None:
+    etag = version_etag([1, 2], 3, "/path")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == version_etag([1, 2], 3, "/path")
+    assert etag != version_etag([1, 3], 3, "/path")
+    assert etag != version_etag([1, 2], 4, "/path")
@@ -0,0 +1,53 @@
+""" Tests of app.utils.ical_utils"""
+
+import datetime as dt
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import ical_utils
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+def test_escape_text() -> None:
+    assert ical_utils.escape_text("a;b,c\\d\ne") == "a\\;b\\,c\\\\d\\ne"
+
+
+def test_fold_line() -> None:
+    assert ical_utils.fold_line("SUMMARY:short") == "SUMMARY:short\r\n"
+    folded = ical_utils.fold_line("DESCRIPTION:" + "é" * 100)
+    parts = folded.removesuffix("\r\n").split("\r\n ")
+    assert len(parts) > 1
+    assert all(len(part.encode()) <= 75 for part in parts)
+    assert "".join(parts) == "DESCRIPTION:" + "é" * 100
+
+
+def test_availability_event() -> None:
+    avail = SimpleNamespace(id=1, start_date=dt.date(2022, 2, 2), end_date=dt.date(2022, 3, 31),
+                            week_day=0, time=dt.time(9, 30))
+    vevent = ical_utils.availability_event(avail, slot_time=45)
+    assert "DTSTART:20220207T093000\r\n" in vevent
+    assert "DTEND:20220207T101500\r\n" in vevent
+    assert "RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20220331T235959\r\n" in vevent
+
+    # none monday between start and end dates
+    avail.end_date = dt.date(2022, 2, 5)
+    assert ical_utils.availability_event(avail, slot_time=45) is None
+
+
+def test_session_event() -> None:
+    session = SimpleNamespace(id=3, date=dt.date(2022, 2, 7), time=dt.time(9), comments="first, session",
+                              type_name="teach", status_name="scheduled", nb_session_week=2,
+                              first_name="first", last_name="last")
+    vevent = ical_utils.session_event(session, slot_time=30)
+    assert vevent.startswith("BEGIN:VEVENT\r\n") and vevent.endswith("END:VEVENT\r\n")
+    assert "DTEND:20220207T100000\r\n" in vevent
+    assert "SUMMARY:teach session with first last (scheduled)\r\n" in vevent
+    assert "DESCRIPTION:first\\, session\r\n" in vevent
@@ -0,0 +1,72 @@
+""" Tests of app.utils.json_utils"""
+
+import datetime as dt
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app import models, schemas
+from app.utils import json_utils
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+def test_dumps_as_jsonable_encoder() -> None:
+    content = [{"date": dt.date(2022, 3, 7), "time": dt.time(9, 30), "comments": "élève absent", "id": 1,
+                "participant_id": None}]
+    assert json.loads(json_utils.dumps(content)) == jsonable_encoder(content)
+
+
+def test_fast_json_response_render() -> None:
+    response = json_utils.FastJSONResponse([{"date": dt.date(2022, 3, 7)}], headers={"ETag": 'W/"1"'})
+    assert json.loads(response.body) == [{"date": "2022-03-07"}]
+    assert response.headers["ETag"] == 'W/"1"'
+    assert response.media_type == "application/json"
+
+
+class FakeAsyncResult:
+    """Only what json_utils needs from sqlalchemy AsyncResult."""
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+
+    async def partitions(self, size: int):
+        for i in range(0, len(self.rows), size):
+            yield self.rows[i:i + size]
+
+
+@pytest.mark.parametrize("nb_rows", [0, 1, 3, 10])
+async def test_stream_json_list(mocker, nb_rows: int) -> None:
+    mocker.patch.object(json_utils.settings, "STREAM_YIELD_PER", 3)
+    rows = [{"id": i, "date": dt.date(2022, 3, 7)} for i in range(nb_rows)]
+    chunks = [chunk async for chunk in json_utils.stream_json_list(FakeAsyncResult(rows), dict)]
+    assert len(chunks) == 2 + -(-nb_rows // 3)  # the brackets and ceil(nb_rows / 3)
+    assert json.loads(b"".join(chunks)) == jsonable_encoder(rows)
+
+
+def test_fields_serializer() -> None:
+    availability = models.Availability(id=1, start_date=dt.date(2022, 3, 7), end_date=dt.date(2022, 6, 27),
+                                       week_day=0, time=dt.time(9, 30), speaker_id=2)
+    serialize = json_utils.fields_serializer(json_utils.schema_fields(schemas.Availability))
+    assert json.loads(json_utils.dumps(serialize(availability))) \
+        == jsonable_encoder(schemas.Availability(**jsonable_encoder(availability)))
+
+
+def test_schema_fields_serializer_exclude() -> None:
+    session = models.Session(id=1, date=dt.date(2022, 3, 7), time=dt.time(9, 30), comments=None,
+                             participant_id=3, speaker_id=2, type_id=1, status_id=1)
+    fields = json_utils.schema_fields(schemas.Session, exclude=("type_name", "status_name"))
+    assert fields == ("id", "date", "time", "comments", "participant_id", "type_id", "status_id")
+    serialize = json_utils.fields_serializer(fields)
+    assert serialize(session) == {"id": 1, "date": dt.date(2022, 3, 7), "time": dt.time(9, 30), "comments": None,
+                                  "participant_id": 3, "type_id": 1, "status_id": 1}
+    assert json_utils.fields_serializer(["id"])(session) == {"id": 1}
@@ -0,0 +1,147 @@
+""" Tests of app.send_reminders"""
+
+import datetime as dt
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud, send_reminders
+
+# This is the same as using the @pytest.mark.anyio on all test functions in the module
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def init_data_tests_db() -> None:
+    """
+    Override this session scoped autouse async fixture to avoid pytest async warnings
+    """
+    pass
+
+
+def reminder_row(participant_id: int, day: int) -> SimpleNamespace:
+    return SimpleNamespace(participant_id=participant_id, email=f"p{participant_id}@example.com",
+                           first_name=f"P{participant_id}", date=dt.date(2030, 1, day), time=dt.time(9, 30),
+                           speaker_first_name="Ada", speaker_last_name="Lovelace")
+
+
+# participant 2 rows are split between the 1st and the 2nd chunk of 3 rows
+ROWS = [reminder_row(1, 7), reminder_row(2, 7), reminder_row(2, 8), reminder_row(2, 9), reminder_row(3, 7),
+        reminder_row(4, 8), reminder_row(4, 9)]
+
+
+class FakeAsyncResult:
+    """Only what send_reminders needs from sqlalchemy AsyncResult."""
+    def __init__(self, rows: list[SimpleNamespace]) -> None:
+        self.rows = rows
+
+    async def partitions(self, size: int):
+        for i in range(0, len(self.rows), size):
+            yield self.rows[i:i + size]
+
+
+async def test_recipients_batches(mocker) -> None:
+    mocker.patch.object(send_reminders.settings, "STREAM_YIELD_PER", 3)
+    batches = [batch async for batch in send_reminders.recipients_batches(FakeAsyncResult(ROWS))]
+    assert [[[row.participant_id for row in group] for group in batch] for batch in batches] \
+        == [[[1]], [[2, 2, 2], [3]], [[4, 4]]]
+
+
+async def test_recipients_batches_no_rows() -> None:
+    assert [batch async for batch in send_reminders.recipients_batches(FakeAsyncResult([]))] == []
+
+
+class FakeSMTPPool:
+    sent = []
+    refused = set()  # recipients whose reminders are not sent
+
+    async def __aenter__(self) -> "FakeSMTPPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def send_all(self, messages) -> list[bool]:
+        FakeSMTPPool.sent += [message for message in messages if message["To"] not in FakeSMTPPool.refused]
+        return [message["To"] not in FakeSMTPPool.refused for message in messages]
+
+
+class FakeAsyncSession:
+    async def __aenter__(self) -> "FakeAsyncSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+
+async def test_send_session_reminders(mocker) -> None:
+    mocker.patch.object(send_reminders.settings, "STREAM_YIELD_PER", 3)
+    mocker.patch.object(send_reminders, "AsyncSessionLocal", FakeAsyncSession)
+    mocker.patch.object(send_reminders.email_utils, "SMTPPool", FakeSMTPPool)
+    FakeSMTPPool.sent, FakeSMTPPool.refused = [], set()
+    stream_rows = mocker.patch.object(crud.session, "stream_reminders_rows", return_value=FakeAsyncResult(ROWS))
+    mocker.patch.object(crud.watermark, "get", return_value=None)
+    set_watermark = mocker.patch.object(crud.watermark, "set")
+
+    assert await send_reminders.send_session_reminders(hours_ahead=24) == 4
+    _, start, end = stream_rows.call_args.args
+    assert end - start == dt.timedelta(hours=24)
+    assert set_watermark.call_args.args[1:] == (send_reminders.REMINDERS_WATERMARK, end)
+    assert [message["To"] for message in FakeSMTPPool.sent] == [f"p{i}@example.com" for i in range(1, 5)]
+    text = FakeSMTPPool.sent[1].get_payload()[0].get_payload()
+    assert all(f"2030-01-0{day} at 09:30 with Ada Lovelace" in text for day in (7, 8, 9))
+    assert "send_session_reminders" in send_reminders.runner.jobs
+
+
+async def test_send_session_reminders_from_last_window_end(mocker) -> None:
+    mocker.patch.object(send_reminders, "AsyncSessionLocal", FakeAsyncSession)
+    mocker.patch.object(send_reminders.email_utils, "SMTPPool", FakeSMTPPool)
+    stream_rows = mocker.patch.object(crud.session, "stream_reminders_rows", return_value=FakeAsyncResult([]))
+    mocker.patch.object(crud.watermark, "set")
+    last_end = dt.datetime.now() + dt.timedelta(hours=20)  # e.g. the app restarted 4 hours after the last run
+    mocker.patch.object(crud.watermark, "get", return_value=last_end)
+
+    await send_reminders.send_session_reminders(hours_ahead=24)
+    _, start, end = stream_rows.call_args.args
+    assert start == last_end and end - last_end > dt.timedelta(hours=3)
+
+
+async def test_send_session_reminders_already_sent(mocker) -> None:
+    mocker.patch.object(send_reminders, "AsyncSessionLocal", FakeAsyncSession)
+    stream_rows = mocker.patch.object(crud.session, "stream_reminders_rows")
+    mocker.patch.object(crud.watermark, "get", return_value=dt.datetime.now() + dt.timedelta(hours=30))
+
+    assert await send_reminders.send_session_reminders(hours_ahead=24) == 0
+    stream_rows.assert_not_called()
+
+
+async def test_send_session_reminders_some_not_sent(mocker) -> None:
+    mocker.patch.object(send_reminders, "AsyncSessionLocal", FakeAsyncSession)
+    mocker.patch.object(send_reminders.email_utils, "SMTPPool", FakeSMTPPool)
+    FakeSMTPPool.sent, FakeSMTPPool.refused = [], {"p2@example.com"}
+    first_not_sent, later = (dt.datetime.now().replace(microsecond=0) + dt.timedelta(hours=h) for h in (3, 5))
+    rows = [SimpleNamespace(**{**vars(reminder_row(participant_id, 1)), "date": session.date(), "time": session.time()})
+            for participant_id, session in ((1, first_not_sent), (2, first_not_sent), (2, later))]
+    mocker.patch.object(crud.session, "stream_reminders_rows", return_value=FakeAsyncResult(rows))
+    mocker.patch.object(crud.watermark, "get", return_value=None)
+    set_watermark = mocker.patch.object(crud.watermark, "set")
+
+    assert await send_reminders.send_session_reminders(hours_ahead=24) == 1
+    # the next run starts from the first session of the not sent reminders
+    assert set_watermark.call_args.args[2] == first_not_sent
+
+
+async def test_send_session_reminders_none_sent_raises(mocker) -> None:
+    mocker.patch.object(send_reminders, "AsyncSessionLocal", FakeAsyncSession)
+    mocker.patch.object(send_reminders.email_utils, "SMTPPool", FakeSMTPPool)
+    FakeSMTPPool.sent, FakeSMTPPool.refused = [], {f"p{i}@example.com" for i in range(1, 5)}
+    mocker.patch.object(crud.session, "stream_reminders_rows", return_value=FakeAsyncResult(ROWS))
+    mocker.patch.object(crud.watermark, "get", return_value=None)
+    set_watermark = mocker.patch.object(crud.watermark, "set")
+
+    with pytest.raises(RuntimeError):  # retried by the jobs runner, on the same window
+        await send_reminders.send_session_reminders(hours_ahead=24)
+    set_watermark.assert_not_called()
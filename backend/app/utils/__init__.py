@@ -1 +1,3 @@
 from app.utils.date_time_utils import add_time, subtract_time, from_weekday_int_to_str  # noqa
+from app.utils.date_time_utils import first_weekday_date, get_week_start  # noqa
+from app.utils.date_time_utils import shift_time, slot_times, weekday_ordinals, weekday_dates  # noqa
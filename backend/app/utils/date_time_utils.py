@@ -1,12 +1,52 @@
 import datetime as dt
 
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def shift_time(time: dt.time, minutes: int) -> dt.time:
+    """
+    Add (or subtract if negative) minutes to a time with integer arithmetic (no datetime built),
+    wrapping around midnight.
+    """
+    seconds = (time.hour * 3600 + time.minute * 60 + time.second + minutes * 60) % SECONDS_PER_DAY
+    return dt.time(seconds // 3600, seconds // 60 % 60, seconds % 60, time.microsecond)
+
 
 def add_time(date: dt.date, time: dt.time, minutes_to_add: int) -> dt.time:
-    return (dt.datetime.combine(date, time) + dt.timedelta(minutes=minutes_to_add)).time()
+    # times are naive : the date does not change the result (kept for the callers)
+    return shift_time(time, minutes_to_add)
 
 
 def subtract_time(date: dt.date, time: dt.time, minutes_to_subtract: int) -> dt.time:
-    return (dt.datetime.combine(date, time) - dt.timedelta(minutes=minutes_to_subtract)).time()
+    return shift_time(time, -minutes_to_subtract)
+
+
+def slot_times(time: dt.time, nb_slots: int, slot_time: int) -> list[dt.time]:
+    """The start times of nb_slots consecutive slots of slot_time minutes from time."""
+    return [shift_time(time, i * slot_time) for i in range(nb_slots)]
+
+
+def first_weekday_date(start_date: dt.date, week_day: int) -> dt.date:
+    """Return the first date from start_date (included) which is a week_day (0 for monday ... 6 for sunday)."""
+    return start_date + dt.timedelta(days=(week_day - start_date.weekday()) % 7)
+
+
+def weekday_ordinals(start_date: dt.date, end_date: dt.date, week_day: int) -> range:
+    """
+    The ordinals (see date.toordinal()) of all week_day dates from start_date to end_date (included),
+    as a range : its length and membership tests are computed without expanding it.
+    """
+    return range(first_weekday_date(start_date, week_day).toordinal(), end_date.toordinal() + 1, 7)
+
+
+def weekday_dates(start_date: dt.date, end_date: dt.date, week_day: int) -> list[dt.date]:
+    """All week_day dates from start_date to end_date (included), e.g. an availability's occurrences."""
+    return [dt.date.fromordinal(ordinal) for ordinal in weekday_ordinals(start_date, end_date, week_day)]
+
+
+def get_week_start(date: dt.date) -> dt.date:
+    """Return the monday of the date's week."""
+    return date - dt.timedelta(days=date.weekday())
 
 
 def from_weekday_int_to_str(weekday_int: int) -> str:
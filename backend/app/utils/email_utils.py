@@ -1,17 +1,28 @@
-import smtplib, ssl
+import asyncio
+import logging
+import queue
+import smtplib
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
+from typing import Any, Iterable
 
+from app.core import metrics
+from app.core.jobs import runner
 from app.core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
 jinja_emails_env = Environment(loader=FileSystemLoader(Path(settings.EMAIL_TEMPLATES_DIR)))
 
 
-def send_email(email_to: str, subject_template: str = "", html_template: str = "", text_template: str = "") -> None:
-    assert settings.EMAILS_ENABLED, "no provided configuration for email variables"
+def build_message(email_to: str, subject_template: str = "", html_template: str = "",
+                  text_template: str = "") -> MIMEMultipart:
     message = MIMEMultipart("alternative")
     message['Subject'] = subject_template
     message['From'] = settings.EMAILS_FROM_EMAIL
@@ -23,19 +34,29 @@ def send_email(email_to: str, subject_template: str = "", html_template: str = "
     # The email client will try to render the last part first
     message.attach(text_body)
     message.attach(html_body)
+    return message
+
+
+def send_email(email_to: str, subject_template: str = "", html_template: str = "", text_template: str = "") -> None:
+    assert settings.EMAILS_ENABLED, "no provided configuration for email variables"
+    message = build_message(email_to, subject_template, html_template, text_template)
 
     # Create a secure SSL context
     context = ssl.create_default_context()
     # Using .starttls() with a Gmail Account set for Development
+    start, status = time.perf_counter(), "error"
+    server = None
     try:
         server = smtplib.SMTP(settings.SMTP_HOST, settings.START_TLS_PORT)
         server.starttls(context=context)  # Secure the connection
         server.login(settings.EMAILS_FROM_EMAIL, settings.SMTP_PASSWORD)
         server.sendmail(settings.EMAILS_FROM_EMAIL, email_to, message.as_string())
-    except Exception as e:
-        raise e
+        status = "ok"
     finally:
-        server.quit()
+        # observed before quit(), which may raise too
+        metrics.SMTP_SEND_DURATION.observe(time.perf_counter() - start, status=status)
+        if server is not None:  # None if the connection failed (its error is raised)
+            server.quit()
 
     # Setting up a Local SMTP Server
     # $ sudo python -m smtpd -c DebuggingServer -n localhost:1025
@@ -49,6 +70,7 @@ def send_email(email_to: str, subject_template: str = "", html_template: str = "
     #     local_server.quit()
 
 
+@runner.register
 def send_new_account_email(email_to: str) -> None:
     data = {
         "project_name": settings.PROJECT_NAME,
@@ -72,3 +94,108 @@ def send_reset_api_key_email(email_to: str, token: str) -> None:
     html_template = jinja_emails_env.get_template('reset_api_key_email.html').render(**data)
     text_template = jinja_emails_env.get_template('reset_api_key_email.txt').render(**data)
     send_email(email_to, data["subject"], html_template, text_template)
+
+
+@runner.register
+def send_new_session_email(email_to: str, date: str, time: str, speaker_name: str) -> None:
+    """date and time as ISO strings (a job payload is JSON)."""
+    data = {
+        "project_name": settings.PROJECT_NAME,
+        "subject": f"{settings.PROJECT_NAME} - New session on {date} at {time[:5]}",
+        "email_to": email_to,
+        "date": date,
+        "time": time[:5],
+        "speaker_name": speaker_name,
+        "link": settings.API_DOCS_LINK
+    }
+    html_template = jinja_emails_env.get_template('new_session.html').render(**data)
+    text_template = jinja_emails_env.get_template('new_session.txt').render(**data)
+    send_email(email_to, data["subject"], html_template, text_template)
+
+
+class SMTPPool:
+    """
+    To send many emails at once (e.g. reminders) : up to size logged in SMTP connections are kept and reused
+    (so the connection, TLS handshake and login are done once by connection, not once by email),
+    and the emails of a batch are sent by size threads (one connection each) at the same time.
+    """
+
+    def __init__(self, size: int = settings.SMTP_POOL_SIZE) -> None:
+        self.size = size
+        self.connections: queue.SimpleQueue[smtplib.SMTP] = queue.SimpleQueue()
+        self.executor = ThreadPoolExecutor(size, thread_name_prefix="smtp")
+
+    def connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.START_TLS_PORT)
+        try:
+            server.starttls(context=ssl.create_default_context())
+            server.login(settings.EMAILS_FROM_EMAIL, settings.SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def send(self, message: MIMEMultipart) -> bool:
+        """Send with a pooled connection (a new one if none is free, or if the server closed it) : False if failed."""
+        try:
+            server = self.connections.get_nowait()
+        except queue.Empty:
+            server = None
+        start, status = time.perf_counter(), "error"
+        try:
+            for attempt in range(2):  # once again with a new connection if the pooled one was closed
+                if server is None:
+                    server = self.connect()
+                try:
+                    server.sendmail(settings.EMAILS_FROM_EMAIL, message["To"], message.as_string())
+                    status = "ok"
+                    break
+                except smtplib.SMTPServerDisconnected:
+                    server = None
+                    if attempt:
+                        raise
+        except Exception:
+            logger.exception("Sending email to %s failed", message["To"])
+            if server is not None:  # in an unknown state after the error : not to be reused
+                server.close()
+            return False
+        finally:
+            metrics.SMTP_SEND_DURATION.observe(time.perf_counter() - start, status=status)
+        self.connections.put(server)
+        return True
+
+    def send_all(self, messages: Iterable[MIMEMultipart]) -> list[bool]:
+        """Send a batch of emails (size at once) : if each one was sent, in the messages order."""
+        assert settings.EMAILS_ENABLED, "no provided configuration for email variables"
+        return list(self.executor.map(self.send, messages))
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        while not self.connections.empty():
+            try:
+                self.connections.get_nowait().quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    async def __aenter__(self) -> "SMTPPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        # the executor shutdown (waiting for the sending threads) and the QUITs block : not in the event loop
+        await asyncio.to_thread(self.close)
+
+
+def build_session_reminder_email(email_to: str, first_name: str, sessions: list[dict[str, Any]]) -> MIMEMultipart:
+    """sessions : dicts (date, time, speaker_name) of the recipient's upcoming sessions, in chronological order."""
+    data = {
+        "project_name": settings.PROJECT_NAME,
+        "subject": f"{settings.PROJECT_NAME} - Reminder : your next session on {sessions[0]['date']} "
+                   f"at {sessions[0]['time']:%H:%M}",
+        "email_to": email_to,
+        "first_name": first_name,
+        "sessions": sessions,
+        "link": settings.API_DOCS_LINK
+    }
+    html_template = jinja_emails_env.get_template('session_reminder.html').render(**data)
+    text_template = jinja_emails_env.get_template('session_reminder.txt').render(**data)
+    return build_message(email_to, data["subject"], html_template, text_template)
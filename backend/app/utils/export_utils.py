@@ -0,0 +1,86 @@
+"""
+CSV and Parquet streamed exports : rows are fetched from a db server-side cursor by chunks
+(see settings.STREAM_YIELD_PER) and each chunk is written then sent, so memory does not depend on the rows number.
+Parquet export needs the pyarrow package (not installed by default).
+"""
+
+import csv
+import datetime as dt
+import io
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import Column
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.core.config import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+
+def is_parquet_available() -> bool:
+    return pa is not None
+
+
+async def stream_csv(result: AsyncResult) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(result.keys())
+    async for rows in result.partitions(settings.STREAM_YIELD_PER):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class ChunksSink(io.RawIOBase):
+    """Write-only file object keeping written bytes until they are taken (i.e sent)."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: bytes) -> int:
+        self.chunks.append(bytes(b))
+        self.position += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_schema(columns: Iterable[Column]) -> "pa.Schema":
+    """Build the Parquet schema from the selected columns types (so it never depends on the first rows values)."""
+    pa_types = {int: pa.int64(), str: pa.string(), bool: pa.bool_(), float: pa.float64(),
+                dt.date: pa.date32(), dt.time: pa.time64("us"), dt.datetime: pa.timestamp("us")}
+    return pa.schema([(column.key, pa_types[column.type.python_type]) for column in columns])
+
+
+async def stream_parquet(result: AsyncResult, columns: Iterable[Column]) -> AsyncIterator[bytes]:
+    """
+    Each chunk of rows is written as one Parquet row group.
+    columns are the selected columns (e.g. Select.selected_columns), in the same order as the result ones.
+    """
+    assert is_parquet_available(), "pyarrow package is needed for Parquet export"
+    schema = parquet_schema(columns)
+    sink = ChunksSink()
+    writer = pq.ParquetWriter(sink, schema)
+    async for rows in result.partitions(settings.STREAM_YIELD_PER):
+        writer.write_table(pa.Table.from_arrays([pa.array(values, type=field.type)
+                                                 for values, field in zip(zip(*rows), schema)], schema=schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
@@ -0,0 +1,25 @@
+import hashlib
+from typing import Any
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks the If-None-Match request header against the current ETag (RFC 7232 3.2 weak comparison).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def version_etag(versions: list[int], *parts: Any) -> str:
+    """Strong ETag from version stamps and other parts of the representation (e.g. user id, url, slot time)."""
+    return '"' + hashlib.md5(":".join(map(str, [*versions, *parts])).encode()).hexdigest() + '"'
+
+
+class NotModified(Exception):
+    """Raised to answer a 304 Not Modified (see the exception handler in main.py)."""
+
+    def __init__(self, etag: str) -> None:
+        self.etag = etag
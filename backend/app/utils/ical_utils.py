@@ -0,0 +1,112 @@
+"""
+iCalendar (RFC 5545) rendering of sessions and availabilities, to be streamed to calendar clients.
+Dates and times are stored without time zone in db, so they are written as "floating" local times.
+"""
+
+import datetime as dt
+from typing import Any, AsyncIterator, Callable
+
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.core.config import settings
+from app.utils.date_time_utils import first_weekday_date
+
+
+ICAL_WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]  # index = python weekday int
+
+
+def escape_text(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+                .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line: str) -> str:
+    """Lines longer than 75 octets are split, next parts starting with a space (RFC 5545 3.1)."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:  # do not cut an utf-8 character
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        limit = 74  # the leading space counts
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(date: dt.date, time: dt.time) -> str:
+    return dt.datetime.combine(date, time).strftime("%Y%m%dT%H%M%S")
+
+
+def calendar_begin(name: str) -> str:
+    return "".join(fold_line(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:-//{settings.PROJECT_NAME}//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ])
+
+
+def calendar_end() -> str:
+    return fold_line("END:VCALENDAR")
+
+
+def event(uid: str, start: dt.datetime, duration_minutes: int, summary: str, *,
+          description: str = None, rrule: str = None) -> str:
+    end = start + dt.timedelta(minutes=duration_minutes)
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{settings.PROJECT_NAME}",
+        f"DTSTAMP:{dt.datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART:{format_datetime(start.date(), start.time())}",
+        f"DTEND:{format_datetime(end.date(), end.time())}",
+        f"SUMMARY:{escape_text(summary)}",
+    ]
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def session_event(row: Any, slot_time: int) -> str:
+    """
+    row has to have : id, date, time, comments, type_name, status_name, nb_session_week,
+    first_name and last_name (the session's participant).
+    """
+    return event(f"session-{row.id}",
+                 dt.datetime.combine(row.date, row.time),
+                 slot_time * max(row.nb_session_week, 1),
+                 f"{row.type_name} session with {row.first_name} {row.last_name} ({row.status_name})",
+                 description=row.comments)
+
+
+def availability_event(row: Any, slot_time: int) -> str | None:
+    """
+    A recurring availability is written as only one weekly event (RRULE) instead of one event by date.
+    Returns None if there is no date with the same weekday between the start and end dates.
+    row has to have : id, start_date, end_date, week_day and time.
+    """
+    first_date = first_weekday_date(row.start_date, row.week_day)
+    if first_date > row.end_date:
+        return None
+    return event(f"availability-{row.id}",
+                 dt.datetime.combine(first_date, row.time),
+                 slot_time,
+                 "Availability",
+                 rrule=(f"FREQ=WEEKLY;BYDAY={ICAL_WEEKDAYS[row.week_day]};"
+                        f"UNTIL={format_datetime(row.end_date, dt.time(23, 59, 59))}"))
+
+
+async def stream_calendar(name: str, result: AsyncResult, to_event: Callable[[Any], str | None]) -> AsyncIterator[str]:
+    """Yield the calendar by chunks of events, as rows are fetched from the db cursor."""
+    yield calendar_begin(name)
+    async for rows in result.partitions(settings.STREAM_YIELD_PER):
+        yield "".join(filter(None, (to_event(row) for row in rows)))
+    yield calendar_end()
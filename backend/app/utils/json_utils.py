@@ -0,0 +1,75 @@
+"""
+Fast JSON responses for the list endpoints : objects (ORM objects or rows) are turned into dicts by serializers
+built once by schema (the schema fields read as attributes) and dumped straight to JSON bytes,
+without jsonable_encoder() nor pydantic models building/validation.
+Large lists can be streamed instead : rows are fetched from a db server-side cursor by chunks
+(see settings.STREAM_YIELD_PER) and each chunk is dumped then sent, so memory does not depend on the rows number.
+Uses the orjson package if installed (not installed by default), else the json module (slower).
+"""
+
+import datetime as dt
+import json
+from operator import attrgetter
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def is_orjson_available() -> bool:
+    return orjson is not None
+
+
+def default(obj: Any) -> str:
+    """Dates and times as ISO strings, as jsonable_encoder() and orjson do."""
+    if isinstance(obj, (dt.date, dt.time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Content has to be JSON ready already (e.g. made by a fields_serializer()) : it is not encoded again."""
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def schema_fields(schema: type[BaseModel], exclude: Iterable[str] = ()) -> tuple[str, ...]:
+    exclude = set(exclude)
+    return tuple(name for name in schema.__fields__ if name not in exclude)
+
+
+def fields_serializer(fields: Sequence[str]) -> Callable[[Any], dict[str, Any]]:
+    """
+    Build the serializer of an object (ORM object or Row) into the dict of these fields (its attributes),
+    e.g. a schema_fields(). The fields excluded from a schema (e.g. not attributes of the object) have to be
+    added by the caller.
+    """
+    fields = tuple(fields)
+    if len(fields) == 1:
+        return lambda obj: {fields[0]: getattr(obj, fields[0])}
+    get_values = attrgetter(*fields)
+    return lambda obj: dict(zip(fields, get_values(obj)))
+
+
+async def stream_json_list(result: AsyncResult, serialize: Callable[[Any], dict[str, Any]]) -> AsyncIterator[bytes]:
+    """The JSON array of the serialized rows, one chunk by partition of rows (plus the brackets)."""
+    yield b"["
+    separator = b""
+    async for rows in result.partitions(settings.STREAM_YIELD_PER):
+        yield separator + dumps([serialize(row) for row in rows])[1:-1]
+        separator = b","
+    yield b"]"
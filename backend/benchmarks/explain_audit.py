@@ -0,0 +1,184 @@
+"""
+Query shapes audit : run each CRUD hot query against a seeded benchmark db and EXPLAIN (ANALYZE) its SQL statements,
+to check they are served by an index (and which one) rather than a sequential scan of a large table :
+    $ cd backend
+    $ BENCHMARK_DATABASE_URI=postgresql+asyncpg://... python -m benchmarks.explain_audit --output explain.json
+    $ python -m benchmarks.explain_audit --strict  # exit code 1 if a large table is sequentially scanned
+    $ python -m benchmarks.explain_audit --output new.json --compare explain.json  # e.g. before/after a change
+⚠️ The benchmark db is dropped and recreated at each run (see load_test.benchmark_db()).
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Iterator
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from benchmarks.load_test import benchmark_db
+from benchmarks.seed import FIRST_SLOT_TIME, SEEDED_SESSIONS_YEAR, Scale, SeededData
+
+# tables growing with the number of users : a sequential scan of one of them is a missing (or unusable) index
+LARGE_TABLES = {"user", "participant", "availability", "session", "speakerweekstats"}
+
+
+@dataclass
+class StatementPlan:
+    statement: str
+    execution_ms: float
+    indexes: list[str] = field(default_factory=list)
+    seq_scans: list[str] = field(default_factory=list)
+
+
+def plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def read_plan(statement: str, explain_output: Any) -> StatementPlan:
+    if isinstance(explain_output, str):  # depending on the driver json codec
+        explain_output = json.loads(explain_output)
+    root = explain_output[0]
+    plan = StatementPlan(" ".join(statement.split()), round(root["Execution Time"], 3))
+    for node in plan_nodes(root["Plan"]):
+        if "Index Name" in node and node["Index Name"] not in plan.indexes:
+            plan.indexes.append(node["Index Name"])
+        if node["Node Type"] == "Seq Scan" and node["Relation Name"] in LARGE_TABLES:
+            plan.seq_scans.append(node["Relation Name"])
+    return plan
+
+
+def crud_queries(data: SeededData) -> dict[str, Callable[[AsyncSession], Awaitable[Any]]]:
+    """The audited CRUD calls (by name), with arguments matching seeded rows."""
+    speaker_id = data.speakers_ids[0]
+    participant_id = data.participants_ids_by_speaker[speaker_id][0]
+    date = dt.date(SEEDED_SESSIONS_YEAR, 3, 4)  # a monday
+    month_start, month_end = dt.date(SEEDED_SESSIONS_YEAR, 3, 1), dt.date(SEEDED_SESSIONS_YEAR, 3, 31)
+    first_slot = dt.datetime.combine(date, FIRST_SLOT_TIME)
+    return {
+        "availability.get_by_speaker": lambda db: crud.availability.get_by_speaker(db, speaker_id),
+        "availability.get_all_in_period_speaker": lambda db: crud.availability.get_all_in_period_speaker(
+            db, speaker_id, month_start, month_end),
+        "availability.get_by_weekday_time_speaker": lambda db: crud.availability.get_by_weekday_time_speaker(
+            db, date.weekday(), FIRST_SLOT_TIME, speaker_id),
+        "availability.get_one_around_date_same_weekday_time_speaker":
+            lambda db: crud.availability.get_one_around_date_same_weekday_time_speaker(
+                db, speaker_id, date, FIRST_SLOT_TIME),
+        "session.get_by_speaker_date_range": lambda db: crud.session.get_by_speaker_date_range(
+            db, speaker_id, month_start, month_end),
+        "session.get_by_participant_date_range": lambda db: crud.session.get_by_participant_date_range(
+            db, participant_id, month_start, month_end),
+        "session.get_by_date_speaker": lambda db: crud.session.get_by_date_speaker(db, date, speaker_id),
+        "session.get_dates_times_nb_session_week_by_period_speaker":
+            lambda db: crud.session.get_dates_times_nb_session_week_by_period_speaker(
+                db, month_start, month_end, speaker_id),
+        "session.get_by_date_and_time": lambda db: crud.session.get_by_date_and_time(db, date, FIRST_SLOT_TIME),
+        "participant.get_speaker_id_and_nb_session_week_by_ids":
+            lambda db: crud.participant.get_speaker_id_and_nb_session_week_by_ids(db, [participant_id]),
+        "user.get (auth)": lambda db: crud.user.get(db, id=participant_id),
+        "user.get_by_email": lambda db: crud.user.get_by_email(db, email=data.emails[-1]),
+        "user.search": lambda db: crud.user.search(db, data.emails[-1][:8], limit=20),
+        "session.search_comments": lambda db: crud.session.search_comments(db, "absent", limit=20),
+        "session.stream_reminders_rows": lambda db: crud.session.stream_reminders_rows(
+            db, first_slot, first_slot + dt.timedelta(days=1)),
+        "speaker_week_stats.get_multi_by_period_speaker":
+            lambda db: crud.speaker_week_stats.get_multi_by_period_speaker(
+                db, speaker_id=speaker_id, start_date=month_start, end_date=month_end),
+        "change_counter.get_versions": lambda db: crud.change_counter.get_versions(
+            db, [crud.change_counter.speaker_scope(speaker_id)]),
+    }
+
+
+async def capture_statements(session_local: sessionmaker,
+                             query: Callable[[AsyncSession], Awaitable[Any]]) -> list[tuple[str, Any]]:
+    """The (statement, parameters) sent to the db by the query, as the driver received them."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        captured.append((statement, parameters))
+
+    async with session_local() as db:
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            await query(db)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return [(statement, parameters) for statement, parameters in captured
+            if statement.lstrip().upper().startswith("SELECT")]
+
+
+async def explain(session_local: sessionmaker, statement: str, parameters: Any) -> StatementPlan:
+    async with session_local() as db:
+        conn = await db.connection()
+        output = (await conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement,
+                                             parameters)).scalar()
+        await db.rollback()
+    return read_plan(statement, output)
+
+
+async def main(args: argparse.Namespace) -> dict[str, list[dict[str, Any]]]:
+    scale = Scale(speakers=args.speakers, participants_per_speaker=args.participants_per_speaker,
+                  slots_per_day=args.slots_per_day, sessions_per_participant=args.sessions_per_participant)
+    results = {}
+    async with benchmark_db(scale) as (session_local, data):
+        async with session_local() as db:  # planner statistics of the freshly seeded tables
+            await db.execute(text("ANALYZE"))
+            await db.commit()
+        for name, query in crud_queries(data).items():
+            results[name] = [asdict(await explain(session_local, statement, parameters))
+                             for statement, parameters in await capture_statements(session_local, query)]
+    return results
+
+
+def report(results: dict[str, list[dict[str, Any]]]) -> str:
+    lines = [f"{'query':<64}{'ms':>9}  indexes / seq scans"]
+    for name, plans in results.items():
+        for plan in plans:
+            scans = [f"SEQ SCAN {table}" for table in plan["seq_scans"]]
+            lines.append(f"{name:<64}{plan['execution_ms']:>9.3f}  {', '.join(plan['indexes'] + scans) or '-'}")
+    return "\n".join(lines)
+
+
+def compare(previous: dict[str, list[dict[str, Any]]], current: dict[str, list[dict[str, Any]]]) -> str:
+    """Statements number and total execution time of each query, between 2 audit files contents."""
+    lines = [f"{'query':<64}{'statements':<12}{'ms'}"]
+    for name, plans in current.items():
+        if name not in previous:
+            continue
+        old_ms, new_ms = (sum(plan["execution_ms"] for plan in p) for p in (previous[name], plans))
+        lines.append(f"{name:<64}{len(previous[name]):>2} -> {len(plans):<6}{old_ms:.3f} -> {new_ms:.3f}")
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--speakers", type=int, default=Scale.speakers)
+    parser.add_argument("--participants-per-speaker", type=int, default=Scale.participants_per_speaker)
+    parser.add_argument("--slots-per-day", type=int, default=Scale.slots_per_day)
+    parser.add_argument("--sessions-per-participant", type=int, default=Scale.sessions_per_participant)
+    parser.add_argument("--output", help="JSON file to write the plans summaries to")
+    parser.add_argument("--compare", help="previous JSON output to compare with")
+    parser.add_argument("--strict", action="store_true", help="exit code 1 if a large table is sequentially scanned")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    audit = asyncio.run(main(arguments))
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            json.dump(audit, f, indent=2)
+    print(report(audit))
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            print(compare(json.load(f), audit))
+    if arguments.strict and any(plan["seq_scans"] for plans in audit.values() for plan in plans):
+        sys.exit(1)
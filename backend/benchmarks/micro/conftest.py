@@ -0,0 +1,161 @@
+"""
+Micro-benchmarks harness (no pytest plugin needed) :
+    $ cd backend
+    $ python -m pytest benchmarks/micro                                                # compare with baseline.json
+    $ MICRO_BENCHMARK_SAVE_BASELINE=1 python -m pytest benchmarks/micro                # (re)write baseline.json
+Each measurement is the best mean time by call over some rounds. A benchmark fails if it is more than
+MICRO_BENCHMARK_THRESHOLD times slower than the baseline (to compare on the same machine only),
+or if its time grows faster with the rows number than its declared complexity.
+The baseline depends on the machine, so it is not committed : write it first (e.g. on the main branch) on the
+machine running the comparison. Without baseline (or without some benchmarks in it) only the growths are checked,
+and the terminal summary lists the measurements not compared.
+Results are only written to a file if asked (to keep them out of the source tree) :
+    $ MICRO_BENCHMARK_OUTPUT=/tmp/results.json python -m pytest benchmarks/micro
+"""
+
+import datetime as dt
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+from app import crud, models
+
+BENCHMARKS_DIR = Path(__file__).parent
+BASELINE_FILE = Path(os.getenv("MICRO_BENCHMARK_BASELINE", BENCHMARKS_DIR / "baseline.json"))
+OUTPUT_FILE = Path(os.environ["MICRO_BENCHMARK_OUTPUT"]) if os.getenv("MICRO_BENCHMARK_OUTPUT") else None
+THRESHOLD = float(os.getenv("MICRO_BENCHMARK_THRESHOLD", "1.5"))
+SAVE_BASELINE = bool(os.getenv("MICRO_BENCHMARK_SAVE_BASELINE"))
+SIZES = (10, 100, 10_000)
+MIN_ROUND_TIME = 0.05  # seconds
+ROUNDS = 3
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return 'asyncio'
+
+
+class Bench:
+    def __init__(self) -> None:
+        self.baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        self.results: dict[str, dict[str, float]] = defaultdict(dict)
+        self.not_compared: list[str] = []
+
+    async def measure(self, name: str, size: int, func: Callable[[], Awaitable[Any]]) -> float:
+        """Return (and record) the best mean time of a func() call, failing on regression against the baseline."""
+        start = time.perf_counter()
+        await func()
+        calls = max(1, min(10_000, int(MIN_ROUND_TIME / max(time.perf_counter() - start, 1e-9))))
+        best = math.inf
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            for _ in range(calls):
+                await func()
+            best = min(best, (time.perf_counter() - start) / calls)
+        self.results[name][str(size)] = best
+        baseline = self.baseline.get(name, {}).get(str(size))
+        if SAVE_BASELINE:
+            return best
+        if not baseline:
+            self.not_compared.append(f"{name} ({size} rows)")
+            return best
+        assert best <= baseline * THRESHOLD, \
+            f"{name} ({size} rows) : {best * 1e6:.1f} µs > {THRESHOLD} x baseline {baseline * 1e6:.1f} µs"
+        return best
+
+    def check_growth(self, name: str, max_exponent: float) -> None:
+        """
+        The time has to grow at most as size ** max_exponent (e.g. 1 for linear), between the 2 biggest sizes
+        (the exponent is the slope in log-log scale).
+        """
+        (small, t_small), (big, t_big) = sorted((int(size), t) for size, t in self.results[name].items())[-2:]
+        exponent = math.log(t_big / t_small) / math.log(big / small)
+        self.results[name]["growth_exponent"] = round(exponent, 2)
+        assert exponent <= max_exponent, f"{name} time grows as size ** {exponent:.2f} (max {max_exponent})"
+
+    def save(self) -> None:
+        if OUTPUT_FILE is not None:
+            OUTPUT_FILE.write_text(json.dumps(self.results, indent=2))
+        if SAVE_BASELINE:
+            BASELINE_FILE.write_text(json.dumps(self.results, indent=2))
+
+
+session_bench = Bench()
+
+
+@pytest.fixture(scope="session")
+def bench() -> Bench:
+    yield session_bench
+    session_bench.save()
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    """Make explicit that the regression threshold was not checked, rather than silently passing."""
+    if SAVE_BASELINE:
+        terminalreporter.write_sep("=", f"micro-benchmarks baseline written to {BASELINE_FILE}", green=True)
+    elif not BASELINE_FILE.exists():
+        terminalreporter.write_sep("=", f"no micro-benchmarks baseline {BASELINE_FILE} : regressions not checked",
+                                   yellow=True)
+        terminalreporter.write_line("Write it with MICRO_BENCHMARK_SAVE_BASELINE=1 (on this machine).")
+    elif session_bench.not_compared:
+        terminalreporter.write_sep("=", f"{len(session_bench.not_compared)} micro-benchmarks not in the baseline "
+                                        f"{BASELINE_FILE} : regressions not checked", yellow=True)
+        for measurement in session_bench.not_compared:
+            terminalreporter.write_line(measurement)
+
+
+class FakeCrudLayer:
+    """
+    In-memory replacement of the CRUD reading methods which load the scheduling snapshots
+    (see CRUDSpeaker.get_scheduling_snapshot()). The fake queries only return prebuilt lists :
+    measured times are the ones of the snapshot building and of the scheduling rules (not of some fake db scanning).
+    """
+
+    def __init__(self, speaker: models.Speaker, availabilities: list[models.Availability],
+                 sessions: list[models.Session], nb_session_week: int = 1) -> None:
+        self.speaker = speaker
+        self.nb_session_week = nb_session_week
+        self.availabilities = availabilities
+        self.sessions_rows = [SimpleNamespace(date=session.date, time=session.time, nb_session_week=nb_session_week)
+                              for session in sessions]
+
+    async def get_speaker(self, db: Any, id: int) -> models.Speaker:
+        return self.speaker
+
+    async def get_by_speaker(self, db: Any, speaker_id: int) -> list[models.Availability]:
+        return self.availabilities
+
+    async def get_all_in_period_speaker(self, db: Any, speaker_id: int, start_date: dt.date,
+                                        end_date: dt.date) -> list[models.Availability]:
+        return self.availabilities
+
+    async def get_dates_times_nb_session_week_by_period_speaker(self, db: Any, start_date: dt.date, end_date: dt.date,
+                                                                speaker_id: int) -> list[SimpleNamespace]:
+        return self.sessions_rows
+
+    async def get_nb_session_week(self, db: Any, id: int) -> int:
+        return self.nb_session_week
+
+    def install(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(crud.speaker, "get", self.get_speaker)
+        monkeypatch.setattr(crud.availability, "get_by_speaker", self.get_by_speaker)
+        monkeypatch.setattr(crud.availability, "get_all_in_period_speaker", self.get_all_in_period_speaker)
+        monkeypatch.setattr(crud.session, "get_dates_times_nb_session_week_by_period_speaker",
+                            self.get_dates_times_nb_session_week_by_period_speaker)
+        monkeypatch.setattr(crud.participant, "get_nb_session_week", self.get_nb_session_week)
+
+
+@pytest.fixture
+def fake_crud(monkeypatch: pytest.MonkeyPatch) -> Callable[..., FakeCrudLayer]:
+    def install_fake_crud(*args: Any, **kwargs: Any) -> FakeCrudLayer:
+        layer = FakeCrudLayer(*args, **kwargs)
+        layer.install(monkeypatch)
+        return layer
+    return install_fake_crud
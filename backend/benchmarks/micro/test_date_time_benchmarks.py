@@ -0,0 +1,51 @@
+"""
+Availabilities expansion to concrete dates (e.g. for the speakers week stats), timed for 10, 100 and 500 speakers
+with 1 availability by weekday (monday to friday) during a year.
+"""
+
+import datetime as dt
+
+import pytest
+
+from app import crud
+from app.utils import weekday_dates
+
+pytestmark = pytest.mark.anyio
+
+SPEAKERS_SIZES = (10, 100, 500)
+START_DATE, END_DATE = dt.date(2030, 1, 1), dt.date(2030, 12, 31)
+
+
+class FakeWeekStats:
+    """Only collect the deltas which would be upserted."""
+    def __init__(self) -> None:
+        self.deltas = {}
+
+    async def add_to_counters(self, db, deltas) -> None:
+        self.deltas = deltas
+
+
+async def test_weekday_dates(bench) -> None:
+    for size in SPEAKERS_SIZES:
+        async def expand_all() -> None:
+            for _ in range(size):
+                for week_day in range(5):
+                    weekday_dates(START_DATE, END_DATE, week_day)
+        await bench.measure("weekday_dates", size, expand_all)
+    bench.check_growth("weekday_dates", max_exponent=1.2)
+    assert bench.results["weekday_dates"]["500"] < 0.1  # a year for hundreds of speakers in milliseconds
+
+
+async def test_apply_availabilities(bench, monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_week_stats = FakeWeekStats()
+    monkeypatch.setattr(crud.speaker_week_stats, "add_to_counters", fake_week_stats.add_to_counters)
+    for size in SPEAKERS_SIZES:
+        async def apply_all() -> None:
+            for speaker_id in range(size):
+                await crud.speaker_week_stats.apply_availabilities(None, speaker_id=speaker_id, added=[
+                    (START_DATE, END_DATE, week_day) for week_day in range(5)])
+        await bench.measure("apply_availabilities", size, apply_all)
+    bench.check_growth("apply_availabilities", max_exponent=1.2)
+    # last call : the last speaker, 5 slots a full week and 4 the week of 01/01/30 (a tuesday)
+    assert fake_week_stats.deltas[(size - 1, dt.date(2030, 1, 7))]["available_slots"] == 5
+    assert fake_week_stats.deltas[(size - 1, dt.date(2029, 12, 31))]["available_slots"] == 4
@@ -0,0 +1,67 @@
+"""
+Speaker's availabilities list loading (from an in-memory SQLite db), timed for 10, 100 and 10 000 availabilities :
+ORM objects against the rows mode (see CRUDBase.select_entities()), and the peak memory of both at 10 000.
+"""
+
+import datetime as dt
+import tracemalloc
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from benchmarks.micro.conftest import SIZES
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="module")
+def db_sqlite() -> Session:
+    engine = create_engine("sqlite://", future=True)
+    models.Base.metadata.create_all(engine, tables=[models.Availability.__table__])
+    with Session(engine, future=True) as db:
+        for speaker_id, size in enumerate(SIZES):
+            db.execute(insert(models.Availability), [
+                {"speaker_id": speaker_id, "start_date": dt.date(2030, 1, 1) + dt.timedelta(days=i % 365),
+                 "end_date": dt.date(2031, 1, 1), "week_day": i % 5, "time": dt.time(8 + i % 10)}
+                for i in range(size)])
+        db.commit()
+        yield db
+
+
+def load(db: Session, speaker_id: int, rows: bool) -> list:
+    result = db.execute(crud.availability.select_entities(rows).where(models.Availability.speaker_id == speaker_id))
+    loaded = result.all() if rows else result.scalars().all()
+    db.expunge_all()  # ORM objects are not kept in the identity map between 2 calls (as between 2 requests)
+    return loaded
+
+
+def peak_memory(db: Session, speaker_id: int, rows: bool) -> int:
+    tracemalloc.start()
+    try:
+        load(db, speaker_id, rows)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def test_availabilities_loading(bench, db_sqlite: Session) -> None:
+    for speaker_id, size in enumerate(SIZES):
+        async def load_objects() -> list:
+            return load(db_sqlite, speaker_id, rows=False)
+
+        async def load_rows() -> list:
+            return load(db_sqlite, speaker_id, rows=True)
+
+        assert crud.availability.to_json_list(await load_rows()) == crud.availability.to_json_list(
+            await load_objects())
+        await bench.measure("availabilities_objects_loading", size, load_objects)
+        await bench.measure("availabilities_rows_loading", size, load_rows)
+    bench.check_growth("availabilities_objects_loading", max_exponent=1.2)
+    bench.check_growth("availabilities_rows_loading", max_exponent=1.2)
+    results = bench.results
+    assert results["availabilities_rows_loading"]["10000"] < results["availabilities_objects_loading"]["10000"]
+    objects_peak, rows_peak = (peak_memory(db_sqlite, len(SIZES) - 1, rows) for rows in (False, True))
+    results["availabilities_peak_memory"] = {"objects": objects_peak, "rows": rows_peak}
+    assert rows_peak < objects_peak * 0.6
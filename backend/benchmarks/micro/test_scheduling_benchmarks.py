@@ -0,0 +1,86 @@
+"""
+Scheduling algorithms (availabilities overlap checks and free slots) timed at 10, 100 and 10 000 rows by speaker.
+"""
+
+import datetime as dt
+
+import pytest
+
+from app import crud, models
+from app.schemas import AvailabilityCreate, SessionCreate
+from benchmarks.micro.conftest import SIZES
+
+pytestmark = pytest.mark.anyio
+
+SLOT_TIME = 30
+DATE = dt.date(2030, 1, 7)  # a monday
+
+
+def make_speaker() -> models.Speaker:
+    return models.Speaker(id=1, first_name="speaker", last_name="benchmark", email="speaker@benchmark.example.com",
+                          hashed_api_key="", slot_time=SLOT_TIME)
+
+
+def distinct_slot(i: int) -> tuple[dt.date, dt.time]:
+    """Distinct (date, time) by minute : the 1440 minutes of DATE, then of the next mondays."""
+    return DATE + dt.timedelta(weeks=i // 1440), dt.time(i // 60 % 24, i % 60)
+
+
+def weekly_availabilities(n: int, week_day: int = 0) -> list[models.Availability]:
+    """n consecutive 1 week availabilities on the same weekday and time, i.e. none overlapping."""
+    start = DATE + dt.timedelta(days=week_day)
+    return [models.Availability(id=i, start_date=start + dt.timedelta(weeks=i),
+                                end_date=start + dt.timedelta(weeks=i, days=6), week_day=week_day,
+                                time=dt.time(9), speaker_id=1) for i in range(n)]
+
+
+async def test_is_a_good_weekday_int(bench) -> None:
+    periods = [(DATE + dt.timedelta(days=i % 7), DATE + dt.timedelta(days=i % 7 + i % 6), i % 7) for i in range(100)]
+
+    async def check_all() -> None:
+        for start_date, end_date, week_day in periods:
+            await crud.availability.is_a_good_weekday_int(start_date, end_date, week_day)
+    await bench.measure("is_a_good_weekday_int", len(periods), check_all)
+
+
+async def test_is_same_weekday_period_speaker(bench, fake_crud) -> None:
+    """Worst case : the availability to create is after all existing ones (all are compared)."""
+    for size in SIZES:
+        fake_crud(make_speaker(), weekly_availabilities(size), [])
+        obj_in = AvailabilityCreate(start_date=DATE + dt.timedelta(weeks=size),
+                                    end_date=DATE + dt.timedelta(weeks=size), week_day=0, time=dt.time(9))
+        await bench.measure("is_same_weekday_period_speaker", size, lambda: crud.availability
+                            .is_same_weekday_period_speaker(None, speaker_id=1, obj_in=obj_in))
+    bench.check_growth("is_same_weekday_period_speaker", max_exponent=1.3)
+
+
+async def test_has_too_close_previous(bench, fake_crud) -> None:
+    """Worst case : the period overlaps only the last availability, so all are read twice."""
+    for size in SIZES:
+        fake_crud(make_speaker(), weekly_availabilities(size), [])
+        obj_in = AvailabilityCreate(start_date=DATE + dt.timedelta(weeks=size - 1),
+                                    end_date=DATE + dt.timedelta(weeks=size - 1), week_day=0, time=dt.time(9, 15))
+        await bench.measure("has_too_close_previous", size, lambda: crud.availability
+                            .has_too_close_previous(None, speaker_id=1, obj_in=obj_in))
+    bench.check_growth("has_too_close_previous", max_exponent=1.3)
+
+
+async def test_is_free_for_session(bench, fake_crud) -> None:
+    """
+    size availabilities (distinct times, every monday) and size - 1 sessions on the size - 1 first distinct slots :
+    only the next one is free. The snapshot building is linear, the check itself is a few bitwise operations.
+    """
+    for size in SIZES:
+        speaker = make_speaker()
+        avails = [models.Availability(id=i, start_date=DATE, end_date=DATE + dt.timedelta(weeks=size // 1440),
+                                      week_day=0, time=distinct_slot(i)[1], speaker_id=1) for i in range(size)]
+        sessions = [models.Session(id=i, date=distinct_slot(i)[0], time=distinct_slot(i)[1], participant_id=1,
+                                   speaker_id=1, type_id=1, status_id=1) for i in range(size - 1)]
+        fake_crud(speaker, avails, sessions)
+        date, time = distinct_slot(size - 1)
+        session_in = SessionCreate(date=date, time=time, participant_id=1, type_name="teach",
+                                   status_name="scheduled")
+        assert await crud.speaker.is_free_for_session(None, speaker, session_in)
+        await bench.measure("is_free_for_session", size, lambda: crud.speaker
+                            .is_free_for_session(None, speaker, session_in))
+    bench.check_growth("is_free_for_session", max_exponent=1.3)
@@ -0,0 +1,52 @@
+"""
+Sessions list responses body, timed for 10, 100 and 10 000 sessions : the schemas path (pydantic models built then
+encoded by jsonable_encoder(), as FastAPI does with a response_model) against the fast path of the list endpoints
+(json_utils serializers then dumps()).
+"""
+
+import datetime as dt
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app import crud, models
+from app.utils import json_utils
+from benchmarks.micro.conftest import SIZES
+
+pytestmark = pytest.mark.anyio
+
+
+def build_sessions(size: int) -> list[models.Session]:
+    return [models.Session(id=i, date=dt.date(2030, 1, 7) + dt.timedelta(days=i % 365), time=dt.time(9, 30),
+                           comments=None if i % 2 else f"comment {i}", participant_id=i % 50, speaker_id=1,
+                           type_id=1, status_id=1) for i in range(size)]
+
+
+@pytest.fixture
+def fake_types_and_status(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def get_multi(db, *, skip=0, limit=100) -> list[SimpleNamespace]:
+        return [SimpleNamespace(id=1, name="done")]
+    monkeypatch.setattr(crud.session_type, "get_multi", get_multi)
+    monkeypatch.setattr(crud.session_status, "get_multi", get_multi)
+
+
+async def test_sessions_serialization(bench, fake_types_and_status) -> None:
+    for size in SIZES:
+        db_sessions = build_sessions(size)
+
+        async def schemas_path() -> bytes:
+            sessions = await crud.session.from_db_models_to_schemas(None, db_sessions)
+            return json.dumps(jsonable_encoder(sessions), separators=(",", ":")).encode("utf-8")
+
+        async def fast_path() -> bytes:
+            return json_utils.dumps(await crud.session.to_json_list(None, db_sessions))
+
+        assert json.loads(await fast_path()) == json.loads(await schemas_path())
+        await bench.measure("sessions_schemas_serialization", size, schemas_path)
+        await bench.measure("sessions_fast_serialization", size, fast_path)
+    bench.check_growth("sessions_schemas_serialization", max_exponent=1.2)
+    bench.check_growth("sessions_fast_serialization", max_exponent=1.2)
+    results = bench.results
+    assert results["sessions_fast_serialization"]["10000"] < results["sessions_schemas_serialization"]["10000"]
@@ -0,0 +1,136 @@
+"""
+Synthetic dataset for the benchmarks, inserted with bulk INSERT ... RETURNING statements (no CRUD/ORM objects)
+so that a large scale is seeded in a few seconds.
+All users have the same api key (BENCHMARK_API_KEY), hashed only once.
+"""
+
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.utils import add_time
+
+BENCHMARK_API_KEY = "benchmark-api-key"
+SLOT_TIME = 30
+FIRST_SLOT_TIME = dt.time(9)
+WEEK_DAYS = range(5)  # monday to friday
+AVAILABILITIES_START, AVAILABILITIES_END = dt.date(2030, 1, 1), dt.date(2031, 12, 31)
+SEEDED_SESSIONS_YEAR = 2030  # the benchmarked sessions creations use the next year ones
+INSERT_CHUNK_SIZE = 5000
+
+
+@dataclass
+class Scale:
+    speakers: int = 10
+    participants_per_speaker: int = 10
+    slots_per_day: int = 8  # availabilities by speaker and week day
+    sessions_per_participant: int = 10
+
+
+@dataclass
+class SeededData:
+    scale: Scale
+    speakers_ids: list[int] = field(default_factory=list)
+    participants_ids_by_speaker: dict[int, list[int]] = field(default_factory=dict)
+    emails: list[str] = field(default_factory=list)
+
+
+def weekdays_dates(year: int) -> list[dt.date]:
+    """All dates of the year with a WEEK_DAYS weekday (i.e dates with speakers availabilities)."""
+    date, dates = dt.date(year, 1, 1), []
+    while date.year == year:
+        if date.weekday() in WEEK_DAYS:
+            dates.append(date)
+        date += dt.timedelta(days=1)
+    return dates
+
+
+def slots_times(scale: Scale) -> list[dt.time]:
+    return [add_time(date=dt.date.today(), time=FIRST_SLOT_TIME, minutes_to_add=i * SLOT_TIME)
+            for i in range(scale.slots_per_day)]
+
+
+def free_slots(scale: Scale, year: int) -> Iterator[tuple[dt.date, dt.time]]:
+    """Every (date, time) of a speaker's availabilities during the year."""
+    times = slots_times(scale)
+    for date in weekdays_dates(year):
+        for time in times:
+            yield date, time
+
+
+def chunks(rows: list[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        yield rows[start:start + INSERT_CHUNK_SIZE]
+
+
+async def insert_users(db: AsyncSession, model: type[models.User], rows: list[dict[str, Any]],
+                       profile: str, hashed_api_key: str) -> list[int]:
+    """Joined table inheritance : insert the user rows first, then the subclass rows with the returned ids."""
+    ids = []
+    for chunk in chunks(rows):
+        users_rows = [{"first_name": row.pop("first_name"), "last_name": row.pop("last_name"),
+                       "email": row.pop("email"), "hashed_api_key": hashed_api_key, "is_active": True,
+                       "profile": profile} for row in chunk]
+        chunk_ids = (await db.execute(insert(models.User.__table__).returning(models.User.__table__.c.id)
+                                      .values(users_rows))).scalars().all()
+        await db.execute(insert(model.__table__).values([{"id": id_, **row} for id_, row in zip(chunk_ids, chunk)]))
+        ids += chunk_ids
+    return ids
+
+
+async def seed(db: AsyncSession, scale: Scale) -> SeededData:
+    """To run on an empty db (with types and status, see db/init_db.py initialize_db())."""
+    data = SeededData(scale=scale)
+    hashed_api_key = get_password_hash(BENCHMARK_API_KEY)
+    p_type_id = (await db.execute(select(models.ParticipantType.id)
+                                  .where(models.ParticipantType.name == "initial"))).scalar()
+    p_status_id = (await db.execute(select(models.ParticipantStatus.id)
+                                    .where(models.ParticipantStatus.name == settings.PARTICIPANT_STATUS_DEFAULT_VALUE))
+                   ).scalar()
+    s_type_id = (await db.execute(select(models.SessionType.id)
+                                  .where(models.SessionType.name == settings.SESSION_TYPES[0]))).scalar()
+    s_status_id = (await db.execute(select(models.SessionStatus.id)
+                                    .where(models.SessionStatus.name == settings.SESSION_STATUS_SCHEDULED))).scalar()
+
+    speakers_emails = [f"speaker{i}@benchmark.example.com" for i in range(scale.speakers)]
+    data.speakers_ids = await insert_users(db, models.Speaker, [
+        {"first_name": f"speaker{i}", "last_name": "benchmark", "email": email, "slot_time": SLOT_TIME}
+        for i, email in enumerate(speakers_emails)], "speaker", hashed_api_key)
+    data.emails += speakers_emails
+
+    participants_rows = []
+    for speaker_id in data.speakers_ids:
+        for i in range(scale.participants_per_speaker):
+            participants_rows.append({"first_name": f"participant{i}", "last_name": f"of speaker{speaker_id}",
+                                      "email": f"participant{i}.speaker{speaker_id}@benchmark.example.com",
+                                      "type_id": p_type_id, "status_id": p_status_id, "speaker_id": speaker_id})
+    data.emails += [row["email"] for row in participants_rows]
+    participants_ids = await insert_users(db, models.Participant, participants_rows, "participant", hashed_api_key)
+    for i, speaker_id in enumerate(data.speakers_ids):
+        data.participants_ids_by_speaker[speaker_id] = participants_ids[i * scale.participants_per_speaker:
+                                                                        (i + 1) * scale.participants_per_speaker]
+
+    availabilities_rows = [{"start_date": AVAILABILITIES_START, "end_date": AVAILABILITIES_END, "week_day": week_day,
+                            "time": time, "speaker_id": speaker_id}
+                           for speaker_id in data.speakers_ids for week_day in WEEK_DAYS for time in slots_times(scale)]
+    for chunk in chunks(availabilities_rows):
+        await db.execute(insert(models.Availability.__table__).values(chunk))
+
+    sessions_rows = []
+    for speaker_id, speaker_participants_ids in data.participants_ids_by_speaker.items():
+        slots = free_slots(scale, SEEDED_SESSIONS_YEAR)
+        for participant_id in speaker_participants_ids:
+            for _, (date, time) in zip(range(scale.sessions_per_participant), slots):
+                sessions_rows.append({"date": date, "time": time, "participant_id": participant_id,
+                                      "speaker_id": speaker_id, "type_id": s_type_id, "status_id": s_status_id})
+    for chunk in chunks(sessions_rows):
+        await db.execute(insert(models.Session.__table__).values(chunk))
+    await db.commit()
+    await crud.speaker_week_stats.rebuild(db)
+    return data